@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import os
+import sys
+import time
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import output
+from corpconv import reader
+from corpconv import writer
+
+# The named formats that correspond to format strings
+NAMED_FORMATS = {"eltc0_": "conll", "eltnne": "tsv", "xltxne": "vrt"}
+
+
+def synthetic_corpus(n_sentences, sentence_length=20):
+    lines = []
+    for i in range(1, n_sentences + 1):
+        lines.append("# sent_id = doc%d\n" % i)
+        for j in range(1, sentence_length + 1):
+            lines.append("%d\tword\tlemma\tNOUN\t_\t%d\troot\t_\t_\n" % (j, j - 1))
+        lines.append("\n")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the format string engine (reader.py/writer.py) and, for format strings that correspond to named formats, the readers and writers from corpus_readers/corpus_writers on the same data.")
+    parser.add_argument("-s", "--sentences", type=int, default=50000, help="Number of sentences (default: %(default)d)")
+    parser.add_argument("-i", "--input-format", default="eltc0_", help="Input format string (default: %(default)s)")
+    parser.add_argument("-o", "--output-format", default="xltxne", help="Output format string (default: %(default)s)")
+    args = parser.parse_args()
+    options = argparse.Namespace(xml_tag="s", xml_id="id")
+    corpus = synthetic_corpus(args.sentences)
+    n_tokens = sum(1 for line in corpus if line[0].isdigit())
+    start = time.perf_counter()
+    collections.deque(reader.read_sentences(corpus, args.input_format, options), maxlen=0)
+    read_time = time.perf_counter() - start
+    with open(os.devnull, "wb") as fh:
+        start = time.perf_counter()
+        writer.write_sentences(reader.read_sentences(corpus, args.input_format, options), args.output_format, options, fh)
+        convert_time = time.perf_counter() - start
+    print("read\t%.3fs\t%.0f tokens/s" % (read_time, n_tokens / read_time), file=sys.stderr)
+    print("convert\t%.3fs\t%.0f tokens/s" % (convert_time, n_tokens / convert_time), file=sys.stderr)
+    if args.input_format in NAMED_FORMATS and args.output_format in NAMED_FORMATS:
+        read_named = getattr(corpus_readers, "read_" + NAMED_FORMATS[args.input_format])
+        write_named = getattr(corpus_writers, "write_" + NAMED_FORMATS[args.output_format])
+        start = time.perf_counter()
+        collections.deque(read_named(corpus), maxlen=0)
+        read_time = time.perf_counter() - start
+        with open(os.devnull, "wb") as fh:
+            start = time.perf_counter()
+            output.write_buffered(write_named(read_named(corpus)), fh)
+            convert_time = time.perf_counter() - start
+        print("read (%s)\t%.3fs\t%.0f tokens/s" % (NAMED_FORMATS[args.input_format], read_time, n_tokens / read_time), file=sys.stderr)
+        print("convert (%s)\t%.3fs\t%.0f tokens/s" % (NAMED_FORMATS[args.output_format], convert_time, n_tokens / convert_time), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import functools
+import os
+import sys
+import time
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import output
+
+
+def synthetic_sentences(n_sentences, sentence_length=20):
+    token = ["word", "lemma", "NOUN", "NN", "", "0", "root", "", ""]
+    for i in range(1, n_sentences + 1):
+        yield corpus_readers.Sentence("s%d" % i, [token] * sentence_length)
+
+
+def print_path(lines, fh):
+    with contextlib.redirect_stdout(fh):
+        for line in lines:
+            print(line)
+
+
+def buffered_path(lines, fh, buffer_size):
+    output.write_buffered(lines, fh.buffer, buffer_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare print() output with the buffered output engine.")
+    parser.add_argument("-s", "--sentences", type=int, default=100000, help="Number of sentences (default: %(default)d)")
+    parser.add_argument("--buffer-size", type=int, default=output.DEFAULT_BUFFER_SIZE, help="Buffer size in bytes (default: %(default)d)")
+    args = parser.parse_args()
+    writers = {"conll": corpus_writers.write_conll,
+               "osl": functools.partial(corpus_writers.write_osl, delimiter="/"),
+               "tsv": corpus_writers.write_tsv,
+               "vrt": corpus_writers.write_vrt}
+    paths = {"print": print_path,
+             "buffered": functools.partial(buffered_path, buffer_size=args.buffer_size)}
+    for fmt, writer in writers.items():
+        for name, path in paths.items():
+            with open(os.devnull, "w") as fh:
+                start = time.perf_counter()
+                path(writer(synthetic_sentences(args.sentences)), fh)
+                elapsed = time.perf_counter() - start
+            print("%s\t%s\t%.3fs" % (fmt, name, elapsed), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
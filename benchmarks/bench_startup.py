@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""Measure the import time of the corpconv entry point relative to
+the import time of the standard library modules it needs (the
+baseline), which depends on the machine and the Python version.
+
+Exits with status 1 if it exceeds the budget, e.g.:
+
+    PYTHONPATH=. python3 benchmarks/bench_startup.py --budget 2
+
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+# The standard library modules imported by corpconv.cli
+BASELINE = ["argparse", "functools", "io", "logging", "os", "re", "sys"]
+
+
+def import_times(modules):
+    """Import modules in a fresh interpreter; return the cumulative
+    import time of each of them in microseconds, as reported by python
+    -X importtime (0 for modules imported at startup).
+
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import %s" % ", ".join(modules)], env=env, capture_output=True, text=True, check=True)
+    times = dict.fromkeys(modules, 0)
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        # Modules imported by other modules are indented
+        if len(fields) == 3 and fields[2][1:] in times:
+            times[fields[2][1:]] = int(fields[1])
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the corpconv entry point against a budget.")
+    parser.add_argument("-m", "--module", default="corpconv.cli", help="Module to import (default: %(default)s)")
+    parser.add_argument("-r", "--repeat", type=int, default=10, help="Number of runs; the fastest is reported (default: %(default)d)")
+    parser.add_argument("--budget", type=float, default=2, help="Maximum import time as a multiple of the baseline (default: %(default)s)")
+    args = parser.parse_args()
+    best = baseline = float("inf")
+    for _ in range(args.repeat):
+        baseline = min(baseline, sum(import_times(BASELINE).values()) / 1000)
+        time = import_times([args.module])[args.module] / 1000
+        if time == 0:
+            sys.exit("No import time reported for %s" % args.module)
+        best = min(best, time)
+    print("%s: %.1f ms, baseline: %.1f ms (%.2f, budget: %.2f)" % (args.module, best, baseline, best / baseline, args.budget))
+    if best > args.budget * baseline:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+"""Benchmark all readers, writers and conversions on synthetic corpora.
+
+Run from the repository root, e.g.:
+
+    PYTHONPATH=. python3 benchmarks/bench_suite.py -s 20000 --json results.json
+    PYTHONPATH=. python3 benchmarks/bench_suite.py -s 20000 --compare results.json
+
+"""
+
+import argparse
+import collections
+import functools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+
+
+FORMATS = ("conll", "osl", "tsv", "vrt")
+OSL_DELIMITER = "/"
+CLI = "import sys; from corpconv.cli import main; sys.argv[0] = 'corpconv'; main()"
+
+
+def synthetic_sentences(n_sentences, mean_length, n_columns, underscores, long_ids, seed):
+    """Generate random sentences. Sentence lengths are drawn from a
+    geometric-like distribution around mean_length, a share of
+    underscores of the fields (except the first) is empty.
+
+    """
+    rng = random.Random(seed)
+    forms = ["w%d" % i for i in range(5000)]
+    tags = ["NOUN", "VERB", "ADJ", "ADP", "DET", "PRON", "PUNCT", "ADV", "AUX", "CCONJ"]
+    sentences = []
+    for i in range(1, n_sentences + 1):
+        length = max(1, int(rng.expovariate(1 / mean_length)))
+        tokens = []
+        for j in range(length):
+            fields = [rng.choice(forms)]
+            for c in range(1, n_columns):
+                fields.append("" if rng.random() < underscores else rng.choice(tags))
+            tokens.append(fields)
+        if long_ids:
+            sentence_id = "doc%06d-par%04d-sentence%08d" % (i // 50, i % 50, i)
+        else:
+            sentence_id = "s%d" % i
+        sentences.append(corpus_readers.Sentence(sentence_id, tokens))
+    return sentences
+
+
+def readers(n_columns):
+    return {"conll": corpus_readers.read_conll,
+            "osl": functools.partial(corpus_readers.read_osl, delimiter=OSL_DELIMITER, nr_of_fields=n_columns),
+            "tsv": corpus_readers.read_tsv,
+            "vrt": corpus_readers.read_vrt}
+
+
+def writers():
+    return {"conll": corpus_writers.write_conll,
+            "osl": functools.partial(corpus_writers.write_osl, delimiter=OSL_DELIMITER),
+            "tsv": corpus_writers.write_tsv,
+            "vrt": corpus_writers.write_vrt}
+
+
+def measure(function, repeat):
+    """Return the best time of repeat runs and the peak traced memory
+    of an additional run.
+
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run_cli(argv, repeat):
+    """Run corpconv in a fresh process; return the best wall time and
+    the peak RSS of the child in bytes.
+
+    """
+    times, rss = [], 0
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "-c", CLI] + argv, stdout=subprocess.DEVNULL, env=env)
+        _, status, usage = os.wait4(process.pid, 0)
+        times.append(time.perf_counter() - start)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            raise RuntimeError("corpconv %s failed with exit code %d" % (" ".join(argv), process.returncode))
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        rss = max(rss, usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024))
+    return min(times), rss
+
+
+def result(n_tokens, seconds, **kwargs):
+    return dict(seconds=round(seconds, 4), tokens_per_second=round(n_tokens / seconds), **kwargs)
+
+
+def benchmark(args):
+    sentences = synthetic_sentences(args.sentences, args.mean_length, args.columns, args.underscores, args.long_ids, args.seed)
+    n_tokens = sum(len(s.tokens) for s in sentences)
+    results = {"parameters": {"sentences": args.sentences, "tokens": n_tokens, "mean_length": args.mean_length,
+                              "columns": args.columns, "underscores": args.underscores, "long_ids": args.long_ids,
+                              "seed": args.seed, "repeat": args.repeat},
+               "environment": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                               "machine": platform.machine(), "cpus": os.cpu_count()},
+               "read": {}, "write": {}, "convert": {}}
+    formats = args.formats
+    read, write = readers(args.columns), writers()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = {}
+        for fmt in formats:
+            paths[fmt] = os.path.join(tmpdir, "corpus.%s" % fmt)
+            with open(paths[fmt], "w", encoding="utf-8") as fh:
+                for line in write[fmt](sentences):
+                    fh.write(line + "\n")
+        for fmt in formats:
+            with open(paths[fmt], encoding="utf-8") as fh:
+                lines = fh.readlines()
+            seconds, peak = measure(lambda: collections.deque(read[fmt](lines), maxlen=0), args.repeat)
+            results["read"][fmt] = result(n_tokens, seconds, peak_traced_bytes=peak)
+            print("read %s: %.3fs" % (fmt, seconds), file=sys.stderr)
+        for fmt in formats:
+            seconds, peak = measure(lambda: collections.deque(write[fmt](sentences), maxlen=0), args.repeat)
+            results["write"][fmt] = result(n_tokens, seconds, peak_traced_bytes=peak)
+            print("write %s: %.3fs" % (fmt, seconds), file=sys.stderr)
+        for input_format in formats:
+            for output_format in formats:
+                argv = ["-i", input_format, "-o", output_format] + args.cli_args
+                if OSL_DELIMITER != "\t":
+                    argv += ["-d", OSL_DELIMITER]
+                if input_format == "osl":
+                    argv += ["-n", str(args.columns)]
+                seconds, rss = run_cli(argv + [paths[input_format]], args.repeat)
+                results["convert"]["%s-%s" % (input_format, output_format)] = result(n_tokens, seconds, peak_rss_bytes=rss)
+                print("convert %s -> %s: %.3fs" % (input_format, output_format, seconds), file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the speed of every benchmark relative to baseline and
+    return the number of regressions beyond threshold.
+
+    """
+    regressions = 0
+    if results["parameters"] != baseline.get("parameters"):
+        print("Warning: the baseline was measured with different parameters", file=sys.stderr)
+    for group in ("read", "write", "convert"):
+        for name, current in sorted(results[group].items()):
+            if name not in baseline.get(group, {}):
+                continue
+            ratio = current["tokens_per_second"] / baseline[group][name]["tokens_per_second"]
+            flag = ""
+            if ratio < 1 - threshold:
+                flag = "\tREGRESSION"
+                regressions += 1
+            print("%s %s\t%.2fx%s" % (group, name, ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark readers, writers and conversions on synthetic corpora.")
+    parser.add_argument("-s", "--sentences", type=int, default=20000, help="Number of sentences (default: %(default)d)")
+    parser.add_argument("-l", "--mean-length", type=float, default=20, help="Mean sentence length; lengths are exponentially distributed (default: %(default)s)")
+    parser.add_argument("-c", "--columns", type=int, default=9, help="Number of fields per token, without the token ID of conll (default: %(default)d)")
+    parser.add_argument("-u", "--underscores", type=float, default=0.3, help="Share of empty fields, written as \"_\" in conll (default: %(default)s)")
+    parser.add_argument("--long-ids", action="store_true", help="Use long sentence IDs")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: %(default)d)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of runs; the best time is reported (default: %(default)d)")
+    parser.add_argument("-f", "--formats", nargs="+", choices=FORMATS, default=list(FORMATS), help="Formats to benchmark (default: all)")
+    parser.add_argument("--cli-args", nargs=argparse.REMAINDER, default=[], help="Additional arguments for corpconv, e.g. --cli-args -b")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Compare the results to those in this file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as regression (default: %(default)s)")
+    args = parser.parse_args()
+    results = benchmark(args)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
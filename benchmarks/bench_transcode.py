@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import sys
+import time
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import transcoder
+
+
+def synthetic_conll(n_sentences, sentence_length=20):
+    lines = []
+    for i in range(1, n_sentences + 1):
+        lines.append("# sent_id = doc%d\n" % i)
+        for j in range(1, sentence_length + 1):
+            lines.append("%d\tword\tlemma\tNOUN\t_\t%d\troot\t_\t_\n" % (j, j - 1))
+        lines.append("\n")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare line-level transcoding with reader + writer.")
+    parser.add_argument("-s", "--sentences", type=int, default=50000, help="Number of sentences (default: %(default)d)")
+    args = parser.parse_args()
+    readers = {"conll": corpus_readers.read_conll,
+               "tsv": corpus_readers.read_tsv,
+               "vrt": corpus_readers.read_vrt}
+    writers = {"conll": corpus_writers.write_conll,
+               "tsv": corpus_writers.write_tsv,
+               "vrt": corpus_writers.write_vrt}
+    corpus = {"conll": synthetic_conll(args.sentences)}
+    corpus["tsv"] = [line + "\n" for line in corpus_writers.write_tsv(corpus_readers.read_conll(corpus["conll"]))]
+    corpus["vrt"] = [line + "\n" for line in corpus_writers.write_vrt(corpus_readers.read_conll(corpus["conll"]))]
+    for input_format in transcoder.FORMATS:
+        for output_format in transcoder.FORMATS:
+            start = time.perf_counter()
+            collections.deque(writers[output_format](readers[input_format](corpus[input_format])), maxlen=0)
+            generic = time.perf_counter() - start
+            start = time.perf_counter()
+            collections.deque(transcoder.transcode(corpus[input_format], input_format, output_format), maxlen=0)
+            transcoded = time.perf_counter() - start
+            print("%s -> %s\treader + writer: %.3fs\ttranscoder: %.3fs" % (input_format, output_format, generic, transcoded), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+from corpconv import incremental
+
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+DEFAULT_BATCH_SIZE = 100
+
+
+async def _chunks(source, chunk_size):
+    if hasattr(source, "read"):
+        while True:
+            data = await source.read(chunk_size)
+            if not data:
+                return
+            yield data
+    else:
+        # Chunks from an iterable may be of any size
+        async for data in source:
+            for start in range(0, len(data), chunk_size):
+                yield data[start:start + chunk_size]
+
+
+async def read_sentences(source, input_format, binary=False, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """Asynchronously yield the sentences of the corpus read from
+    source, an asyncio.StreamReader or an async iterable of bytes (or
+    str) chunks.
+
+    Parsing is done by the incremental parsers, i.e. by the same code
+    as the readers in corpus_readers. kwargs are passed to the parser
+    (delimiter and nr_of_fields for osl). At most chunk_size bytes are
+    parsed at once, and control is returned to the event loop after
+    every chunk.
+
+    """
+    parser = incremental.PARSERS[input_format](binary=binary, **kwargs)
+    async for data in _chunks(source, chunk_size):
+        for sentence in parser.feed(data):
+            yield sentence
+        await asyncio.sleep(0)
+    for sentence in parser.close():
+        yield sentence
+
+
+async def write_sentences(sentences, sink, output_format, binary=False, batch_size=DEFAULT_BATCH_SIZE, **kwargs):
+    """Format sentences (an async or ordinary iterable) and write them
+    to sink, an asyncio.StreamWriter, in batches of batch_size
+    sentences. After every batch, the writer is drained, so that a
+    slow receiver slows down the conversion instead of filling up
+    memory. kwargs are passed to the writer (delimiter for osl).
+
+    """
+    writer = incremental.WRITERS[output_format](binary=binary, **kwargs)
+    batch = []
+
+    async def flush():
+        sink.write(writer.write(batch))
+        await sink.drain()
+        batch.clear()
+
+    if hasattr(sentences, "__aiter__"):
+        async for sentence in sentences:
+            batch.append(sentence)
+            if len(batch) >= batch_size:
+                await flush()
+    else:
+        for sentence in sentences:
+            batch.append(sentence)
+            if len(batch) >= batch_size:
+                await flush()
+    if batch:
+        await flush()
+    data = writer.close()
+    if data:
+        sink.write(data)
+        await sink.drain()
+
+
+async def convert(source, sink, input_format, output_format, delimiter="\t", nr_of_fields=None, binary=False, chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+    """Convert the corpus read from source and write the result to
+    sink (see read_sentences and write_sentences).
+
+    """
+    reader_kwargs, writer_kwargs = {}, {}
+    if input_format == "osl":
+        reader_kwargs = {"delimiter": delimiter, "nr_of_fields": nr_of_fields}
+    if output_format == "osl":
+        writer_kwargs = {"delimiter": delimiter}
+    sentences = read_sentences(source, input_format, binary, chunk_size, **reader_kwargs)
+    await write_sentences(sentences, sink, output_format, binary, batch_size, **writer_kwargs)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import os
+
+from corpconv import compression
+
+
+DEFAULT_TEMPLATE = "{stem}.{format}"
+
+
+def expand_inputs(patterns, include="*"):
+    """Return (path, root) pairs for the files given as patterns.
+
+    Directories are searched recursively for files whose names match
+    include; root is the directory, so that its structure can be
+    mirrored in the output directory. Patterns that are not existing
+    paths are expanded as globs (** matches any number of
+    directories). For single files, root is None.
+
+    """
+    import fnmatch
+    import glob
+    inputs = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, dirnames, filenames in os.walk(pattern):
+                dirnames.sort()
+                for filename in sorted(fnmatch.filter(filenames, include)):
+                    inputs.append((os.path.join(dirpath, filename), pattern))
+        elif os.path.exists(pattern) or not glob.has_magic(pattern):
+            inputs.append((pattern, None))
+        else:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path):
+                    inputs.append((path, None))
+    return inputs
+
+
+def output_path(path, root, output_dir, template, output_format):
+    """Return the output path for the input file path.
+
+    template is formatted with name (the file name), stem (the file
+    name without compression extension and format extension) and
+    format (the output format).
+
+    """
+    name = os.path.basename(path)
+    stem = name
+    if os.path.splitext(stem)[1].lower() in compression.EXTENSIONS:
+        stem = os.path.splitext(stem)[0]
+    stem = os.path.splitext(stem)[0]
+    subdir = os.path.relpath(os.path.dirname(path), root) if root is not None else ""
+    return os.path.normpath(os.path.join(output_dir, subdir, template.format(name=name, stem=stem, format=output_format)))
+
+
+def _run(task):
+    function, args = task
+    return args, function(*args)
+
+
+def convert_all(function, tasks, jobs=1):
+    """Call function(input_path, output_path, *args) for every task,
+    i.e. (input_path, output_path, *args) tuple, using a pool of jobs
+    processes. The largest files are processed first. function returns
+    None on success and an error message otherwise.
+
+    Yield (input_path, output_path, error message) for every task in
+    the order of completion.
+
+    """
+    tasks = sorted(tasks, key=lambda task: os.path.getsize(task[0]) if os.path.isfile(task[0]) else 0, reverse=True)
+    if jobs > 1 and len(tasks) > 1:
+        import multiprocessing
+        with multiprocessing.Pool(jobs) as pool:
+            for args, error in pool.imap_unordered(_run, [(function, task) for task in tasks]):
+                yield args[0], args[1], error
+    else:
+        for task in tasks:
+            yield task[0], task[1], function(*task)
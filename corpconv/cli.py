@@ -2,11 +2,16 @@
 
 import argparse
 import functools
+import io
 import logging
+import os
+import re
+import sys
 
 
-from corpconv import corpus_readers
-from corpconv import corpus_writers
+# The other modules of corpconv are imported when they are needed, see
+# test/test_startup.py. The defaults of the options below are the same
+# as output.DEFAULT_BUFFER_SIZE etc.
 
 
 # format, --only-tokens, delimiter, number of fields
@@ -59,25 +64,495 @@ def arguments():
     parser.add_argument("-o", "--output-format", choices=["conll", "osl", "tsv", "vrt"], required=True, help="Output format. See --input-format.")
     parser.add_argument("-d", "--delimiter", type=str, default="\t", help="Delimiter in osl format (default: \"\\t\".")
     parser.add_argument("-n", "--nfields", type=int, help="Number of fields in osl format (only for reading from osl).")
-    parser.add_argument("FILE", type=argparse.FileType("r"), help="The input file")
+    parser.add_argument("-c", "--columns", help="Comma-separated list of the columns to convert, as zero-based indices of the fields (without the token ID for conll) or, for conll input, as names (form, lemma, upos, xpos, feats, head, deprel, deps, misc). Only these fields are extracted from the input.")
+    parser.add_argument("--intern", metavar="COLUMNS", help="Comma-separated list of columns (see --columns) whose values are interned while reading, so that all occurrences of a value share one string object. Saves memory when many sentences are held at once, e.g. with --sample, --merge sorted or large --batch-size.")
+    parser.add_argument("--intern-max-size", type=int, default=100000, metavar="N", help="Maximum number of distinct values kept per --intern column; the least recently used values are dropped (default: %(default)d).")
+    parser.add_argument("--columnar", action="store_true", help="Store the fields of every sentence column by column in a single string instead of as one list of strings per token. Saves memory when many sentences are held at once (see --intern).")
+    parser.add_argument("-O", "--output", default="-", help="Output file (default: STDOUT). Output is compressed if the file name ends in .gz, .bz2, .xz or .zst.")
+    parser.add_argument("--compression-level", type=int, help="Compression level for compressed output (default: format-specific).")
+    parser.add_argument("--compression-threads", type=int, default=1, help="Number of threads used for compressing the output (default: %(default)d).")
+    parser.add_argument("--buffer-size", type=int, default=1 << 20, help="Size of the output buffer in bytes (default: %(default)d).")
+    parser.add_argument("-b", "--binary", action="store_true", help="Process the corpus as bytes without decoding and re-encoding it. The input has to use an ASCII-compatible encoding like UTF-8 and is not validated.")
+    parser.add_argument("-m", "--mmap", action="store_true", help="Memory-map the input file instead of reading it line by line (implies --binary). Falls back to streaming if the input is not a regular file.")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of worker processes. With more than one job, the input file is split into chunks at sentence boundaries that are converted in parallel (default: %(default)d).")
+    parser.add_argument("--chunk-size", type=int, default=64 << 20, help="Approximate size of the chunks in bytes when using more than one job (default: %(default)d).")
+    parser.add_argument("--pipeline", choices=["thread", "process"], help="Read the input, convert the sentences and write the output concurrently. thread: every stage runs in its own thread (helps with slow input or output); process: the conversion runs in a separate process.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Number of lines or sentences passed between pipeline stages at once (default: %(default)d).")
+    parser.add_argument("--queue-depth", type=int, default=8, help="Maximum number of batches waiting between two pipeline stages (default: %(default)d).")
+    parser.add_argument("--profile", "--stats", action="store_true", help="Print the time spent in each stage of the conversion, the number of sentences and tokens and the peak memory usage to STDERR at the end.")
+    parser.add_argument("--profile-format", choices=["text", "json"], default="text", help="Format of the --profile summary (default: %(default)s).")
+    parser.add_argument("--progress", type=float, metavar="SECONDS", help="Print a progress line to STDERR every SECONDS seconds.")
+    parser.add_argument("--skip", type=int, default=0, metavar="N", help="Skip the first N sentences of the input.")
+    parser.add_argument("--head", type=int, metavar="N", help="Only consider the N sentences after those skipped with --skip; stop reading after them.")
+    parser.add_argument("--every", type=int, metavar="N", help="Only consider every N-th of these sentences, starting with the first.")
+    parser.add_argument("--min-tokens", type=int, metavar="N", help="Drop sentences with fewer than N tokens.")
+    parser.add_argument("--max-tokens", type=int, metavar="N", help="Drop sentences with more than N tokens.")
+    parser.add_argument("--id-pattern", metavar="REGEX", help="Drop sentences whose ID (given or generated) does not match this regular expression (re.search).")
+    parser.add_argument("--sample", type=int, metavar="N", help="Convert a uniform random sample of N of the remaining sentences (in input order).")
+    parser.add_argument("--seed", type=int, help="Random seed for --sample.")
+    parser.add_argument("--index", help="Sentence index of the input built with corpconv index. With --skip, --head, --every or --id-pattern, only the selected sentences are read from the input.")
+    parser.add_argument("--shard-sentences", type=int, metavar="N", help="Split the output into files of N sentences. The file names are built from --output: a {shard} field (e.g. train-{shard:04d}.tsv.gz) is replaced by the number of the file; otherwise, -00000 etc. is inserted before the extensions.")
+    parser.add_argument("--shard-tokens", type=int, metavar="N", help="Start a new output file after N tokens (see --shard-sentences).")
+    parser.add_argument("--shard-bytes", type=int, metavar="N", help="Start a new output file after N bytes of uncompressed output (see --shard-sentences).")
+    parser.add_argument("--shard-hash", type=int, metavar="N", help="Split the output into N files, assigning every sentence to a file by a hash of its ID (see --shard-sentences).")
+    parser.add_argument("--merge", choices=["concat", "sorted"], help="Convert all input files (and the files in input directories) into a single output. concat: one after another; sorted: merge inputs that are each sorted by sentence ID into one sorted output. With --pipeline, every input is read by its own thread or process.")
+    parser.add_argument("--merge-ids", choices=["renumber", "prefix", "keep"], help="What to do with generated sentence IDs (s1, s2, … in every input) when merging. renumber: continue the numbering across inputs (default for concat); prefix: prefix them with the input file name; keep: leave them as they are (default for sorted).")
+    parser.add_argument("--stats-out", metavar="FILE", help="Write statistics of the converted sentences (number of sentences and tokens, sentence lengths, frequencies of the values of every column) as JSON to FILE. They are computed during the conversion.")
+    parser.add_argument("--stats-columns", help="Comma-separated list of the columns whose values are counted for --stats-out (see --columns; default: all).")
+    parser.add_argument("--stats-sketch", help="Comma-separated list of open-class columns (e.g. form,lemma) for which only the approximate frequencies of the most frequent values are computed, in bounded memory.")
+    parser.add_argument("--stats-top-k", type=int, default=100, metavar="N", help="Number of values reported for the --stats-sketch columns (default: %(default)d).")
+    parser.add_argument("--output-dir", help="Convert all input files and write the results to this directory. The structure of input directories is preserved.")
+    parser.add_argument("--output-template", default="{stem}.{format}", help="Name of the output files in --output-dir; {name} is replaced by the input file name, {stem} by the name without extension and {format} by the output format (default: %(default)s).")
+    parser.add_argument("--include", default="*", help="Only convert files in input directories whose name matches this pattern (default: %(default)s).")
+    parser.add_argument("FILE", nargs="+", help="The input file (\"-\" for STDIN). gzip, bz2, xz and zstd compressed files are decompressed transparently. With --output-dir, any number of files, directories and glob patterns can be given; the files are converted by a pool of --jobs processes.")
     args = parser.parse_args()
+    if args.mmap:
+        args.binary = True
+    if args.columns is not None:
+        args.columns = parse_columns(parser, args.columns, args.input_format)
+    for option in ("skip", "head", "every", "sample"):
+        value = getattr(args, option)
+        if value is not None and value < (1 if option in ("every", "sample") else 0):
+            parser.error("argument --%s: invalid value: %d" % (option, value))
+    if args.compression_threads < 1:
+        parser.error("argument --compression-threads: invalid value: %d" % args.compression_threads)
+    if args.compression_level is not None:
+        from corpconv import compression
+        name = args.output_template if args.output_dir is not None else args.output
+        codec = compression.EXTENSIONS.get(os.path.splitext(name)[1].lower())
+        if codec is not None and args.compression_level not in compression.LEVELS[codec]:
+            levels = compression.LEVELS[codec]
+            parser.error("argument --compression-level: invalid value for %s: %d (%d to %d)" % (codec, args.compression_level, levels[0], levels[-1]))
+    args.sharded = any(getattr(args, option) is not None for option in ("shard_sentences", "shard_tokens", "shard_bytes", "shard_hash"))
+    if args.sharded:
+        for option in ("shard_sentences", "shard_tokens", "shard_bytes", "shard_hash"):
+            value = getattr(args, option)
+            if value is not None and value < 1:
+                parser.error("argument --%s: invalid value: %d" % (option.replace("_", "-"), value))
+        if args.shard_hash is not None and any(getattr(args, option) is not None for option in ("shard_sentences", "shard_tokens", "shard_bytes")):
+            parser.error("--shard-hash cannot be combined with the other --shard options")
+        if args.output == "-" or args.output_dir is not None:
+            parser.error("sharded output requires an output file name (--output) and cannot be combined with --output-dir")
+    if args.index is not None and args.columns is not None:
+        parser.error("--index cannot be combined with --columns")
+    if args.columnar and (args.intern is not None or args.index is not None):
+        parser.error("--columnar cannot be combined with --intern or --index")
+    if args.intern is not None:
+        if args.intern_max_size < 1:
+            parser.error("argument --intern-max-size: invalid value: %d" % args.intern_max_size)
+        args.intern = field_indices(parser, args.intern, args, "intern")
+    if args.id_pattern is not None:
+        try:
+            re.compile(args.id_pattern)
+        except re.error as e:
+            parser.error("argument --id-pattern: %s" % e)
+    if args.stats_out is not None:
+        if args.output_dir is not None:
+            parser.error("--stats-out cannot be combined with --output-dir")
+        if args.stats_top_k < 1:
+            parser.error("argument --stats-top-k: invalid value: %d" % args.stats_top_k)
+        for option in ("stats_columns", "stats_sketch"):
+            if getattr(args, option) is not None:
+                setattr(args, option, field_indices(parser, getattr(args, option), args, option))
+    args.inputs = args.FILE
+    args.FILE = args.FILE[0]
+    if args.merge is not None:
+        if args.output_dir is not None or args.index is not None:
+            parser.error("--merge cannot be combined with --output-dir or --index")
+        if args.merge_ids is None:
+            args.merge_ids = "renumber" if args.merge == "concat" else "keep"
+        if args.merge == "sorted" and args.merge_ids == "renumber":
+            parser.error("generated IDs cannot be renumbered with --merge sorted")
+    elif args.output_dir is None and (len(args.inputs) > 1 or os.path.isdir(args.FILE)):
+        parser.error("converting more than one file requires --output-dir or --merge")
     return args
 
 
+def parse_columns(parser, columns, input_format):
+    from corpconv import corpus_readers
+    indices = []
+    for column in columns.split(","):
+        column = column.strip()
+        if column.isdigit():
+            indices.append(int(column))
+        elif input_format == "conll" and column.lower() in corpus_readers.CONLL_COLUMNS:
+            indices.append(corpus_readers.CONLL_COLUMNS.index(column.lower()))
+        else:
+            parser.error("invalid column for %s input: %r" % (input_format, column))
+    return tuple(indices)
+
+
+def field_indices(parser, columns, args, option):
+    """Parse a list of columns given with option like parse_columns;
+    return the indices of the fields of the converted tokens.
+
+    """
+    if columns == "":
+        return ()
+    indices = parse_columns(parser, columns, args.input_format)
+    if args.columns is None:
+        return indices
+    if any(c not in args.columns for c in indices):
+        parser.error("argument --%s: only the columns selected with --columns can be used" % option.replace("_", "-"))
+    return tuple(args.columns.index(c) for c in indices)
+
+
+def corpus_statistics(args):
+    """Return an empty statistics.Statistics for args, or None without
+    --stats-out.
+
+    """
+    if args.stats_out is None:
+        return None
+    from corpconv import statistics
+    names = None
+    if args.input_format == "conll":
+        from corpconv import corpus_readers
+        selected = args.columns if args.columns is not None else range(len(corpus_readers.CONLL_COLUMNS))
+        names = {i: corpus_readers.CONLL_COLUMNS[c] for i, c in enumerate(selected)}
+    return statistics.Statistics(args.stats_columns, args.stats_sketch or (), args.stats_top_k, names=names)
+
+
+def index_arguments(argv):
+    parser = argparse.ArgumentParser(prog="corpconv index", description="Build a sentence index for random access to a corpus file.")
+    parser.add_argument("-i", "--input-format", choices=["conll", "osl", "tsv", "vrt"], required=True, help="Input format. See corpconv -h.")
+    parser.add_argument("--index", help="Index file (default: FILE.idx).")
+    parser.add_argument("FILE", help="The input file (has to be an uncompressed regular file)")
+    args = parser.parse_args(argv)
+    return args
+
+
+def index_main(argv):
+    from corpconv import compression
+    from corpconv import index
+    args = index_arguments(argv)
+    if not os.path.isfile(args.FILE) or compression.detect(args.FILE) is not None:
+        sys.exit("Only uncompressed regular files can be indexed: %s" % args.FILE)
+    index.build_index(args.FILE, args.input_format, args.index)
+
+
+def validate_arguments(argv):
+    from corpconv import diagnostics
+    from corpconv import validate
+    parser = argparse.ArgumentParser(prog="corpconv validate", description="Check a corpus file for structural problems (number of fields, token IDs, empty fields) without converting it. Exits with status 1 if there are any.")
+    parser.add_argument("-i", "--input-format", choices=["conll", "osl", "tsv", "vrt"], required=True, help="Input format. See corpconv -h.")
+    parser.add_argument("-d", "--delimiter", type=str, default="\t", help="Delimiter in osl format (default: \"\\t\".")
+    parser.add_argument("-n", "--nfields", type=int, help="Number of fields in osl format (default: as many as the first token has).")
+    parser.add_argument("--no-empty-fields", action="store_true", help="Report empty fields in osl, tsv and vrt input (always reported for conll).")
+    parser.add_argument("--max-examples", type=int, default=diagnostics.DEFAULT_MAX_EXAMPLES, help="Number of problems of each type that are reported with their line numbers; further problems are only counted. Default: %(default)d")
+    parser.add_argument("--report-format", choices=["text", "json"], default="text", help="Format of the report that is printed to STDOUT. Default: text")
+    parser.add_argument("--block-size", type=int, default=validate.DEFAULT_BLOCK_SIZE, help="Size of the blocks in which the input is checked. Default: %(default)d")
+    parser.add_argument("FILE", nargs="?", default="-", help="The input file (possibly compressed); default: STDIN")
+    args = parser.parse_args(argv)
+    if args.block_size < 1:
+        parser.error("--block-size has to be positive")
+    return args
+
+
+def validate_main(argv):
+    from corpconv import compression
+    from corpconv import diagnostics
+    from corpconv import validate
+    args = validate_arguments(argv)
+    problems = diagnostics.Diagnostics(args.max_examples, log=False)
+    with compression.open_input(args.FILE) as fh:
+        validate.validate(fh, args.input_format, problems, args.delimiter, args.nfields, not args.no_empty_fields, args.block_size)
+    problems.report(args.report_format, sys.stdout)
+    if problems:
+        sys.exit(1)
+
+
+def reader_and_writer(args, variant=None):
+    """Return the reader and writer for args. variant is "bytes" or
+    "mmap" (only for readers); by default, the bytes variants are used
+    if args.binary is true.
+
+    """
+    from corpconv import corpus_readers
+    if args.columnar:
+        from corpconv import columnar as writers
+    else:
+        from corpconv import corpus_writers as writers
+    if variant is None:
+        variant = "bytes" if args.binary else None
+    suffix = "_" + variant if variant is not None else ""
+    reader = getattr(corpus_readers, "read_%s%s" % (args.input_format, suffix))
+    writer = getattr(writers, "write_%s%s" % (args.output_format, "_bytes" if variant is not None else ""))
+    if args.input_format == "osl":
+        reader = functools.partial(reader, delimiter=args.delimiter, nr_of_fields=args.nfields)
+    if args.columns is not None:
+        reader = functools.partial(reader, columns=args.columns)
+    if args.columnar:
+        reader = functools.partial(reader, columnar=True)
+    if args.intern:
+        from corpconv import vocabulary
+        reader = functools.partial(reader, vocabularies={c: vocabulary.Vocabulary(args.intern_max_size) for c in args.intern})
+    if args.output_format == "osl":
+        writer = functools.partial(writer, delimiter=args.delimiter)
+    return reader, writer
+
+
+def sentence_filter(args):
+    """Return the filters.SentenceFilter for args, or None if no
+    sentences are to be filtered out.
+
+    """
+    if args.skip == 0 and all(getattr(args, option) is None for option in ("head", "every", "min_tokens", "max_tokens", "id_pattern", "sample")):
+        return None
+    from corpconv import filters
+    return filters.SentenceFilter(args.skip, args.head, args.every, args.min_tokens, args.max_tokens, args.id_pattern, args.sample, args.seed)
+
+
+def write_sentences(args, sentences, writer, outfile, stage, statistics=None):
+    """Format sentences with writer and write them to outfile or, with
+    the --shard options, to the shard files; add them to statistics.
+
+    """
+    if statistics is not None:
+        sentences = statistics.count(sentences)
+    if args.sharded:
+        from corpconv import compression
+        from corpconv import sharding
+        open_output = functools.partial(compression.open_output, level=args.compression_level, threads=args.compression_threads)
+        sharding.write_sharded(sentences, writer, args.output, args.binary, args.shard_sentences, args.shard_tokens, args.shard_bytes, args.shard_hash, open_output, args.buffer_size)
+    elif args.binary:
+        from corpconv import output
+        output.write_buffered_bytes(stage(writer(sentences), "write"), outfile, args.buffer_size)
+    else:
+        from corpconv import output
+        output.write_buffered(stage(writer(sentences), "write"), outfile, args.buffer_size)
+
+
+def convert_merged(args, criteria, reader, writer, outfile, stage, statistics=None):
+    """Convert all inputs into a single output (--merge)."""
+    from corpconv import batch
+    from corpconv import merge
+    paths = [path for path, root in batch.expand_inputs(args.inputs, args.include)]
+    if not paths:
+        sys.exit("No input files found")
+    names = [merge.source_name(path) for path in paths]
+    sources = [functools.partial(merge.read_file, path, reader, args.binary) for path in paths]
+    combine = merge.merge_sorted if args.merge == "sorted" else merge.concatenate
+
+    def write(streams):
+        sentences = combine(streams, names, args.merge_ids)
+        if criteria is not None:
+            from corpconv import filters
+            sentences = filters.filter_sentences(sentences, criteria)
+        write_sentences(args, stage(sentences, "read", tokens=True), writer, outfile, stage, statistics)
+
+    try:
+        if args.pipeline:
+            from corpconv import pipeline
+            with pipeline.concurrent_sources(sources, args.pipeline, args.batch_size, args.queue_depth) as streams:
+                write(streams)
+        else:
+            write([source() for source in sources])
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+def convert_indexed(args, criteria, writer, outfile, stage, statistics=None):
+    """Convert the sentences selected by criteria, reading only those
+    the index selects by position and ID.
+
+    """
+    from corpconv import filters
+    from corpconv import index
+    try:
+        corpus = index.IndexedCorpus(args.FILE, args.delimiter, args.nfields, args.binary, args.index)
+    except (OSError, ValueError) as e:
+        sys.exit("Cannot use index: %s" % e)
+    if corpus.input_format != args.input_format:
+        sys.exit("Index %s is for %s, not %s input" % (args.index, corpus.input_format, args.input_format))
+    # The remaining criteria are applied to the sentences read
+    remaining = filters.SentenceFilter(min_tokens=criteria.min_tokens, max_tokens=criteria.max_tokens, sample=criteria.sample, seed=criteria.seed)
+    with corpus:
+        sentences = corpus.select(criteria.skip, criteria.head, criteria.every, criteria.id_pattern)
+        sentences = stage(filters.filter_sentences(sentences, remaining), "read", tokens=True)
+        write_sentences(args, sentences, writer, outfile, stage, statistics)
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "index":
+        index_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "validate":
+        validate_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "generic":
+        from corpconv import newcli
+        newcli.main(sys.argv[2:])
+        return
     args = arguments()
-    readers = {"conll": corpus_readers.read_conll,
-               "osl": functools.partial(corpus_readers.read_osl, delimiter=args.delimiter, nr_of_fields=args.nfields),
-               "tsv": corpus_readers.read_tsv,
-               "vrt": corpus_readers.read_vrt}
-    writers = {"conll": corpus_writers.write_conll,
-               "osl": functools.partial(corpus_writers.write_osl, delimiter=args.delimiter),
-               "tsv": corpus_writers.write_tsv,
-               "vrt": corpus_writers.write_vrt}
-    reader = readers[args.input_format]
-    writer = writers[args.output_format]
-    for line in writer(reader(args.FILE)):
-        print(line)
+    if args.output_dir is not None:
+        batch_main(args)
+        return
+    from corpconv import compression
+    reader, writer = reader_and_writer(args)
+    outfile = None
+    if not args.sharded:
+        try:
+            outfile = compression.open_output(args.output, args.compression_level, args.compression_threads)
+        except (OSError, RuntimeError) as e:
+            sys.exit("Cannot open output file: %s" % e)
+    statistics = corpus_statistics(args)
+    profile = None
+    if args.profile or args.progress:
+        total_size = os.path.getsize(args.FILE) if os.path.isfile(args.FILE) and compression.detect(args.FILE) is None else None
+        from corpconv import profiling
+        profile = profiling.Profile(total_size, args.progress)
+    try:
+        convert(args, reader, writer, outfile if profile is None or outfile is None else profile.wrap_output(outfile), profile, statistics)
+    except (EOFError, OSError) as e:
+        sys.exit("Cannot convert %s: %s" % (args.FILE, e))
+    finally:
+        if outfile is not None and outfile is not sys.stdout.buffer:
+            outfile.close()
+    if statistics is not None:
+        try:
+            with open(args.stats_out, "w", encoding="utf-8") as fh:
+                statistics.write(fh)
+        except OSError as e:
+            sys.exit("Cannot write statistics: %s" % e)
+    if args.profile:
+        profile.finish()
+        profile.report(args.profile_format)
+
+
+def convert_file(path, output_path, args):
+    """Convert a single file in batch mode; return None on success and
+    an error message otherwise.
+
+    """
+    from corpconv import compression
+    args = argparse.Namespace(**vars(args))
+    args.FILE = path
+    try:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        reader, writer = reader_and_writer(args)
+        outfile = compression.open_output(output_path, args.compression_level, args.compression_threads)
+        try:
+            convert(args, reader, writer, outfile)
+        finally:
+            outfile.close()
+    except (Exception, SystemExit) as e:
+        if os.path.isfile(output_path):
+            os.remove(output_path)
+        return str(e) or e.__class__.__name__
+
+
+def batch_main(args):
+    from corpconv import batch
+    inputs = batch.expand_inputs(args.inputs, args.include)
+    if not inputs:
+        sys.exit("No input files found")
+    worker_args = argparse.Namespace(**vars(args))
+    # Every file is converted by a single worker process
+    worker_args.jobs = 1
+    if args.jobs > 1 and args.pipeline == "process":
+        worker_args.pipeline = "thread"
+    worker_args.profile = worker_args.progress = None
+    tasks = []
+    outputs = {}
+    for path, root in inputs:
+        output_path = batch.output_path(path, root, args.output_dir, args.output_template, args.output_format)
+        if output_path in outputs:
+            sys.exit("%s and %s would both be written to %s" % (outputs[output_path], path, output_path))
+        if os.path.abspath(output_path) == os.path.abspath(path):
+            sys.exit("%s would be overwritten by its own output" % path)
+        outputs[output_path] = path
+        tasks.append((path, output_path, worker_args))
+    failures = 0
+    for path, output_path, error in batch.convert_all(convert_file, tasks, args.jobs):
+        if error is not None:
+            failures += 1
+            logging.error("Cannot convert %s: %s", path, error)
+    if failures:
+        sys.exit("%d of %d files could not be converted" % (failures, len(tasks)))
+
+
+def convert(args, reader, writer, outfile, profile=None, statistics=None):
+    if profile is None:
+        stage = lambda iterable, name, **kwargs: iterable
+    else:
+        stage = profile.wrap
+    from corpconv import compression
+    seekable = os.path.isfile(args.FILE) and compression.detect(args.FILE) is None
+    criteria = sentence_filter(args)
+    if args.merge is not None:
+        convert_merged(args, criteria, reader, writer, outfile, stage, statistics)
+        return
+    if args.index is not None and criteria is not None:
+        convert_indexed(args, criteria, writer, outfile, stage, statistics)
+        return
+    if criteria is not None:
+        from corpconv import filters
+        if criteria.sample is not None and args.jobs > 1:
+            logging.warning("Sampling needs all sentences in one process, falling back to a single job.")
+            args = argparse.Namespace(**vars(args))
+            args.jobs = 1
+        reader = filters.FilteredReader(reader, args.input_format, criteria, args.binary)
+    if args.sharded and (args.jobs > 1 or args.pipeline):
+        logging.warning("Sharded output is written by a single process, ignoring --jobs and --pipeline.")
+        args = argparse.Namespace(**vars(args))
+        args.jobs = 1
+        args.pipeline = None
+    if args.jobs > 1:
+        if seekable:
+            from corpconv import parallel
+            parallel.convert_parallel(args.FILE, args.input_format, reader, writer, outfile, args.jobs, args.chunk_size, args.buffer_size, args.binary, statistics, profile)
+            return
+        logging.warning("Input is not an uncompressed regular file, falling back to a single job.")
+    try:
+        infile = compression.open_input(args.FILE)
+    except (OSError, RuntimeError) as e:
+        sys.exit("Cannot open input file: %s" % e)
+    with infile:
+        if args.mmap:
+            if seekable and os.path.getsize(args.FILE) > 0:
+                import mmap
+                mmap_reader = reader_and_writer(args, "mmap")[0]
+                with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if criteria is None:
+                        sentences = stage(mmap_reader(mm), "read", tokens=True)
+                    else:
+                        sentences = stage(filters.read_filtered_buffer(mm, mmap_reader, args.input_format, criteria), "read", tokens=True)
+                    write_sentences(args, sentences, writer, outfile, stage, statistics)
+                return
+            logging.warning("Input is not an uncompressed regular file, falling back to streaming.")
+        from corpconv import transcoder
+        counts = None
+        if profile is not None:
+            infile = profile.wrap_input(infile)
+            counts = profile.counts
+        if args.pipeline:
+            lines = stage(infile if args.binary else io.TextIOWrapper(infile, encoding="utf-8"), "input")
+            stages = [reader, writer]
+            if statistics is not None:
+                # The statistics have to be collected in this process
+                if args.pipeline == "process":
+                    logging.warning("Statistics are collected in a thread pipeline, ignoring --pipeline process.")
+                args = argparse.Namespace(**vars(args))
+                args.pipeline = "thread"
+                stages = [reader, statistics.count, writer]
+            elif not args.binary and args.columns is None and criteria is None and transcoder.can_transcode(args.input_format, args.output_format):
+                stages = [functools.partial(transcoder.transcode, input_format=args.input_format, output_format=args.output_format, counts=counts)]
+            if counts is not None and len(stages) > 1:
+                stages.insert(-1, counts.count)
+            from corpconv import pipeline
+            pipeline.convert_pipelined(lines, stages, outfile, args.binary, args.pipeline, args.batch_size, args.queue_depth, args.buffer_size, counts)
+            return
+        if args.binary:
+            sentences = stage(reader(stage(infile, "input")), "read", tokens=True)
+            write_sentences(args, sentences, writer, outfile, stage, statistics)
+        elif args.columns is None and criteria is None and not args.sharded and statistics is None and transcoder.can_transcode(args.input_format, args.output_format):
+            from corpconv import output
+            lines = stage(io.TextIOWrapper(infile, encoding="utf-8"), "input")
+            output.write_buffered(stage(transcoder.transcode(lines, args.input_format, args.output_format, counts=counts), "transcode"), outfile, args.buffer_size)
+        else:
+            sentences = stage(reader(stage(io.TextIOWrapper(infile, encoding="utf-8"), "input")), "read", tokens=True)
+            write_sentences(args, sentences, writer, outfile, stage, statistics)
 
 
 if __name__ == "__main__":
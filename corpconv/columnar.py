@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+import array
+import itertools
+
+from corpconv.corpus_readers import Sentence
+
+
+class ColumnarSentence:
+    """Compact, column-wise representation of a sentence.
+
+    All field values are stored in a single string (or bytes object),
+    column by column, with an array of offsets into it. Tokens are only
+    materialized as lists of strings when they are accessed, e.g. via
+    the tokens view. Unpacking a ColumnarSentence yields its ID and the
+    tokens view, so it can be used wherever a Sentence is expected.
+
+    The readers in corpus_readers build ColumnarSentences directly from
+    the token lines with their columnar option (see from_lines).
+
+    """
+    __slots__ = ("id", "n_tokens", "n_fields", "_data", "_offsets", "_lengths")
+
+    def __init__(self, sentence_id, tokens):
+        self._set_tokens(sentence_id, tokens, next((t[0][:0] for t in tokens if t), ""))
+
+    @classmethod
+    def from_lines(cls, sentence_id, lines, separator="\t", skip=0, empty=None, columns=None):
+        """Build a ColumnarSentence from the token lines of a sentence.
+        The fields of a line are separated by separator, the first skip
+        fields are dropped and fields equal to empty are empty; if
+        columns is given, only these fields are kept (empty if
+        missing). Unless the lines have different numbers of fields,
+        they are split at once and no lists are built per token.
+
+        """
+        sentence = cls.__new__(cls)
+        blank = separator[:0]
+        n_tokens = len(lines)
+        counts = [line.count(separator) for line in lines]
+        if any(c != counts[0] for c in counts):
+            tokens = [line.split(separator)[skip:] for line in lines]
+            if columns is not None:
+                tokens = [[t[c] if c < len(t) else blank for c in columns] for t in tokens]
+            if empty is not None:
+                tokens = [[f if f != empty else blank for f in t] for t in tokens]
+            sentence._set_tokens(sentence_id, tokens, blank)
+            return sentence
+        n = counts[0] + 1 if lines else 0
+        values = separator.join(lines).split(separator) if lines else []
+        indices = range(skip, n) if columns is None else [c + skip for c in columns]
+        values = [values[c::n] if c < n else [blank] * n_tokens for c in indices]
+        if empty is not None:
+            values = [[f if f != empty else blank for f in column] for column in values]
+        sentence._set(sentence_id, n_tokens, len(values) if n_tokens else 0, values, blank)
+        return sentence
+
+    def _set_tokens(self, sentence_id, tokens, blank):
+        lengths = [len(t) for t in tokens]
+        n_fields = max(lengths, default=0)
+        # Number of fields per token, only needed for ragged sentences
+        if all(l == n_fields for l in lengths):
+            lengths = None
+        self._set(sentence_id, len(tokens), n_fields, itertools.zip_longest(*tokens, fillvalue=blank), blank, lengths)
+
+    def _set(self, sentence_id, n_tokens, n_fields, columns, blank, lengths=None):
+        self.id = sentence_id
+        self.n_tokens = n_tokens
+        self.n_fields = n_fields
+        self._lengths = None if lengths is None else array.array("H", lengths)
+        values = list(itertools.chain.from_iterable(columns))
+        self._data = blank.join(values)
+        self._offsets = array.array("I", itertools.accumulate(map(len, values), initial=0))
+
+    def __iter__(self):
+        return iter((self.id, self.tokens))
+
+    def __eq__(self, other):
+        try:
+            other_id, other_tokens = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        return self.id == other_id and list(self.tokens) == list(other_tokens)
+
+    def _replace(self, id):
+        """Return a copy with another ID (like Sentence._replace)."""
+        sentence = ColumnarSentence.__new__(ColumnarSentence)
+        for name in self.__slots__:
+            setattr(sentence, name, getattr(self, name))
+        sentence.id = id
+        return sentence
+
+    def __repr__(self):
+        return "ColumnarSentence(id=%r, n_tokens=%d, n_fields=%d)" % (self.id, self.n_tokens, self.n_fields)
+
+    def column(self, index):
+        """Return the values of a column as a list (empty values for
+        tokens that have fewer fields).
+
+        """
+        if not 0 <= index < self.n_fields:
+            raise IndexError("column index out of range")
+        data, offsets = self._data, self._offsets
+        start = index * self.n_tokens
+        return [data[offsets[i]:offsets[i + 1]] for i in range(start, start + self.n_tokens)]
+
+    def columns(self):
+        return [self.column(c) for c in range(self.n_fields)]
+
+    def token(self, index):
+        if index < 0:
+            index += self.n_tokens
+        if not 0 <= index < self.n_tokens:
+            raise IndexError("token index out of range")
+        data, offsets = self._data, self._offsets
+        n_fields = self.n_fields if self._lengths is None else self._lengths[index]
+        positions = range(index, index + n_fields * self.n_tokens, self.n_tokens)
+        return [data[offsets[i]:offsets[i + 1]] for i in positions]
+
+    @property
+    def tokens(self):
+        return TokensView(self)
+
+    @property
+    def ragged(self):
+        return self._lengths is not None
+
+    def to_sentence(self):
+        return Sentence(self.id, list(self.tokens))
+
+
+class TokensView:
+    """Read-only list-of-lists view of the tokens of a ColumnarSentence."""
+    __slots__ = ("_sentence",)
+
+    def __init__(self, sentence):
+        self._sentence = sentence
+
+    def __len__(self):
+        return self._sentence.n_tokens
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._sentence.token(i) for i in range(*index.indices(len(self)))]
+        return self._sentence.token(index)
+
+    def __iter__(self):
+        sentence = self._sentence
+        if sentence.ragged or sentence.n_fields == 0:
+            return (sentence.token(i) for i in range(sentence.n_tokens))
+        return (list(t) for t in zip(*sentence.columns()))
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+
+def to_columnar(sentences):
+    """Convert Sentences to ColumnarSentences (the readers can produce
+    them directly, see ColumnarSentence.from_lines).
+
+    """
+    for sentence_id, tokens in sentences:
+        yield ColumnarSentence(sentence_id, tokens)
+
+
+def _token_lines(sentence, delimiter, columns=None):
+    if sentence.ragged or sentence.n_fields == 0:
+        return [delimiter.join(t) for t in sentence.tokens]
+    if columns is None:
+        columns = sentence.columns()
+    return list(map(delimiter.join, zip(*columns)))
+
+
+def write_conll(sentences):
+    for sentence in sentences:
+        yield "# sent_id = %s" % sentence.id
+        if sentence.ragged or sentence.n_fields == 0:
+            for i, token in enumerate(sentence.tokens, start=1):
+                yield "\t".join([str(i)] + [f if f != "" else "_" for f in token])
+        elif sentence.n_tokens > 0:
+            columns = [[str(i) for i in range(1, sentence.n_tokens + 1)]]
+            columns.extend([[f if f != "" else "_" for f in column] for column in sentence.columns()])
+            yield "\n".join(_token_lines(sentence, "\t", columns))
+        yield ""
+
+
+def write_osl(sentences, delimiter):
+    for sentence in sentences:
+        yield " ".join(_token_lines(sentence, delimiter))
+
+
+def write_tsv(sentences):
+    for sentence in sentences:
+        if sentence.n_tokens > 0:
+            yield "\n".join(_token_lines(sentence, "\t"))
+        yield ""
+
+
+def write_vrt(sentences):
+    for sentence in sentences:
+        yield "<s id=\"%s\">" % sentence.id
+        if sentence.n_tokens > 0:
+            yield "\n".join(_token_lines(sentence, "\t"))
+        yield "</s>"
+
+
+def write_conll_bytes(sentences):
+    for sentence in sentences:
+        yield b"# sent_id = %s" % sentence.id
+        if sentence.ragged or sentence.n_fields == 0:
+            for i, token in enumerate(sentence.tokens, start=1):
+                yield b"\t".join([b"%d" % i] + [f if f != b"" else b"_" for f in token])
+        elif sentence.n_tokens > 0:
+            columns = [[b"%d" % i for i in range(1, sentence.n_tokens + 1)]]
+            columns.extend([[f if f != b"" else b"_" for f in column] for column in sentence.columns()])
+            yield b"\n".join(_token_lines(sentence, b"\t", columns))
+        yield b""
+
+
+def write_osl_bytes(sentences, delimiter):
+    if isinstance(delimiter, str):
+        delimiter = delimiter.encode("utf-8")
+    for sentence in sentences:
+        yield b" ".join(_token_lines(sentence, delimiter))
+
+
+def write_tsv_bytes(sentences):
+    for sentence in sentences:
+        if sentence.n_tokens > 0:
+            yield b"\n".join(_token_lines(sentence, b"\t"))
+        yield b""
+
+
+def write_vrt_bytes(sentences):
+    for sentence in sentences:
+        yield b"<s id=\"%s\">" % sentence.id
+        if sentence.n_tokens > 0:
+            yield b"\n".join(_token_lines(sentence, b"\t"))
+        yield b"</s>"
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+import collections
+import functools
+import io
+import os
+import queue
+import sys
+import threading
+
+
+BLOCK_SIZE = 1 << 20
+QUEUE_DEPTH = 16
+
+EXTENSIONS = {".gz": "gzip",
+              ".bz2": "bz2",
+              ".xz": "xz",
+              ".zst": "zstd"}
+
+MAGIC_BYTES = {b"\x1f\x8b": "gzip",
+               b"BZh": "bz2",
+               b"\xfd7zXZ\x00": "xz",
+               b"\x28\xb5\x2f\xfd": "zstd"}
+
+DEFAULT_LEVELS = {"gzip": 6, "bz2": 9, "xz": 6, "zstd": 3}
+LEVELS = {"gzip": range(0, 10), "bz2": range(1, 10), "xz": range(0, 10), "zstd": range(1, 23)}
+
+
+def detect(path, head=b""):
+    """Return the compression format of a file (None if uncompressed).
+
+    The extension takes precedence; otherwise the first bytes of the
+    file (or head, for streams that cannot be reopened) are inspected.
+
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+    if not head and path != "-" and os.path.isfile(path):
+        with open(path, "rb") as fh:
+            head = fh.read(6)
+    for magic, compression in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+# The codecs are imported when they are first needed, as most
+# conversions do not use them.
+
+def _zstandard(action):
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("%s zstd compressed files requires the zstandard package" % action) from None
+    return zstandard
+
+
+def _decompressor(compression):
+    if compression == "gzip":
+        import zlib
+        # 32 + MAX_WBITS: gzip header, concatenated members handled below
+        return zlib.decompressobj(32 + zlib.MAX_WBITS)
+    elif compression == "bz2":
+        import bz2
+        return bz2.BZ2Decompressor()
+    elif compression == "xz":
+        import lzma
+        return lzma.LZMADecompressor()
+    elif compression == "zstd":
+        return _zstandard("Reading").ZstdDecompressor().decompressobj()
+
+
+def _decompress_stream(fh, compression, blocks):
+    """Decompress fh block by block and put the results into the queue
+    blocks (None marks the end, an exception an error).
+
+    """
+    try:
+        decompressor = _decompressor(compression)
+        empty = True
+        for data in iter(functools.partial(fh.read, BLOCK_SIZE), b""):
+            empty = False
+            while data:
+                # Concatenated gzip members or bz2, xz, zstd streams
+                if decompressor.eof:
+                    decompressor = _decompressor(compression)
+                block = decompressor.decompress(data)
+                if block:
+                    blocks.put(block)
+                data = decompressor.unused_data if decompressor.eof else b""
+        # An empty file is read as empty input, like gzip.open does
+        if not empty and not decompressor.eof:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+        blocks.put(None)
+    except Exception as e:
+        blocks.put(e)
+
+
+class _QueueReader(io.RawIOBase):
+    """Raw binary stream reading the blocks produced by a decompression
+    thread.
+
+    """
+    def __init__(self, fh, compression):
+        self._fh = fh
+        self._blocks = queue.Queue(QUEUE_DEPTH)
+        self._buffer = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=_decompress_stream, args=(fh, compression, self._blocks), daemon=True)
+        self._thread.start()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer and not self._eof:
+            block = self._blocks.get()
+            if block is None:
+                self._eof = True
+            elif isinstance(block, Exception):
+                self._eof = True
+                raise block
+            else:
+                self._buffer = memoryview(block)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._fh.close()
+        super().close()
+
+
+def open_input(path):
+    """Open path (or STDIN for "-") for binary reading.
+
+    Compressed input is decompressed in a separate thread, so that
+    decompression overlaps with parsing.
+
+    """
+    if path == "-":
+        fh = sys.stdin.buffer
+        compression = detect(path, fh.peek(6)[:6])
+    else:
+        fh = open(path, "rb")
+        compression = detect(path)
+    if compression is None:
+        return fh
+    if compression == "zstd":
+        _zstandard("Reading")
+    return io.BufferedReader(_QueueReader(fh, compression), BLOCK_SIZE)
+
+
+def _compress_block(data, compression, level):
+    if compression == "gzip":
+        import gzip
+        return gzip.compress(data, compresslevel=level)
+    elif compression == "bz2":
+        import bz2
+        return bz2.compress(data, compresslevel=level)
+    elif compression == "xz":
+        import lzma
+        return lzma.compress(data, preset=level)
+
+
+class _ParallelCompressor(io.RawIOBase):
+    """Binary output stream that compresses blocks of data in a pool of
+    threads.
+
+    Every block becomes an independent gzip member, bz2 stream or xz
+    stream. Concatenations of those are valid files that are read by
+    the usual tools.
+
+    """
+    def __init__(self, fh, compression, level, threads):
+        import concurrent.futures
+        self._fh = fh
+        self._compression = compression
+        self._level = level
+        self._executor = concurrent.futures.ThreadPoolExecutor(threads)
+        self._max_pending = 2 * threads
+        self._pending = collections.deque()
+        self._buffer = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._buffer.append(bytes(b))
+        self._size += len(b)
+        if self._size >= BLOCK_SIZE:
+            self._submit()
+        return len(b)
+
+    def _submit(self):
+        self._pending.append(self._executor.submit(_compress_block, b"".join(self._buffer), self._compression, self._level))
+        self._buffer = []
+        self._size = 0
+        while len(self._pending) > self._max_pending or (self._pending and self._pending[0].done()):
+            self._fh.write(self._pending.popleft().result())
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if not self.closed:
+            if self._buffer:
+                self._submit()
+            while self._pending:
+                self._fh.write(self._pending.popleft().result())
+            self._executor.shutdown()
+            self._fh.close()
+        super().close()
+
+
+def open_output(path, level=None, threads=1):
+    """Open path (or STDOUT for "-") for binary writing, compressing
+    the output according to the extension of path.
+
+    """
+    if path == "-":
+        return sys.stdout.buffer
+    compression = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if compression == "zstd":
+        zstandard = _zstandard("Writing")
+    fh = open(path, "wb")
+    if compression is None:
+        return fh
+    if level is None:
+        level = DEFAULT_LEVELS[compression]
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=level, threads=threads).stream_writer(fh)
+    return _ParallelCompressor(fh, compression, level, threads)
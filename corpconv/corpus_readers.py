@@ -1,16 +1,148 @@
 #!/usr/bin/env python3
 
 import collections
+import functools
 import logging
+import operator
 import re
 
 
 Sentence = collections.namedtuple("Sentence", ["id", "tokens"])
 
+PATTERNS = {"sent_id": r"^#\s*sent_id\s*=\s*(\S.*)\s*$",
+            "vrt_id": r" id=(['\"])([^'\"]+)\1"}
 
-def read_conll(corpus):
-    pattern = re.compile(r"^#\s*sent_id\s*=\s*(\S.*)\s*$")
-    sentence_counter = 0
+
+@functools.lru_cache(maxsize=None)
+def compiled(name, binary=False):
+    """Return the compiled regular expression from PATTERNS (for bytes
+    if binary is true). Expressions are compiled on first use.
+
+    """
+    pattern = PATTERNS[name]
+    return re.compile(pattern.encode("ascii") if binary else pattern)
+
+
+# The fields of the tokens read by read_conll (the ID column is dropped)
+CONLL_COLUMNS = ("form", "lemma", "upos", "xpos", "feats", "head", "deprel", "deps", "misc")
+
+
+def _projection(columns, separator, skip=0, empty=None):
+    """Return a function that splits a token line at separator and
+    returns only the fields with the given indices (counted after the
+    first skip fields). The line is not split beyond the last of
+    them. Missing fields are returned as empty strings, as are fields
+    equal to empty.
+
+    """
+    indices = [c + skip for c in columns]
+    maxsplit = max(indices) + 1
+    blank = separator[:0]
+    if len(indices) == 1:
+        getter = lambda parts, i=indices[0]: (parts[i],)
+    else:
+        getter = operator.itemgetter(*indices)
+
+    def pad(parts):
+        n = len(parts)
+        return [parts[i] if i < n else blank for i in indices]
+
+    if empty is None:
+        def project(line):
+            parts = line.split(separator, maxsplit)
+            try:
+                return list(getter(parts))
+            except IndexError:
+                return pad(parts)
+    else:
+        def project(line):
+            parts = line.split(separator, maxsplit)
+            try:
+                return [f if f != empty else blank for f in getter(parts)]
+            except IndexError:
+                return [f if f != empty else blank for f in pad(parts)]
+    return project
+
+
+def _select(fields, columns):
+    n = len(fields)
+    blank = fields[0][:0] if fields else ""
+    return [fields[c] if c < n else blank for c in columns]
+
+
+def _interning(vocabularies):
+    """Return a function that replaces the fields of a token (a list)
+    with the canonical objects from vocabularies, a dictionary mapping
+    column indices to vocabulary.Vocabulary objects, or None if
+    vocabularies is None.
+
+    """
+    if vocabularies is None:
+        return None
+    columns = [(c, vocabulary.intern) for c, vocabulary in sorted(vocabularies.items())]
+
+    def intern(fields):
+        n_fields = len(fields)
+        for c, intern_value in columns:
+            if c < n_fields:
+                fields[c] = intern_value(fields[c])
+        return fields
+    return intern
+
+
+def _token_builder(columns, separator, skip=0, empty=None, vocabularies=None):
+    """Return the function that turns a token line into its fields (see
+    _projection and _interning), or None if the readers can simply
+    split the lines because neither columns nor vocabularies are
+    given.
+
+    """
+    intern = _interning(vocabularies)
+    if columns is not None:
+        project = _projection(columns, separator, skip, empty)
+    elif intern is None:
+        return None
+    elif empty is None:
+        project = lambda line: line.split(separator)[skip:]
+    else:
+        blank = separator[:0]
+        project = lambda line: [f if f != empty else blank for f in line.split(separator)[skip:]]
+    if intern is None:
+        return project
+    return lambda line: intern(project(line))
+
+
+def _unchanged(line):
+    return line
+
+
+def _sentence_class(columnar):
+    if not columnar:
+        return Sentence
+    from corpconv.columnar import ColumnarSentence
+    return ColumnarSentence
+
+
+def _builders(columns, separator, skip=0, empty=None, vocabularies=None, columnar=False):
+    """Return the functions with which the line-based readers build a
+    sentence: project turns a token line into a token (see
+    _token_builder), make turns the sentence ID and the tokens into the
+    sentence. For columnar sentences, the lines are kept as they are
+    and only split into columns when the sentence is complete (see
+    columnar.ColumnarSentence.from_lines); vocabularies are not used
+    then, as all values of a sentence are stored in a single string.
+
+    """
+    if not columnar:
+        return _token_builder(columns, separator, skip, empty, vocabularies), Sentence
+    make = functools.partial(_sentence_class(True).from_lines, separator=separator, skip=skip, empty=empty, columns=columns)
+    return _unchanged, make
+
+
+def read_conll(corpus, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    pattern = compiled("sent_id")
+    project, make = _builders(columns, "\t", 1, "_", vocabularies, columnar)
+    sentence_counter = first_sentence - 1
     origid = None
     sentence = []
     for line in corpus:
@@ -20,55 +152,67 @@ def read_conll(corpus):
             sentence_id = origid
             if origid is None:
                 sentence_id = "s%d" % sentence_counter
-            yield Sentence(sentence_id, sentence)
+            yield make(sentence_id, sentence)
             sentence = []
             origid = None
         elif line.startswith("#") and len(sentence) == 0:
-            m = re.search(pattern, line)
+            m = pattern.search(line)
             if m:
                 origid = m.group(1)
-        else:
+        elif project is None:
             sentence.append([f if f != "_" else "" for f in line.split("\t")[1:]])
+        else:
+            sentence.append(project(line))
     if line != "":
         logging.warning("Badly formatted file (missing empty line at end of file)!")
         sentence_counter += 1
         sentence_id = origid
         if origid is None:
             sentence_id = "s%d" % sentence_counter
-        yield Sentence(sentence_id, sentence)
+        yield make(sentence_id, sentence)
 
 
-def read_osl(corpus, delimiter, nr_of_fields):
-    sentence_id = 0
+def read_osl(corpus, delimiter, nr_of_fields, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    intern = _interning(vocabularies)
+    make = _sentence_class(columnar)
+    sentence_id = first_sentence - 1
     for line in corpus:
         line = line.rstrip("\n")
         if line == "":
             continue
         sentence_id += 1
         tokens = [t.rsplit(delimiter, maxsplit=nr_of_fields) for t in line.split(" ")]
-        yield Sentence("s%d" % sentence_id, tokens)
+        if columns is not None:
+            tokens = [_select(t, columns) for t in tokens]
+        if intern is not None:
+            tokens = [intern(t) for t in tokens]
+        yield make("s%d" % sentence_id, tokens)
 
 
-def read_tsv(corpus):
-    sentence_id = 0
+def read_tsv(corpus, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    project, make = _builders(columns, "\t", vocabularies=vocabularies, columnar=columnar)
+    sentence_id = first_sentence - 1
     sentence = []
     for line in corpus:
         line = line.rstrip("\n")
         if line == "":
             sentence_id += 1
-            yield Sentence("s%d" % sentence_id, sentence)
+            yield make("s%d" % sentence_id, sentence)
             sentence = []
-        else:
+        elif project is None:
             sentence.append(line.split("\t"))
+        else:
+            sentence.append(project(line))
     if line != "":
         logging.warning("Badly formatted file (missing empty line at end of file)!")
         sentence_id += 1
-        yield Sentence(sentence_id, sentence)
+        yield make("s%d" % sentence_id, sentence)
 
 
-def read_vrt(corpus):
-    pattern = re.compile(r" id=(['\"])([^'\"]+)\1")
-    sentence_counter = 0
+def read_vrt(corpus, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    pattern = compiled("vrt_id")
+    project, make = _builders(columns, "\t", vocabularies=vocabularies, columnar=columnar)
+    sentence_counter = first_sentence - 1
     origid = None
     sentence = []
     for line in corpus:
@@ -78,16 +222,285 @@ def read_vrt(corpus):
             sentence_id = origid
             if origid is None:
                 sentence_id = "s%d" % sentence_counter
-            yield Sentence(sentence_id, sentence)
+            yield make(sentence_id, sentence)
             sentence = []
             origid = None
         elif line.startswith("<s "):
-            m = re.search(pattern, line)
+            m = pattern.search(line)
             if m:
                 origid = m.group(2)
             else:
                 logging.warning("Badly formatted file (opening sentence tag misses id attribute)!")
         elif line.startswith("<"):
             pass
-        else:
+        elif project is None:
             sentence.append(line.split("\t"))
+        else:
+            sentence.append(project(line))
+
+
+def read_conll_bytes(corpus, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    pattern = compiled("sent_id", binary=True)
+    project, make = _builders(columns, b"\t", 1, b"_", vocabularies, columnar)
+    sentence_counter = first_sentence - 1
+    origid = None
+    sentence = []
+    line = b""
+    for line in corpus:
+        line = line.rstrip()
+        if line == b"":
+            sentence_counter += 1
+            sentence_id = origid
+            if origid is None:
+                sentence_id = b"s%d" % sentence_counter
+            yield make(sentence_id, sentence)
+            sentence = []
+            origid = None
+        elif line.startswith(b"#") and len(sentence) == 0:
+            m = pattern.search(line)
+            if m:
+                origid = m.group(1)
+        elif project is None:
+            sentence.append([f if f != b"_" else b"" for f in line.split(b"\t")[1:]])
+        else:
+            sentence.append(project(line))
+    if line != b"":
+        logging.warning("Badly formatted file (missing empty line at end of file)!")
+        sentence_counter += 1
+        sentence_id = origid
+        if origid is None:
+            sentence_id = b"s%d" % sentence_counter
+        yield make(sentence_id, sentence)
+
+
+def read_osl_bytes(corpus, delimiter, nr_of_fields, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    intern = _interning(vocabularies)
+    make = _sentence_class(columnar)
+    if isinstance(delimiter, str):
+        delimiter = delimiter.encode("utf-8")
+    sentence_id = first_sentence - 1
+    for line in corpus:
+        line = line.rstrip(b"\n")
+        if line == b"":
+            continue
+        sentence_id += 1
+        tokens = [t.rsplit(delimiter, maxsplit=nr_of_fields) for t in line.split(b" ")]
+        if columns is not None:
+            tokens = [_select(t, columns) for t in tokens]
+        if intern is not None:
+            tokens = [intern(t) for t in tokens]
+        yield make(b"s%d" % sentence_id, tokens)
+
+
+def read_tsv_bytes(corpus, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    project, make = _builders(columns, b"\t", vocabularies=vocabularies, columnar=columnar)
+    sentence_id = first_sentence - 1
+    sentence = []
+    line = b""
+    for line in corpus:
+        line = line.rstrip(b"\n")
+        if line == b"":
+            sentence_id += 1
+            yield make(b"s%d" % sentence_id, sentence)
+            sentence = []
+        elif project is None:
+            sentence.append(line.split(b"\t"))
+        else:
+            sentence.append(project(line))
+    if line != b"":
+        logging.warning("Badly formatted file (missing empty line at end of file)!")
+        sentence_id += 1
+        yield make(b"s%d" % sentence_id, sentence)
+
+
+def read_vrt_bytes(corpus, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    pattern = compiled("vrt_id", binary=True)
+    project, make = _builders(columns, b"\t", vocabularies=vocabularies, columnar=columnar)
+    sentence_counter = first_sentence - 1
+    origid = None
+    sentence = []
+    for line in corpus:
+        line = line.rstrip(b"\n")
+        if line == b"</s>":
+            sentence_counter += 1
+            sentence_id = origid
+            if origid is None:
+                sentence_id = b"s%d" % sentence_counter
+            yield make(sentence_id, sentence)
+            sentence = []
+            origid = None
+        elif line.startswith(b"<s "):
+            m = pattern.search(line)
+            if m:
+                origid = m.group(2)
+            else:
+                logging.warning("Badly formatted file (opening sentence tag misses id attribute)!")
+        elif line.startswith(b"<"):
+            pass
+        elif project is None:
+            sentence.append(line.split(b"\t"))
+        else:
+            sentence.append(project(line))
+
+
+# Lines that end a sentence in the respective format
+SENTENCE_END_LINES = {"conll": rb"^[^\S\n]*$",
+                      "tsv": rb"^$",
+                      "vrt": rb"^</s>$"}
+
+
+def _buffer_spans(buf, pattern):
+    """Split buf at lines that match pattern, yielding (start,
+    block_end, end) triples. buf[start:block_end] are the lines
+    between two matches (with their newlines), end is the position
+    after the matching line. block_end is None for the last block if
+    it is not followed by a matching line.
+
+    """
+    pos = 0
+    size = len(buf)
+    for m in re.finditer(pattern, buf, re.MULTILINE):
+        if m.start() == size:
+            break
+        end = min(m.end() + 1, size)
+        yield pos, m.start(), end
+        pos = end
+    if pos < size:
+        yield pos, None, size
+
+
+def _buffer_blocks(buf, pattern):
+    """Split buf at lines that match pattern, yielding (lines,
+    terminated) pairs. lines is a list of the lines between two
+    matches (without newlines; empty lines are kept); terminated is
+    False for the last block if it is not followed by a matching line.
+
+    """
+    for start, block_end, end in _buffer_spans(buf, pattern):
+        if block_end is None:
+            block = buf[start:end].rstrip(b"\n")
+            yield block.split(b"\n") if block else [], False
+        elif block_end == start:
+            yield [], True
+        else:
+            yield buf[start:block_end - 1].split(b"\n"), True
+
+
+def sentence_spans(buf, input_format):
+    """Yield the (start, end) byte positions of the sentences in buf,
+    one for every sentence the respective read_*_mmap function yields.
+    The sentence ends (empty line, closing tag, newline) are included,
+    i.e. reading buf[start:end] yields exactly one sentence.
+
+    """
+    if input_format == "osl":
+        pos = 0
+        size = len(buf)
+        while pos < size:
+            end = buf.find(b"\n", pos)
+            end = size if end == -1 else end + 1
+            if buf[pos:pos + 1] != b"\n":
+                yield pos, end
+            pos = end
+        return
+    for start, block_end, end in _buffer_spans(buf, SENTENCE_END_LINES[input_format]):
+        if block_end is None and input_format == "vrt":
+            break
+        yield start, end
+
+
+def read_conll_mmap(buf, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    """Read CoNLL sentences from a bytes-like object, e.g. a memory-mapped file."""
+    pattern = compiled("sent_id", binary=True)
+    project, make = _builders(columns, b"\t", 1, b"_", vocabularies, columnar)
+    sentence_counter = first_sentence - 1
+    for lines, terminated in _buffer_blocks(buf, SENTENCE_END_LINES["conll"]):
+        if not terminated:
+            logging.warning("Badly formatted file (missing empty line at end of file)!")
+        origid = None
+        sentence = []
+        for line in lines:
+            line = line.rstrip()
+            if line.startswith(b"#") and len(sentence) == 0:
+                m = pattern.search(line)
+                if m:
+                    origid = m.group(1)
+            elif project is None:
+                sentence.append([f if f != b"_" else b"" for f in line.split(b"\t")[1:]])
+            else:
+                sentence.append(project(line))
+        sentence_counter += 1
+        sentence_id = origid
+        if origid is None:
+            sentence_id = b"s%d" % sentence_counter
+        yield make(sentence_id, sentence)
+
+
+def read_osl_mmap(buf, delimiter, nr_of_fields, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    """Read osl sentences from a bytes-like object, e.g. a memory-mapped file."""
+    intern = _interning(vocabularies)
+    make = _sentence_class(columnar)
+    if isinstance(delimiter, str):
+        delimiter = delimiter.encode("utf-8")
+    sentence_id = first_sentence - 1
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        end = buf.find(b"\n", pos)
+        if end == -1:
+            end = size
+        line = buf[pos:end]
+        pos = end + 1
+        if line == b"":
+            continue
+        sentence_id += 1
+        tokens = [t.rsplit(delimiter, maxsplit=nr_of_fields) for t in line.split(b" ")]
+        if columns is not None:
+            tokens = [_select(t, columns) for t in tokens]
+        if intern is not None:
+            tokens = [intern(t) for t in tokens]
+        yield make(b"s%d" % sentence_id, tokens)
+
+
+def read_tsv_mmap(buf, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    """Read tsv sentences from a bytes-like object, e.g. a memory-mapped file."""
+    project, make = _builders(columns, b"\t", vocabularies=vocabularies, columnar=columnar)
+    sentence_id = first_sentence - 1
+    for lines, terminated in _buffer_blocks(buf, SENTENCE_END_LINES["tsv"]):
+        if not terminated:
+            logging.warning("Badly formatted file (missing empty line at end of file)!")
+        sentence_id += 1
+        if project is None:
+            yield make(b"s%d" % sentence_id, [line.split(b"\t") for line in lines])
+        else:
+            yield make(b"s%d" % sentence_id, [project(line) for line in lines])
+
+
+def read_vrt_mmap(buf, first_sentence=1, columns=None, vocabularies=None, columnar=False):
+    """Read vrt sentences from a bytes-like object, e.g. a memory-mapped file."""
+    pattern = compiled("vrt_id", binary=True)
+    project, make = _builders(columns, b"\t", vocabularies=vocabularies, columnar=columnar)
+    sentence_counter = first_sentence - 1
+    for lines, terminated in _buffer_blocks(buf, SENTENCE_END_LINES["vrt"]):
+        if not terminated:
+            break
+        origid = None
+        sentence = []
+        for line in lines:
+            if line.startswith(b"<s "):
+                m = pattern.search(line)
+                if m:
+                    origid = m.group(2)
+                else:
+                    logging.warning("Badly formatted file (opening sentence tag misses id attribute)!")
+            elif line.startswith(b"<"):
+                pass
+            elif project is None:
+                sentence.append(line.split(b"\t"))
+            else:
+                sentence.append(project(line))
+        sentence_counter += 1
+        sentence_id = origid
+        if origid is None:
+            sentence_id = b"s%d" % sentence_counter
+        yield make(sentence_id, sentence)
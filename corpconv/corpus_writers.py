@@ -30,3 +30,33 @@ def write_vrt(sentences):
         for token in tokens:
             yield "\t".join(token)
         yield "</s>"
+
+
+def write_conll_bytes(sentences):
+    for sentence_id, tokens in sentences:
+        yield b"# sent_id = %s" % sentence_id
+        for i, token in enumerate(tokens, start=1):
+            yield b"\t".join([b"%d" % i] + [f if f != b"" else b"_" for f in token])
+        yield b""
+
+
+def write_osl_bytes(sentences, delimiter):
+    if isinstance(delimiter, str):
+        delimiter = delimiter.encode("utf-8")
+    for sentence_id, tokens in sentences:
+        yield b" ".join([delimiter.join(t) for t in tokens])
+
+
+def write_tsv_bytes(sentences):
+    for sentence_id, tokens in sentences:
+        for token in tokens:
+            yield b"\t".join(token)
+        yield b""
+
+
+def write_vrt_bytes(sentences):
+    for sentence_id, tokens in sentences:
+        yield b"<s id=\"%s\">" % sentence_id
+        for token in tokens:
+            yield b"\t".join(token)
+        yield b"</s>"
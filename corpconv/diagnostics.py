@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import sys
+
+
+DEFAULT_MAX_EXAMPLES = 5
+
+
+class DiagnosticError(ValueError):
+    """Raised for the first issue in strict mode."""
+    def __init__(self, category, line, message):
+        super().__init__("line %d: %s" % (line, message) if line is not None else message)
+        self.category = category
+        self.line = line
+
+
+class Diagnostics:
+    """Collects the issues found while reading a corpus.
+
+    Issues are counted by category; only the first max_examples issues
+    of every category are kept (and logged if log is true) with their
+    line numbers. In strict mode, the first issue raises a
+    DiagnosticError instead. Diagnostics of different parts of a
+    corpus can be combined with merge().
+
+    """
+    def __init__(self, max_examples=DEFAULT_MAX_EXAMPLES, strict=False, log=True):
+        self.max_examples = max_examples
+        self.strict = strict
+        self.log = log
+        self.counts = {}
+        self.examples = {}
+
+    def issue(self, category, line, message, *args):
+        """Record an issue; message % args is only formatted if the
+        issue is kept as an example.
+
+        """
+        n = self.counts.get(category, 0) + 1
+        self.counts[category] = n
+        if self.strict:
+            raise DiagnosticError(category, line, message % args)
+        if n <= self.max_examples:
+            message = message % args
+            self.examples.setdefault(category, []).append((line, message))
+            if self.log:
+                if line is None:
+                    logging.warning(message)
+                else:
+                    logging.warning("Line %d: %s", line, message)
+                if n == self.max_examples:
+                    logging.warning("Further issues of type %s are only counted", category)
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def merge(self, other):
+        """Add the counts and examples of other (e.g. for the next chunk
+        of the corpus).
+
+        """
+        for category, n in other.counts.items():
+            self.counts[category] = self.counts.get(category, 0) + n
+        for category, examples in other.examples.items():
+            kept = self.examples.setdefault(category, [])
+            kept.extend(examples[:self.max_examples - len(kept)])
+        return self
+
+    def as_dict(self):
+        return {category: {"count": n, "examples": [{"line": line, "message": message} for line, message in self.examples.get(category, [])]}
+                for category, n in sorted(self.counts.items())}
+
+    def summary(self):
+        lines = ["%d issues" % self.total()]
+        for category, n in sorted(self.counts.items()):
+            lines.append("%-26s %10d" % (category, n))
+            for line, message in self.examples.get(category, []):
+                lines.append("    %s%s" % ("line %d: " % line if line is not None else "", message))
+        return "\n".join(lines)
+
+    def report(self, fmt="text", fh=None):
+        """Write the aggregated report (text or json) to fh (default:
+        STDERR).
+
+        """
+        if fh is None:
+            fh = sys.stderr
+        if fmt == "json":
+            print(json.dumps(self.as_dict()), file=fh)
+        else:
+            print(self.summary(), file=fh)
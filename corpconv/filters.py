@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+import random
+import re
+
+from corpconv import corpus_readers
+from corpconv import incremental
+
+
+class SentenceFilter:
+    """Criteria for selecting sentences.
+
+    skip, head and every refer to the positions of the sentences in
+    the input: the first skip sentences are dropped, only the next
+    head sentences are considered and of those only every every-th,
+    starting with the first. Of the remaining sentences, those with
+    fewer than min_tokens or more than max_tokens tokens or with an ID
+    that does not match id_pattern (a regular expression) are dropped.
+    If sample is given, a uniform random sample of that many of the
+    remaining sentences is selected (reservoir sampling with the given
+    seed); the sample keeps the order of the input.
+
+    """
+    def __init__(self, skip=0, head=None, every=None, min_tokens=None, max_tokens=None, id_pattern=None, sample=None, seed=None):
+        self.skip = skip
+        self.head = head
+        self.every = every
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.id_pattern = re.compile(id_pattern) if isinstance(id_pattern, str) else id_pattern
+        self.sample = sample
+        self.seed = seed
+        self.stop = skip + head if head is not None else None
+
+    def needs_content(self):
+        """Whether the criteria depend on more than the position."""
+        return self.min_tokens is not None or self.max_tokens is not None or self.id_pattern is not None
+
+    def position_ok(self, ordinal):
+        if ordinal <= self.skip:
+            return False
+        if self.every is not None and (ordinal - self.skip - 1) % self.every != 0:
+            return False
+        return True
+
+    def done(self, ordinal):
+        """Whether no sentence from position ordinal on can be selected."""
+        return self.stop is not None and ordinal > self.stop
+
+    def content_ok(self, sentence_id, n_tokens):
+        if self.min_tokens is not None and n_tokens < self.min_tokens:
+            return False
+        if self.max_tokens is not None and n_tokens > self.max_tokens:
+            return False
+        if self.id_pattern is not None:
+            if isinstance(sentence_id, bytes):
+                sentence_id = sentence_id.decode("utf-8", errors="replace")
+            if not self.id_pattern.search(sentence_id):
+                return False
+        return True
+
+
+def _block_info(lines, input_format, ordinal, binary):
+    """Return the ID and the number of tokens of the sentence consisting
+    of lines, as the reader for input_format would determine them,
+    without splitting the lines into fields.
+
+    """
+    empty, newline = (b"", b"\n") if binary else ("", "\n")
+    generated = (b"s%d" if binary else "s%d") % ordinal
+    if input_format == "osl":
+        return generated, lines[0].rstrip(newline).count(b" " if binary else " ") + 1
+    if input_format == "tsv":
+        return generated, sum(1 for line in lines if line.rstrip(newline) != empty)
+    if input_format == "conll":
+        pattern = corpus_readers.compiled("sent_id", binary)
+        comment = b"#" if binary else "#"
+        sentence_id = None
+        n_tokens = 0
+        for line in lines:
+            line = line.rstrip()
+            if line == empty:
+                continue
+            if n_tokens == 0 and line.startswith(comment):
+                m = pattern.search(line)
+                if m:
+                    sentence_id = m.group(1)
+            else:
+                n_tokens += 1
+        return sentence_id if sentence_id is not None else generated, n_tokens
+    pattern = corpus_readers.compiled("vrt_id", binary)
+    open_tag, tag = (b"<s ", b"<") if binary else ("<s ", "<")
+    sentence_id = None
+    n_tokens = 0
+    for line in lines:
+        if line.startswith(open_tag):
+            m = pattern.search(line)
+            if m:
+                sentence_id = m.group(2)
+        elif not line.startswith(tag):
+            n_tokens += 1
+    return sentence_id if sentence_id is not None else generated, n_tokens
+
+
+def _line_blocks(lines, input_format, binary):
+    """Group lines into the blocks the reader for input_format turns
+    into one sentence each.
+
+    """
+    newline = b"\n" if binary else "\n"
+    if input_format == "osl":
+        for line in lines:
+            if line.rstrip(newline):
+                yield [line]
+        return
+    is_end = incremental.PARSERS[input_format].is_sentence_end
+    block = []
+    for line in lines:
+        block.append(line)
+        if is_end(line.rstrip(newline)):
+            yield block
+            block = []
+    # Like the readers, ignore an unterminated vrt sentence at the end
+    if block and input_format != "vrt":
+        yield block
+
+
+def _select(items, info, read, criteria, first_sentence):
+    """Yield read(item, ordinal) for the items (one per sentence) that
+    meet the criteria. info(item, ordinal) returns the ID and the
+    number of tokens of the sentence; it is only called if the criteria
+    depend on them, and read only for the items that meet them.
+
+    """
+    content = criteria.needs_content()
+    sample = criteria.sample
+    reservoir = []
+    rng = random.Random(criteria.seed)
+    n_selected = 0
+    for ordinal, item in enumerate(items, start=first_sentence):
+        if criteria.done(ordinal):
+            break
+        if criteria.position_ok(ordinal) and (not content or criteria.content_ok(*info(item, ordinal))):
+            if sample is None:
+                yield read(item, ordinal)
+            else:
+                # Reservoir sampling (algorithm R): items are only read
+                # when they enter the reservoir
+                n_selected += 1
+                if len(reservoir) < sample:
+                    reservoir.append((ordinal, read(item, ordinal)))
+                else:
+                    j = rng.randrange(n_selected)
+                    if j < sample:
+                        reservoir[j] = (ordinal, read(item, ordinal))
+        # Do not read beyond the last sentence that can be selected
+        if criteria.done(ordinal + 1):
+            break
+    if sample is not None:
+        reservoir.sort(key=lambda entry: entry[0])
+        for ordinal, sentence in reservoir:
+            yield sentence
+
+
+class FilteredReader:
+    """Reader that yields only the sentences that meet criteria.
+
+    reader is one of the (streaming) readers from corpus_readers,
+    possibly wrapped in functools.partial. The lines are grouped into
+    sentences first; sentences that are filtered out based on their
+    position, ID or length are never split into fields. Generated
+    sentence IDs are those of the unfiltered input.
+
+    """
+    def __init__(self, reader, input_format, criteria, binary=False):
+        self.reader = reader
+        self.input_format = input_format
+        self.criteria = criteria
+        self.binary = binary
+
+    def __call__(self, lines, first_sentence=1):
+        info = lambda block, ordinal: _block_info(block, self.input_format, ordinal, self.binary)
+        read = lambda block, ordinal: next(self.reader(block, first_sentence=ordinal))
+        return _select(_line_blocks(lines, self.input_format, self.binary), info, read, self.criteria, first_sentence)
+
+
+def _span_lines(buf, span):
+    lines = bytes(buf[span[0]:span[1]]).split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()
+    return lines
+
+
+def read_filtered_buffer(buf, reader, input_format, criteria, first_sentence=1):
+    """Like FilteredReader for the read_*_mmap readers and a bytes-like
+    object, e.g. a memory-mapped file.
+
+    """
+    info = lambda span, ordinal: _block_info(_span_lines(buf, span), input_format, ordinal, True)
+    read = lambda span, ordinal: next(reader(buf[span[0]:span[1]], first_sentence=ordinal))
+    return _select(corpus_readers.sentence_spans(buf, input_format), info, read, criteria, first_sentence)
+
+
+def filter_sentences(sentences, criteria, first_sentence=1):
+    """Apply criteria to Sentences that have already been read."""
+    info = lambda sentence, ordinal: (sentence.id, len(sentence.tokens))
+    read = lambda sentence, ordinal: sentence
+    return _select(sentences, info, read, criteria, first_sentence)
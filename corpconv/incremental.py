@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+import abc
+import codecs
+import collections
+import io
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+
+
+class _Lines:
+    """Iterator over the queued lines that a reader from
+    corpus_readers consumes.
+
+    """
+    def __init__(self):
+        self.lines = collections.deque()
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.lines:
+            return self.lines.popleft()
+        if self.closed:
+            raise StopIteration
+        raise RuntimeError("The reader needs more input")
+
+
+class IncrementalParser(abc.ABC):
+    """Push-based parser: feed() chunks of a corpus, get completed
+    Sentences back.
+
+    The parser runs the reader from corpus_readers, but it is only
+    advanced when the queued lines contain a complete sentence, i.e.
+    the sentences (and warnings) are exactly those of the reader.
+    Chunks may be split anywhere, even within lines or UTF-8
+    sequences. Call close() at the end of the corpus to get the
+    remaining sentences.
+
+    In text mode (the default), chunks may be str or bytes (decoded
+    with encoding) and line endings are normalized as in files opened
+    in text mode. If binary is true, chunks have to be bytes and the
+    bytes variant of the reader is used.
+
+    """
+    reader = None
+    bytes_reader = None
+
+    def __init__(self, binary=False, encoding="utf-8", first_sentence=1, **kwargs):
+        self.binary = binary
+        self._lines = _Lines()
+        read = self.bytes_reader if binary else self.reader
+        self._sentences = read(self._lines, first_sentence=first_sentence, **kwargs)
+        self._pending = 0
+        self._seen_input = False
+        self._tail = b"" if binary else ""
+        self._decoder = None
+        self._newlines = None
+        if not binary:
+            self._decoder = codecs.getincrementaldecoder(encoding)()
+            self._newlines = io.IncrementalNewlineDecoder(None, translate=True)
+
+    @staticmethod
+    @abc.abstractmethod
+    def is_sentence_end(line):
+        """Whether the reader yields a sentence after line (without
+        line terminator).
+
+        """
+
+    def _decode(self, data, final=False):
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data, final)
+        return self._newlines.decode(data, final)
+
+    def _queue(self, data):
+        lines = (self._tail + data).split(b"\n" if self.binary else "\n")
+        self._tail = lines.pop()
+        for line in lines:
+            self._lines.lines.append(line)
+            if self.is_sentence_end(line):
+                self._pending += 1
+
+    def feed(self, data):
+        """Add a chunk of the corpus; return the list of sentences it
+        completes.
+
+        """
+        if not self.binary:
+            data = self._decode(data)
+        elif not isinstance(data, bytes):
+            raise TypeError("binary parsers only accept bytes")
+        if data:
+            self._seen_input = True
+            self._queue(data)
+        sentences = [next(self._sentences) for _ in range(self._pending)]
+        self._pending = 0
+        return sentences
+
+    def close(self):
+        """Signal the end of the corpus; return the remaining sentences."""
+        if not self.binary:
+            data = self._decode(b"", final=True)
+            if data:
+                self._seen_input = True
+                self._queue(data)
+        if self._tail:
+            self._lines.lines.append(self._tail)
+            self._tail = b"" if self.binary else ""
+        self._lines.closed = True
+        if not self._seen_input:
+            return []
+        return list(self._sentences)
+
+
+class ConllParser(IncrementalParser):
+    reader = staticmethod(corpus_readers.read_conll)
+    bytes_reader = staticmethod(corpus_readers.read_conll_bytes)
+
+    @staticmethod
+    def is_sentence_end(line):
+        return not line.rstrip()
+
+
+class OslParser(IncrementalParser):
+    reader = staticmethod(corpus_readers.read_osl)
+    bytes_reader = staticmethod(corpus_readers.read_osl_bytes)
+
+    def __init__(self, delimiter, nr_of_fields, **kwargs):
+        super().__init__(delimiter=delimiter, nr_of_fields=nr_of_fields, **kwargs)
+
+    @staticmethod
+    def is_sentence_end(line):
+        return len(line) > 0
+
+
+class TsvParser(IncrementalParser):
+    reader = staticmethod(corpus_readers.read_tsv)
+    bytes_reader = staticmethod(corpus_readers.read_tsv_bytes)
+
+    @staticmethod
+    def is_sentence_end(line):
+        return len(line) == 0
+
+
+class VrtParser(IncrementalParser):
+    reader = staticmethod(corpus_readers.read_vrt)
+    bytes_reader = staticmethod(corpus_readers.read_vrt_bytes)
+
+    @staticmethod
+    def is_sentence_end(line):
+        return line == "</s>" or line == b"</s>"
+
+
+class IncrementalWriter:
+    """Counterpart to IncrementalParser: write() formats sentences with
+    the writer from corpus_writers and returns the encoded output.
+
+    """
+    writer = None
+    bytes_writer = None
+
+    def __init__(self, binary=False, encoding="utf-8", **kwargs):
+        self.binary = binary
+        self.encoding = encoding
+        self._kwargs = kwargs
+
+    def write(self, sentences):
+        """Return the encoded output for sentences (an iterable of
+        Sentences), including the final newline.
+
+        """
+        if self.binary:
+            lines = list(self.bytes_writer(sentences, **self._kwargs))
+            if not lines:
+                return b""
+            lines.append(b"")
+            return b"\n".join(lines)
+        lines = list(self.writer(sentences, **self._kwargs))
+        if not lines:
+            return b""
+        lines.append("")
+        return "\n".join(lines).encode(self.encoding)
+
+    def close(self):
+        """Return the output that is still pending (the writers do not
+        buffer, i.e. this is always empty).
+
+        """
+        return b""
+
+
+class ConllWriter(IncrementalWriter):
+    writer = staticmethod(corpus_writers.write_conll)
+    bytes_writer = staticmethod(corpus_writers.write_conll_bytes)
+
+
+class OslWriter(IncrementalWriter):
+    writer = staticmethod(corpus_writers.write_osl)
+    bytes_writer = staticmethod(corpus_writers.write_osl_bytes)
+
+    def __init__(self, delimiter, **kwargs):
+        super().__init__(delimiter=delimiter, **kwargs)
+
+
+class TsvWriter(IncrementalWriter):
+    writer = staticmethod(corpus_writers.write_tsv)
+    bytes_writer = staticmethod(corpus_writers.write_tsv_bytes)
+
+
+class VrtWriter(IncrementalWriter):
+    writer = staticmethod(corpus_writers.write_vrt)
+    bytes_writer = staticmethod(corpus_writers.write_vrt_bytes)
+
+
+PARSERS = {"conll": ConllParser, "osl": OslParser, "tsv": TsvParser, "vrt": VrtParser}
+WRITERS = {"conll": ConllWriter, "osl": OslWriter, "tsv": TsvWriter, "vrt": VrtWriter}
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import functools
+import io
+import mmap
+import os
+import re
+import sqlite3
+
+from corpconv import corpus_readers
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def _readers(delimiter, nr_of_fields, binary):
+    if binary:
+        return {"conll": corpus_readers.read_conll_mmap,
+                "osl": functools.partial(corpus_readers.read_osl_mmap, delimiter=delimiter, nr_of_fields=nr_of_fields),
+                "tsv": corpus_readers.read_tsv_mmap,
+                "vrt": corpus_readers.read_vrt_mmap}
+    return {"conll": corpus_readers.read_conll,
+            "osl": functools.partial(corpus_readers.read_osl, delimiter=delimiter, nr_of_fields=nr_of_fields),
+            "tsv": corpus_readers.read_tsv,
+            "vrt": corpus_readers.read_vrt}
+
+
+def _sentence_ids(buf, spans, input_format):
+    """Yield the ID of every sentence, parsing only those sentences that
+    may carry an explicit ID.
+
+    """
+    if input_format in ("osl", "tsv"):
+        for ordinal, span in enumerate(spans, start=1):
+            yield "s%d" % ordinal, span
+        return
+    reader = _readers(None, None, True)[input_format]
+    for ordinal, (start, end) in enumerate(spans, start=1):
+        sentence = next(reader(buf[start:end], first_sentence=ordinal))
+        yield sentence.id.decode("utf-8"), (start, end)
+
+
+def build_index(path, input_format, output=None):
+    """Build a sidecar index for the uncompressed corpus file at path.
+
+    The index is an SQLite database (by default path + ".idx") that
+    maps the ordinal number and the ID of every sentence to its byte
+    offset and length.
+
+    """
+    if output is None:
+        output = index_path(path)
+    if os.path.exists(output):
+        os.remove(output)
+    connection = sqlite3.connect(output)
+    with connection:
+        connection.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)")
+        connection.execute("CREATE TABLE sentences (ordinal INTEGER PRIMARY KEY, id TEXT, offset INTEGER, length INTEGER)")
+        stat = os.stat(path)
+        connection.executemany("INSERT INTO metadata VALUES (?, ?)", [("format", input_format), ("size", str(stat.st_size)), ("mtime", str(stat.st_mtime))])
+        if stat.st_size > 0:
+            with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                spans = corpus_readers.sentence_spans(mm, input_format)
+                rows = ((ordinal, sentence_id, start, end - start) for ordinal, (sentence_id, (start, end)) in enumerate(_sentence_ids(mm, spans, input_format), start=1))
+                connection.executemany("INSERT INTO sentences VALUES (?, ?, ?, ?)", rows)
+        connection.execute("CREATE INDEX sentence_ids ON sentences (id)")
+    connection.close()
+
+
+class IndexedCorpus:
+    """Random access to the sentences of an indexed corpus file.
+
+    Sentences are addressed by ID or by their zero-based position,
+    e.g. corpus["doc42-s17"] or corpus[100:200]. With binary=True,
+    the sentences are returned like the bytes readers in
+    corpus_readers return them.
+
+    """
+    def __init__(self, path, delimiter="\t", nr_of_fields=None, binary=False, index=None):
+        if index is None:
+            index = index_path(path)
+        if not os.path.exists(index):
+            raise FileNotFoundError("No index for %s (run corpconv index first)" % path)
+        self._connection = sqlite3.connect(index)
+        metadata = dict(self._connection.execute("SELECT key, value FROM metadata"))
+        self.input_format = metadata["format"]
+        stat = os.stat(path)
+        if int(metadata["size"]) != stat.st_size or metadata.get("mtime") != str(stat.st_mtime):
+            self._connection.close()
+            raise ValueError("Index %s is out of date" % index)
+        self._binary = binary
+        self._reader = _readers(delimiter, nr_of_fields, binary)[self.input_format]
+        self._fh = open(path, "rb")
+        self._mm = None
+        if int(metadata["size"]) > 0:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._length = self._connection.execute("SELECT COUNT(*) FROM sentences").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._fh.close()
+        self._connection.close()
+
+    def __len__(self):
+        return self._length
+
+    def _read(self, ordinal, offset, length):
+        data = self._mm[offset:offset + length]
+        if self._binary:
+            return next(self._reader(data, first_sentence=ordinal))
+        return next(self._reader(io.StringIO(data.decode("utf-8")), first_sentence=ordinal))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step == 1:
+                return list(self.sentences(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if isinstance(key, int):
+            if key < 0:
+                key += self._length
+            if not 0 <= key < self._length:
+                raise IndexError("sentence index out of range")
+            row = self._connection.execute("SELECT ordinal, offset, length FROM sentences WHERE ordinal = ?", (key + 1,)).fetchone()
+        else:
+            if isinstance(key, bytes):
+                key = key.decode("utf-8")
+            row = self._connection.execute("SELECT ordinal, offset, length FROM sentences WHERE id = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._read(*row)
+
+    def sentences(self, start=0, stop=None):
+        """Yield the sentences from position start up to (excluding) stop."""
+        if stop is None:
+            stop = self._length
+        rows = self._connection.execute("SELECT ordinal, offset, length FROM sentences WHERE ordinal > ? AND ordinal <= ? ORDER BY ordinal", (start, stop))
+        for row in rows:
+            yield self._read(*row)
+
+    def select(self, skip=0, head=None, every=None, id_pattern=None):
+        """Yield the sentences selected by the position criteria and the
+        ID pattern of a filters.SentenceFilter (see there), reading
+        only these sentences from the corpus file.
+
+        """
+        query = "SELECT ordinal, offset, length FROM sentences WHERE ordinal > ?"
+        parameters = [skip]
+        if head is not None:
+            query += " AND ordinal <= ?"
+            parameters.append(skip + head)
+        if every is not None:
+            query += " AND (ordinal - ? - 1) % ? = 0"
+            parameters.extend([skip, every])
+        if id_pattern is not None:
+            if isinstance(id_pattern, str):
+                id_pattern = re.compile(id_pattern)
+            self._connection.create_function("id_matches", 1, lambda sentence_id: id_pattern.search(sentence_id) is not None, deterministic=True)
+            query += " AND id_matches(id)"
+        for row in self._connection.execute(query + " ORDER BY ordinal", parameters):
+            yield self._read(*row)
+
+    def by_ids(self, sentence_ids):
+        """Yield the sentences with the given IDs in the given order."""
+        for sentence_id in sentence_ids:
+            yield self[sentence_id]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import heapq
+import os
+
+from corpconv import compression
+
+
+ID_MODES = ("renumber", "prefix", "keep")
+
+
+def source_name(path):
+    """Name of the input file path used for prefixing sentence IDs: the
+    file name without compression and format extensions.
+
+    """
+    name = os.path.basename(path)
+    stem, extension = os.path.splitext(name)
+    if extension.lower() in compression.EXTENSIONS:
+        stem = os.path.splitext(stem)[0]
+    return stem
+
+
+def read_file(path, reader, binary=False):
+    """Yield the sentences of the (possibly compressed) file path read
+    with reader, one of the streaming readers from corpus_readers.
+
+    """
+    import io
+    with compression.open_input(path) as fh:
+        yield from reader(fh if binary else io.TextIOWrapper(fh, encoding="utf-8"))
+
+
+def relabel(sentences, new_id):
+    """Replace the generated IDs of sentences, i.e. those of the form
+    s<position in sentences>, with new_id(position).
+
+    An ID that was given in the input is replaced as well if it happens
+    to look exactly like the generated one.
+
+    """
+    for ordinal, sentence in enumerate(sentences, start=1):
+        sentence_id = sentence.id
+        generated = (b"s%d" if isinstance(sentence_id, bytes) else "s%d") % ordinal
+        if sentence_id == generated:
+            sentence = sentence._replace(id=new_id(ordinal, sentence_id))
+        yield sentence
+
+
+def _prefixed(sentences, name):
+    def new_id(ordinal, sentence_id):
+        if isinstance(sentence_id, bytes):
+            return name.encode("utf-8") + b"-" + sentence_id
+        return name + "-" + sentence_id
+    return relabel(sentences, new_id)
+
+
+def concatenate(sources, names, ids="renumber"):
+    """Yield the sentences of sources (iterables of Sentences) one
+    after another.
+
+    ids determines what happens to generated sentence IDs (which start
+    at s1 in every source): "renumber" continues the numbering across
+    sources, "prefix" prefixes them with the name of the source and
+    "keep" leaves them alone.
+
+    """
+    offset = 0
+    for sentences, name in zip(sources, names):
+        if ids == "prefix":
+            yield from _prefixed(sentences, name)
+        elif ids == "renumber":
+            new_id = lambda ordinal, sentence_id, offset=offset: (b"s%d" if isinstance(sentence_id, bytes) else "s%d") % (offset + ordinal)
+            n = 0
+            for sentence in relabel(sentences, new_id):
+                n += 1
+                yield sentence
+            offset += n
+        else:
+            yield from sentences
+
+
+def _check_sorted(sentences, name):
+    previous = None
+    for sentence in sentences:
+        if previous is not None and sentence.id < previous:
+            raise ValueError("%s is not sorted by sentence ID (%r after %r)" % (name, sentence.id, previous))
+        previous = sentence.id
+        yield sentence
+
+
+def merge_sorted(sources, names, ids="keep"):
+    """Merge sources (iterables of Sentences) that are each sorted by
+    sentence ID (as strings, like sort(1) in the C locale) into one
+    sorted stream, holding only one sentence per source in memory.
+    ValueError is raised if a source turns out not to be sorted.
+
+    ids is "prefix" or "keep" (see concatenate); generated IDs cannot
+    be renumbered, as the numbering would have to be known before the
+    sentences are ordered.
+
+    """
+    if ids == "renumber":
+        raise ValueError("generated IDs cannot be renumbered in a sorted merge")
+    if ids == "prefix":
+        sources = [_prefixed(sentences, name) for sentences, name in zip(sources, names)]
+    streams = [_check_sorted(sentences, name) for sentences, name in zip(sources, names)]
+    return heapq.merge(*streams, key=lambda sentence: sentence.id)
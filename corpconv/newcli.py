@@ -1,23 +1,26 @@
 #!/usr/bin/env python3
 
 import argparse
-import functools
-import logging
+import io
+import sys
 
-import reader
-import writer
+from corpconv import compression
+from corpconv import diagnostics
+from corpconv import output
+from corpconv import reader
+from corpconv import writer
 
 # format, --only-tokens, delimiter, number of fields
 
 
-def arguments():
-    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter, description="Convert a corpus from a given input format to the desired output format.", epilog="""This converter can convert between corpus formats that can be expressed using the following model:
+def arguments(argv=None):
+    parser = argparse.ArgumentParser(prog="corpconv generic", formatter_class=argparse.RawDescriptionHelpFormatter, description="Convert a corpus from a given input format to the desired output format.", epilog="""This converter can convert between corpus formats that can be expressed using the following model:
 - A corpus consists of sentences that are separated by a sentence delimiter.
 - A sentence consists of tokens that are separated by a token delimiter.
 - A token consists of fields (e.g. word form, part of speech, lemma, …) that are separated by a field delimiter.
 Sentences and tokens may have IDs and fields may have missing values.
 
-When converting from a format that does not have IDs to one that has, IDs of the form '[st]\d+' will be generated.
+When converting from a format that does not have IDs to one that has, IDs of the form '[st]\\d+' will be generated.
 
 The input and output formats are specified via a six-character string. The six characters represent the choices for sentence delimiter, token delimiter, field delimiter, sentence ID, token ID, and missing values.
 
@@ -53,8 +56,14 @@ Missing values:
     parser.add_argument("-o", "--output-format", type=parse_format_string, required=True, help="Output format.")
     parser.add_argument("--xml-tag", default="s", help="XML tag that encloses sentences. Default: s")
     parser.add_argument("--xml-id", default="id", help="XML attribute that contains the sentence ID. Default: id")
-    parser.add_argument("FILE", type=argparse.FileType("r"), help="The input file")
-    args = parser.parse_args()
+    parser.add_argument("--strict", action="store_true", help="Stop at the first problem in the input (wrong number of fields, missing IDs, empty lines, …).")
+    parser.add_argument("--max-examples", type=int, default=diagnostics.DEFAULT_MAX_EXAMPLES, help="Number of problems of each type that are logged with their line numbers; further problems are only counted. Default: %(default)d")
+    parser.add_argument("--diagnostics-format", choices=["text", "json"], default="text", help="Format of the report on the problems in the input that is printed at the end. Default: text")
+    parser.add_argument("--diagnostics-out", help="Write the report to this file instead of STDERR.")
+    parser.add_argument("-O", "--output", default="-", help="Output file (default: STDOUT). Output is compressed if the file name ends in .gz, .bz2, .xz or .zst.")
+    parser.add_argument("--buffer-size", type=int, default=output.DEFAULT_BUFFER_SIZE, help="Size of the output buffer in bytes (default: %(default)d).")
+    parser.add_argument("FILE", help="The input file (\"-\" for STDIN). gzip, bz2, xz and zstd compressed files are decompressed transparently.")
+    args = parser.parse_args(argv)
     return args
 
 
@@ -94,34 +103,29 @@ def parse_format_string(format_string):
     return format_string
 
 
-def read_sentences(corpus, format_string, args):
-    sent_del, tok_del, field_del, sent_id, tok_id, missing = format_string
-    Sentence = collections.namedtuple("Sentence", ["counter", "tokens"])
-    sentence_counter = 0
-    if sent_del == "e":
-        lines = []
-        for line in corpus:
-            line = line.rstrip()
-            if line == "":
-                sentence_counter += 1
-                yield Sentence(sentence_counter, lines)
-                lines = []
-            else:
-                lines.append(line)
-        if line != "":
-            logging.warning("Badly formatted file (missing empty line at end of file)!")
-            sentence_counter += 1
-            yield Sentence(sentence_counter, lines)
-    elif sent_del == "n":
-        pass
-    elif sent_del == "x":
-        pass
-
-
-def main():
-    args = arguments()
-    sentences = reader.read_sentences(args.FILE, args.input_format, args)
-    writer.write_sentences(sentences, args.output_format, args)
+def main(argv=None):
+    args = arguments(argv)
+    problems = diagnostics.Diagnostics(args.max_examples, args.strict)
+    try:
+        infile = compression.open_input(args.FILE)
+        outfile = compression.open_output(args.output)
+    except (OSError, RuntimeError) as e:
+        sys.exit("Cannot open file: %s" % e)
+    try:
+        with infile:
+            sentences = reader.read_sentences(io.TextIOWrapper(infile, encoding="utf-8"), args.input_format, args, problems)
+            writer.write_sentences(sentences, args.output_format, args, outfile, args.buffer_size)
+    except diagnostics.DiagnosticError as e:
+        sys.exit("Error: %s" % e)
+    finally:
+        if outfile is not sys.stdout.buffer:
+            outfile.close()
+    if problems or args.diagnostics_out is not None:
+        if args.diagnostics_out is not None:
+            with open(args.diagnostics_out, "w") as fh:
+                problems.report(args.diagnostics_format, fh)
+        else:
+            problems.report(args.diagnostics_format)
 
 
 if __name__ == "__main__":
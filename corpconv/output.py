@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+
+def write_buffered(chunks, fh, buffer_size=DEFAULT_BUFFER_SIZE, encoding="utf-8"):
+    """Write newline-terminated chunks to the binary file handle fh.
+
+    Chunks are usually the lines produced by the writers in
+    corpus_writers, but may also be whole sentences (or batches of
+    sentences) containing embedded newlines. They are collected until
+    roughly buffer_size characters have accumulated and then written
+    with a single call.
+
+    """
+    buf = []
+    size = 0
+    for chunk in chunks:
+        buf.append(chunk)
+        size += len(chunk) + 1
+        if size >= buffer_size:
+            buf.append("")
+            fh.write("\n".join(buf).encode(encoding))
+            buf = []
+            size = 0
+    if buf:
+        buf.append("")
+        fh.write("\n".join(buf).encode(encoding))
+    fh.flush()
+
+
+def write_buffered_bytes(chunks, fh, buffer_size=DEFAULT_BUFFER_SIZE):
+    """Like write_buffered, but for chunks that are already bytes."""
+    buf = []
+    size = 0
+    for chunk in chunks:
+        buf.append(chunk)
+        size += len(chunk) + 1
+        if size >= buffer_size:
+            buf.append(b"")
+            fh.write(b"\n".join(buf))
+            buf = []
+            size = 0
+    if buf:
+        buf.append(b"")
+        fh.write(b"\n".join(buf))
+    fh.flush()
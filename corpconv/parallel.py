@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+import collections
+import io
+import mmap
+import os
+import re
+
+from corpconv import output
+
+
+DEFAULT_CHUNK_SIZE = 64 << 20
+
+# Byte sequences that end a sentence in the respective input format.
+# Chunk boundaries are placed directly after them.
+SENTENCE_ENDS = {"conll": b"\n\n",
+                 "osl": b"\n",
+                 "tsv": b"\n\n",
+                 "vrt": b"\n</s>\n"}
+
+# Lines the readers in corpus_readers treat as sentence ends (after
+# universal newline translation); compiled on first use
+SENTENCE_END_LINES = {"conll": rb"^[^\S\n]*$",
+                      "tsv": rb"^\r?$",
+                      "vrt": rb"^</s>\r?$"}
+
+# The same for the bytes readers, which only strip "\n" (except for
+# conll)
+SENTENCE_END_LINES_BYTES = {"conll": rb"^[^\S\n]*$",
+                            "tsv": rb"^$",
+                            "vrt": rb"^</s>$"}
+
+
+def find_boundaries(path, input_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split the file into (start, end) byte ranges that begin and end at
+    sentence boundaries.
+
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return [(0, 0)]
+    sentence_end = SENTENCE_ENDS[input_format]
+    boundaries = [0]
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = chunk_size
+        while position < size:
+            idx = mm.find(sentence_end, max(0, position - len(sentence_end)))
+            if idx == -1:
+                break
+            position = idx + len(sentence_end)
+            if position >= size:
+                break
+            boundaries.append(position)
+            position += chunk_size
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def count_sentences(data, input_format, binary=False):
+    """Count the sentences the reader for input_format (the bytes
+    reader if binary is true) would yield for data (without the one it
+    adds for a missing final sentence end).
+
+    """
+    end_lines = SENTENCE_END_LINES_BYTES if binary else SENTENCE_END_LINES
+    if input_format == "osl":
+        n_lines = data.count(b"\n")
+        if data and not data.endswith(b"\n"):
+            n_lines += 1
+        n_empty = len(re.findall(end_lines["tsv"], data, re.MULTILINE))
+        if data.endswith(b"\n") or not data:
+            n_empty -= 1
+        return n_lines - n_empty
+    n_ends = len(re.findall(end_lines[input_format], data, re.MULTILINE))
+    if input_format != "vrt" and (data.endswith(b"\n") or not data):
+        n_ends -= 1
+    return n_ends
+
+
+def _read_chunk(path, start, end):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        return fh.read(end - start)
+
+
+def _count_chunk(task):
+    path, input_format, start, end, binary = task
+    return count_sentences(_read_chunk(path, start, end), input_format, binary)
+
+
+def _convert_chunk(task):
+    path, reader, writer, start, end, first_sentence, buffer_size, binary, statistics, count = task
+    buf = io.BytesIO()
+    if binary:
+        lines = io.BytesIO(_read_chunk(path, start, end))
+    else:
+        lines = io.StringIO(_read_chunk(path, start, end).decode("utf-8"), newline=None)
+    sentences = reader(lines, first_sentence=first_sentence)
+    if statistics is not None:
+        sentences = statistics.count(sentences)
+    counts = None
+    if count:
+        from corpconv import profiling
+        counts = profiling.Counts()
+        sentences = counts.count(sentences)
+    if binary:
+        output.write_buffered_bytes(writer(sentences), buf, buffer_size)
+    else:
+        output.write_buffered(writer(sentences), buf, buffer_size)
+    return buf.getvalue(), statistics, counts, end - start
+
+
+def _write_result(result, fh, statistics, counts):
+    data, chunk_statistics, chunk_counts, size = result
+    fh.write(data)
+    if statistics is not None:
+        statistics.merge(chunk_statistics)
+    if counts is not None:
+        counts.add(chunk_counts.sentences, chunk_counts.tokens, size)
+
+
+def convert_parallel(path, input_format, reader, writer, fh, jobs, chunk_size=DEFAULT_CHUNK_SIZE, buffer_size=output.DEFAULT_BUFFER_SIZE, binary=False, statistics=None, counts=None):
+    """Convert the file at path using a pool of jobs processes.
+
+    The file is cut into chunks of roughly chunk_size bytes at sentence
+    boundaries. In a first pass, the sentences in every chunk are
+    counted, so that the workers in the second pass know the number
+    of their first sentence and generated sentence IDs are the same as
+    in a sequential conversion. The converted chunks are written to
+    the binary file handle fh in their original order; at most 2 *
+    jobs chunks are in flight, so that converted chunks do not pile up
+    in memory if the output is slow.
+
+    reader and writer have to be picklable, i.e. module-level
+    functions or functools.partial objects of them. If binary is true,
+    they have to be the bytes variants from corpus_readers and
+    corpus_writers.
+
+    If statistics (an empty statistics.Statistics) is given, every
+    worker collects the statistics of its chunk in a copy of it, and
+    the copies are merged into statistics. Likewise, the numbers of
+    sentences and tokens and the size of every chunk are passed to
+    the add method of counts (e.g. a profiling.Profile) if given.
+
+    """
+    import copy
+    import multiprocessing
+    chunks = find_boundaries(path, input_format, chunk_size)
+    # statistics is updated while tasks are still being submitted
+    empty_statistics = copy.deepcopy(statistics)
+    with multiprocessing.Pool(jobs) as pool:
+        sentence_counts = pool.map(_count_chunk, [(path, input_format, start, end, binary) for start, end in chunks])
+        tasks = []
+        first_sentence = 1
+        for (start, end), count in zip(chunks, sentence_counts):
+            tasks.append((path, reader, writer, start, end, first_sentence, buffer_size, binary, empty_statistics, counts is not None))
+            first_sentence += count
+        # At most max_pending chunks are converted or waiting to be
+        # written at any time
+        max_pending = 2 * jobs
+        pending = collections.deque()
+        for task in tasks:
+            if len(pending) >= max_pending:
+                _write_result(pending.popleft().get(), fh, statistics, counts)
+            pending.append(pool.apply_async(_convert_chunk, (task,)))
+        while pending:
+            _write_result(pending.popleft().get(), fh, statistics, counts)
+    fh.flush()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import itertools
+import queue
+import threading
+
+from corpconv import output
+
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_QUEUE_DEPTH = 8
+
+_DONE = None
+
+
+class _Failure:
+    """Exception raised in a stage, passed on to the next stage."""
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def _batches(iterable, batch_size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _put(q, item, stop):
+    """Put item on the bounded queue q, blocking until there is room
+    or stop is set. Return False if stopped.
+
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q, stop, process=None):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if process is not None and not process.is_alive():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    raise RuntimeError("Conversion process exited with code %s" % process.exitcode)
+    return _DONE
+
+
+def _unbatch(q, stop, process=None):
+    while True:
+        batch = _get(q, stop, process)
+        if batch is _DONE:
+            return
+        if isinstance(batch, _Failure):
+            raise batch.exception
+        yield from batch
+
+
+def _feed(iterable, q, batch_size, stop, prepare=None):
+    """Put batches of the items of iterable on q, followed by _DONE, or
+    a _Failure if an exception occurs.
+
+    """
+    try:
+        for batch in _batches(iterable, batch_size):
+            if prepare is not None:
+                batch = prepare(batch)
+            if not _put(q, batch, stop):
+                return
+    except Exception as e:
+        _put(q, _Failure(e), stop)
+        return
+    _put(q, _DONE, stop)
+
+
+def _abandon(queues):
+    """Close multiprocessing queues whose other end may have stopped
+    reading, without waiting at exit for the data still buffered for
+    them to be sent.
+
+    """
+    for q in queues:
+        q.cancel_join_thread()
+        q.close()
+
+
+def _start_thread(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def _compose(stages, items):
+    for stage in stages:
+        items = stage(items)
+    return items
+
+
+def _split_lines(blocks, binary):
+    """Lines of the joined line batches sent to the process (split at
+    newlines only, unlike str.splitlines).
+
+    """
+    for block in blocks:
+        yield from io.BytesIO(block) if binary else io.StringIO(block, newline="\n")
+
+
+def _process_main(stages, in_queue, out_queue, stop, batch_size, binary, counts=None):
+    lines = _split_lines(_unbatch(in_queue, stop), binary)
+    if binary:
+        join = lambda batch: b"\n".join(batch) + b"\n"
+    else:
+        join = lambda batch: ("\n".join(batch) + "\n").encode("utf-8")
+    # Joined batches are sent as lists of one item, so that both
+    # processes can use _unbatch; the counts so far are sent after
+    # every batch
+    if counts is None:
+        prepare = lambda batch: [join(batch)]
+    else:
+        prepare = lambda batch: [join(batch), (counts.sentences, counts.tokens)]
+    try:
+        _feed(_compose(stages, lines), out_queue, batch_size, stop, prepare)
+    finally:
+        if stop.is_set():
+            _abandon([in_queue, out_queue])
+
+
+def convert_pipelined(lines, stages, fh, binary=False, executor="thread", batch_size=DEFAULT_BATCH_SIZE, queue_depth=DEFAULT_QUEUE_DEPTH, buffer_size=output.DEFAULT_BUFFER_SIZE, counts=None):
+    """Convert lines and write the result to the binary file handle fh,
+    running the input, the conversion stages and the output
+    concurrently.
+
+    stages is a list of functions that each take an iterable and
+    return an iterator, e.g. [reader, writer]; the last one yields the
+    output chunks. The stages are connected by queues of at most
+    queue_depth batches of batch_size items each, so that the memory
+    needed is bounded even if a stage is much faster than the next.
+
+    With the "thread" executor, reading the input and every stage run
+    in separate threads and the output is written by the calling
+    thread. As only one thread can run Python code at a time, this
+    helps mainly when the input or output is slow (network file
+    systems, compression). With the "process" executor, the stages run
+    in a separate process (they have to be picklable), while the
+    input is read by a thread and the output written by the calling
+    thread of this process.
+
+    If stages count the sentences and tokens in counts (a
+    profiling.Counts, e.g. with its count method as a stage), counts
+    is passed as well, so that the numbers counted in the other
+    process are copied to it with the process executor.
+
+    """
+    if executor == "process":
+        _convert_process(lines, stages, fh, binary, batch_size, queue_depth, counts)
+    else:
+        _convert_threads(lines, stages, fh, binary, batch_size, queue_depth, buffer_size)
+    fh.flush()
+
+
+def _convert_threads(lines, stages, fh, binary, batch_size, queue_depth, buffer_size):
+    stop = threading.Event()
+    q = queue.Queue(queue_depth)
+    _start_thread(_feed, lines, q, batch_size, stop)
+    try:
+        for stage in stages:
+            next_q = queue.Queue(queue_depth)
+            _start_thread(_feed, stage(_unbatch(q, stop)), next_q, batch_size, stop)
+            q = next_q
+        if binary:
+            output.write_buffered_bytes(_unbatch(q, stop), fh, buffer_size)
+        else:
+            output.write_buffered(_unbatch(q, stop), fh, buffer_size)
+    finally:
+        stop.set()
+
+
+def _convert_process(lines, stages, fh, binary, batch_size, queue_depth, counts):
+    import multiprocessing
+    stop = multiprocessing.Event()
+    in_queue = multiprocessing.Queue(queue_depth)
+    out_queue = multiprocessing.Queue(queue_depth)
+    process = multiprocessing.Process(target=_process_main, args=(stages, in_queue, out_queue, stop, batch_size, binary, counts), daemon=True)
+    process.start()
+    # Line batches are joined to reduce the pickling overhead
+    empty = b"" if binary else ""
+    _start_thread(_feed, lines, in_queue, batch_size, stop, lambda batch: [empty.join(batch)])
+    try:
+        for data in _unbatch(out_queue, stop, process):
+            if isinstance(data, tuple):
+                counts.sentences, counts.tokens = data
+            else:
+                fh.write(data)
+    finally:
+        stop.set()
+        process.join(1)
+        if process.is_alive():
+            process.terminate()
+        _abandon([in_queue, out_queue])
+
+
+def _source_main(source, q, stop, batch_size):
+    _feed(source(), q, batch_size, stop)
+
+
+def _source_process_main(source, q, stop, batch_size):
+    try:
+        _feed(source(), q, batch_size, stop)
+    finally:
+        if stop.is_set():
+            _abandon([q])
+
+
+@contextlib.contextmanager
+def concurrent_sources(sources, executor="thread", batch_size=DEFAULT_BATCH_SIZE, queue_depth=DEFAULT_QUEUE_DEPTH):
+    """Run every source (a function without arguments that returns an
+    iterable) in its own thread or process ("process" executor; the
+    sources have to be picklable) and yield a list of iterators over
+    their items, in the order of sources.
+
+    Items are passed in batches of batch_size through queues of at
+    most queue_depth batches, i.e. a source is only ahead of its
+    consumer by a bounded number of items.
+
+    """
+    if executor == "process":
+        import multiprocessing
+        stop = multiprocessing.Event()
+        queues = [multiprocessing.Queue(queue_depth) for _ in sources]
+        workers = [multiprocessing.Process(target=_source_process_main, args=(source, q, stop, batch_size), daemon=True) for source, q in zip(sources, queues)]
+        for worker in workers:
+            worker.start()
+    else:
+        stop = threading.Event()
+        queues = [queue.Queue(queue_depth) for _ in sources]
+        workers = [_start_thread(_source_main, source, q, stop, batch_size) for source, q in zip(sources, queues)]
+    try:
+        yield [_unbatch(q, stop, worker if executor == "process" else None) for q, worker in zip(queues, workers)]
+    finally:
+        stop.set()
+        if executor == "process":
+            for worker in workers:
+                worker.join(1)
+                if worker.is_alive():
+                    worker.terminate()
+            _abandon(queues)
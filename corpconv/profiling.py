@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class Stage:
+    __slots__ = ("name", "items", "cumulative")
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        # Time spent in this stage and all stages before it
+        self.cumulative = 0.0
+
+
+class Counts:
+    """Numbers of sentences and tokens converted. Unlike a Profile, it
+    can be passed to other processes, e.g. in the stages of a
+    pipeline.
+
+    """
+    __slots__ = ("sentences", "tokens")
+
+    def __init__(self):
+        self.sentences = 0
+        self.tokens = 0
+
+    def count(self, sentences):
+        """Yield sentences, counting them and their tokens."""
+        for sentence in sentences:
+            self.sentences += 1
+            self.tokens += len(sentence.tokens)
+            yield sentence
+
+
+class CountingWriter:
+    """Binary file handle wrapper that counts the bytes written."""
+    def __init__(self, fh):
+        self.fh = fh
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return self.fh.write(data)
+
+    def flush(self):
+        self.fh.flush()
+
+
+class CountingReader(io.RawIOBase):
+    """Raw binary stream wrapper that adds the bytes read from fh to
+    the input size of profile.
+
+    """
+    def __init__(self, fh, profile):
+        self.fh = fh
+        self.profile = profile
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self.fh.readinto(b)
+        if n:
+            self.profile.input_size += n
+        return n
+
+
+class Profile:
+    """Counters and timers for the stages of a conversion.
+
+    Every stage is an iterator in the pipeline (lines, sentences,
+    output chunks) wrapped via wrap(), from upstream to downstream.
+    The time of a stage is the time spent in its iterator minus the
+    time spent in the stage before it; the time not spent in any
+    iterator is attributed to the output (no stages are reported for
+    parallel conversions, only totals). If progress is given, a
+    progress line is printed to fh every progress seconds.
+
+    The sentences and tokens are counted in counts, by the stage
+    wrapped with tokens=True or by the conversion itself where no
+    sentences are passed between stages (see transcoder.transcode and
+    the counts arguments in parallel and pipeline); conversions that
+    run in other processes report them with add(). The input is
+    counted in bytes by the file handle returned by wrap_input().
+
+    """
+    def __init__(self, total_size=None, progress=None, fh=sys.stderr):
+        self.stages = []
+        self.total_size = total_size
+        self.progress = progress
+        self.fh = fh
+        self.output = None
+        self.counts = Counts()
+        self.input_size = 0
+        self.start = time.perf_counter()
+        self.end = None
+        self._next_report = self.start + progress if progress else None
+
+    def wrap(self, iterable, name, tokens=False):
+        """Wrap a stage; count the sentences it yields and their tokens
+        if requested.
+
+        """
+        stage = Stage(name)
+        self.stages.append(stage)
+        return self._timed(iterable, stage, tokens)
+
+    def _timed(self, iterable, stage, tokens):
+        clock = time.perf_counter
+        counts = self.counts
+        iterator = iter(iterable)
+        while True:
+            t0 = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stage.cumulative += clock() - t0
+                return
+            t1 = clock()
+            stage.cumulative += t1 - t0
+            stage.items += 1
+            if tokens:
+                counts.sentences += 1
+                counts.tokens += len(item.tokens)
+            if self._next_report is not None and t1 >= self._next_report:
+                self._next_report = t1 + self.progress
+                self.report_progress(t1)
+            yield item
+
+    def add(self, sentences, tokens, size=0):
+        """Count sentences, tokens and bytes of input converted
+        elsewhere, e.g. a chunk converted by a worker process.
+
+        """
+        self.counts.sentences += sentences
+        self.counts.tokens += tokens
+        self.input_size += size
+        now = time.perf_counter()
+        if self._next_report is not None and now >= self._next_report:
+            self._next_report = now + self.progress
+            self.report_progress(now)
+
+    def wrap_input(self, fh):
+        """Wrap the binary input file handle fh so that the bytes read
+        from it are counted (before decoding, unlike the lines of a
+        stage).
+
+        """
+        return io.BufferedReader(CountingReader(fh, self))
+
+    def wrap_output(self, fh):
+        self.output = CountingWriter(fh)
+        return self.output
+
+    def finish(self):
+        self.end = time.perf_counter()
+
+    def report_progress(self, now):
+        elapsed = now - self.start
+        counts = self.counts
+        parts = ["%.1fs" % elapsed,
+                 "%d sentences, %d tokens (%.0f tokens/s)" % (counts.sentences, counts.tokens, counts.tokens / elapsed)]
+        if self.input_size:
+            parts.append("%.1f MB read (%.1f MB/s)" % (self.input_size / 1e6, self.input_size / 1e6 / elapsed))
+            if self.total_size:
+                done = min(self.input_size / self.total_size, 1.0)
+                parts.append("%.1f%%, ETA %.0fs" % (100 * done, elapsed * (1 - done) / done))
+        print("Progress: " + ", ".join(parts), file=self.fh, flush=True)
+
+    def summary(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        total = end - self.start
+        stages = []
+        previous = 0.0
+        for stage in self.stages:
+            stages.append({"name": stage.name, "seconds": stage.cumulative - previous, "items": stage.items})
+            previous = stage.cumulative
+        if stages:
+            stages.append({"name": "output", "seconds": total - previous, "items": None})
+        result = {"seconds": total, "stages": stages,
+                  "sentences": self.counts.sentences,
+                  "tokens": self.counts.tokens,
+                  "tokens_per_second": self.counts.tokens / total if total > 0 else None,
+                  "input_size": self.input_size}
+        if self.output is not None:
+            result["output_bytes"] = self.output.size
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+            factor = 1 if sys.platform == "darwin" else 1024
+            rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+            result["peak_rss_bytes"] = rss * factor
+        return result
+
+    def report(self, fmt="text"):
+        summary = self.summary()
+        if fmt == "json":
+            print(json.dumps(summary), file=self.fh)
+            return
+        print("%-10s %10s %7s %12s" % ("stage", "seconds", "share", "items"), file=self.fh)
+        for stage in summary["stages"]:
+            share = 100 * stage["seconds"] / summary["seconds"] if summary["seconds"] > 0 else 0
+            items = "" if stage["items"] is None else str(stage["items"])
+            print("%-10s %10.3f %6.1f%% %12s" % (stage["name"], stage["seconds"], share, items), file=self.fh)
+        print("%-10s %10.3f" % ("total", summary["seconds"]), file=self.fh)
+        print("%d sentences, %d tokens, %.0f tokens/s" % (summary["sentences"], summary["tokens"], summary["tokens_per_second"] or 0), file=self.fh)
+        if "output_bytes" in summary:
+            print("%d bytes written" % summary["output_bytes"], file=self.fh)
+        if "peak_rss_bytes" in summary:
+            print("peak memory (RSS): %.1f MB" % (summary["peak_rss_bytes"] / 1e6), file=self.fh)
@@ -1,197 +1,181 @@
 #!/usr/bin/env python3
 
 import collections
+import functools
 import logging
 import re
 
+from corpconv import diagnostics
+
 Sentence = collections.namedtuple("Sentence", ["id", "tokens"])
 Token = collections.namedtuple("Token", ["id", "fields"])
-RawSentence = collections.namedtuple("RawSentence", ["id", "lines"])
-Line = collections.namedtuple("Line", ["number", "text"])
+
+DELIMITERS = {"l": "\n", "s": " ", "t": "\t"}
+
+
+def read_sentences(corpus, format_string, args, diagnostics=None):
+    read = compile_reader(format_string, args.xml_tag, args.xml_id)
+    return read(corpus, diagnostics)
+
+
+def _indent(lines, level):
+    return ["    " * level + line for line in lines]
+
+
+def _token_code(field_del, tok_id, missing):
+    """Code that turns tok (in line tok_line) into a Token and appends it
+    to tokens.
+
+    """
+    code = []
+    if field_del == "n":
+        code.append("fields = [tok]")
+    else:
+        code.append("fields = tok.split(%r)" % DELIMITERS.get(field_del, field_del))
+    code.extend(["if n_fields is None:",
+                 "    n_fields = len(fields)",
+                 "if len(fields) != n_fields:",
+                 "    issue('field-count', tok_line, '%d fields instead of %d', len(fields), n_fields)"])
+    if tok_id == "n":
+        code.append("token_id = 't%d' % token_number")
+    else:
+        code.append("token_id = fields.pop(%d)" % int(tok_id))
+    if missing == "n":
+        code.extend(["if '' in fields:",
+                     "    issue('empty-field', tok_line, 'empty field')"])
+    elif missing != "e":
+        code.extend(["if %r in fields:" % missing,
+                     "    fields = ['' if f == %r else f for f in fields]" % missing])
+    code.append("tokens.append(Token(token_id, fields))")
+    return code
 
 
-def read_sentences(corpus, format_string, args):
+def _sentence_end_code(tok_del, field_del, sent_id, tok_id, missing):
+    """Code that turns the collected lines into a sentence and yields it."""
+    code = ["sentence_counter += 1",
+            "if sentence_id is None:"]
+    if sent_id != "n":
+        code.append("    issue('missing-sentence-id', line_counter, 'missing ID for sentence %d', sentence_counter)")
+    code.extend(["    sentence_id = 's%d' % sentence_counter",
+                 "tokens = []"])
+    if tok_del == "l":
+        code.append("for token_number, (tok_line, tok) in enumerate(lines, start=1):")
+        code.extend(_indent(_token_code(field_del, tok_id, missing), 1))
+        code.append("yield Sentence(sentence_id, tokens)")
+    else:
+        code.extend(["if len(lines) > 1:",
+                     "    issue('multi-line-sentence', lines[0][0], 'sentence %s spans multiple lines (%d–%d), skipping it', sentence_id, lines[0][0], lines[-1][0])",
+                     "else:",
+                     "    if lines:",
+                     "        tok_line, text = lines[0]",
+                     "        for token_number, tok in enumerate(text.split(%r), start=1):" % DELIMITERS[tok_del]])
+        code.extend(_indent(_token_code(field_del, tok_id, missing), 3))
+        code.append("    yield Sentence(sentence_id, tokens)")
+    code.extend(["lines = []",
+                 "sentence_id = None"])
+    if sent_id == "c":
+        code.append("expect_id = True")
+    return code
+
+
+def _line_id_code(sent_id):
+    """Code that extracts a sentence ID from the current line."""
+    if sent_id == "c":
+        return ["if expect_id:",
+                "    m = sent_id_pattern.search(line)",
+                "    if m:",
+                "        sentence_id = m.group(1)",
+                "        expect_id = False",
+                "        continue",
+                "    else:",
+                "        issue('expected-sentence-id', line_counter, 'expected sentence ID')"]
+    elif sent_id in ("s", "t"):
+        return ["sentence_id, line = line.split(%r, maxsplit=1)" % DELIMITERS[sent_id]]
+    return []
+
+
+def _reader_source(format_string):
     sent_del, tok_del, field_del, sent_id, tok_id, missing = format_string
-    if tok_id != "n":
-        tok_id = int(tok_id)
+    sentence_end = _sentence_end_code(tok_del, field_del, sent_id, tok_id, missing)
+    code = ["def read(corpus, diagnostics=None):",
+            "    owned = diagnostics is None",
+            "    if owned:",
+            "        diagnostics = Diagnostics()",
+            "    issue = diagnostics.issue",
+            "    n_fields = None",
+            "    sentence_counter = 0",
+            "    sentence_id = None",
+            "    expect_id = True",
+            "    lines = []",
+            "    line = ''",
+            "    line_counter = 0",
+            "    for line_counter, line in enumerate(corpus, start=1):",
+            "        line = line.rstrip('\\n')"]
     if sent_del == "e":
-        raw_sentences = _read_empty_line(corpus, sent_id)
-    elif sent_del == "n":
-        raw_sentences = _read_newline(corpus, sent_id)
+        code.extend(["        if line == '':",
+                     "            # Ignore consecutive empty lines",
+                     "            if len(lines) == 0:",
+                     "                if line_counter == 1:",
+                     "                    issue('empty-line', line_counter, 'empty line at beginning of file')",
+                     "                else:",
+                     "                    issue('empty-line', line_counter, 'consecutive empty lines')",
+                     "                continue"])
+        code.extend(_indent(sentence_end, 3))
+        code.append("            continue")
+        code.extend(_indent(_line_id_code(sent_id), 2))
+        code.extend(["        lines.append((line_counter, line))",
+                     "    if line != '':",
+                     "        issue('missing-final-empty-line', line_counter, 'missing empty line at end of file')"])
+        code.extend(_indent(sentence_end, 2))
+    elif sent_del == "l":
+        code.extend(["        if line == '':",
+                     "            issue('empty-line', line_counter, 'ignoring empty line')",
+                     "            continue"])
+        code.extend(_indent(_line_id_code(sent_id), 2))
+        code.append("        lines.append((line_counter, line))")
+        code.extend(_indent(sentence_end, 2))
     elif sent_del == "x":
-        raw_sentences = _read_xml(corpus, sent_id, args)
-    raw_tokens = _read_raw_tokens(raw_sentences, tok_del)
-    sentences = _read_fields(raw_tokens, field_del, tok_id, missing)
-    return sentences
-
-
-def _read_empty_line(corpus, sent_id):
-    pattern = re.compile(r'^# sent_id = (.+)$')
-    expect_id = True
-    sentence_counter = 0
-    sentence_id = None
-    lines = []
-    for line_counter, line in enumerate(corpus, start=1):
-        line = line.rstrip("\n")
-        if line == "":
-            # Ignore consecutive empty lines
-            if len(lines) == 0:
-                if line_counter == 1:
-                    logging.warning("Empty line at beginning of file (line %d)", line_counter)
-                else:
-                    logging.warning("Consecutive empty lines (line %d)", line_counter)
-                continue
-            sentence_counter += 1
-            if sentence_id is None:
-                if sent_id != "n":
-                    logging.warning("Missing ID for sentence %d (line %d)", sentence_counter, line_counter)
-                sentence_id = "s%d" % sentence_counter
-            yield RawSentence(sentence_id, lines)
-            lines = []
-            expect_id = True
-            sentence_id = None
-            continue
-        if sent_id == "c":
-            if expect_id:
-                m = re.search(pattern, line)
-                if m:
-                    sentence_id = m.group(1)
-                    expect_id = False
-                    continue
-                else:
-                    logging.warning("Badly formatted file (expected sentence ID in line %d)", line_counter)
-        if sent_id == "s":
-            sentence_id, line = line.split(" ", maxsplit=1)
-        elif sent_id == "t":
-            sentence_id, line = line.split("\t", maxsplit=1)
-        lines.append(Line(line_counter, line))
-    if line != "":
-        logging.warning("Badly formatted file (missing empty line at end of file)!")
-        sentence_counter += 1
-        if sentence_id is None:
-            if sent_id != "n":
-                logging.warning("Missing ID for sentence %d (line %d)", sentence_counter, line_counter)
-            sentence_id = "s%d" % sentence_counter
-        yield RawSentence(sentence_id, lines)
-
-
-def _read_newline(corpus, sent_id):
-    pattern = re.compile(r'^# sent_id = (.+)$')
-    expect_id = True
-    sentence_counter = 0
-    line_counter = 0
-    sentence_counter = 0
-    sentence_id = None
-    for line_counter, line in enumerate(corpus, start=1):
-        line = line.rstrip("\n")
-        if line == "":
-            logging.warning("Ignore empty line (%d)" % line_counter)
-            continue
-        if sent_id == "c":
-            if expect_id:
-                m = re.search(pattern, line)
-                if m:
-                    sentence_id = m.group(1)
-                    expect_id = False
-                    continue
-                else:
-                    logging.warning("Badly formatted file (expected sentence ID in line %d)", line_counter)
-        elif sent_id == "s":
-            sentence_id, line = line.split(" ", maxsplit=1)
-        elif sent_id == "t":
-            sentence_id, line = line.split("\t", maxsplit=1)
-        sentence_counter += 1
-        if sentence_id is None:
-            if sent_id != "n":
-                logging.warning("Missing ID for sentence %d (line %d)", sentence_counter, line_counter)
-            sentence_id = "s%d" % sentence_counter
-        yield RawSentence(sentence_id, [Line(line_counter, line)])
-        expect_id = True
-        sentence_id = None
-
-
-def _read_xml(corpus, sent_id, args):
-    tagname = args.xml_tag
-    id_attribute = args.xml_id
-    # regex taken from Goyvaerts and Levithan's Regular Expressions
-    # Cookbook, 2nd ed., section 9.7
-    pattern = re.compile(r"""<%s\s(?:[^>"']|"[^"]*"|'[^']*')*?\b%s\s*=\s*("[^"]*"|'[^']*')(?:[^>"']|"[^"]*"|'[^']*')*>""" % (tagname, id_attribute))
-    sentence_counter = 0
-    line_counter = 0
-    sentence_id = None
-    lines = []
-    for line_counter, line in enumerate(corpus, start=1):
-        line = line.rstrip("\n")
-        if line == "</%s>" % args.xml_tag:
-            sentence_counter += 1
-            if sentence_id is None:
-                if sent_id != "n":
-                    logging.warning("Missing ID for sentence %d (line %d)", sentence_counter, line_counter)
-                sentence_id = "s%d" % sentence_counter
-            yield RawSentence(sentence_id, lines)
-            lines = []
-            sentence_id = None
-        elif sent_id == "x" and (line == "<%s>" % tagname or line.startswith("<%s " % tagname)):
-            m = re.search(pattern, line)
-            if m:
-                sentence_id = m.group(1)
-            else:
-                logging.warning("Badly formatted file (expected sentence ID in line %d)", line_counter)
-        elif line.startswith("<"):
-            pass
-        elif line == "":
-            logging.warning("Ignore empty line (%d)" % line_counter)
-        else:
-            if sent_id == "s":
-                sentence_id, line = line.split(" ", maxsplit=1)
-            elif sent_id == "t":
-                sentence_id, line = line.split("\t", maxsplit=1)
-            lines.append(Line(line_counter, line))
-
-
-def _read_raw_tokens(raw_sentences, tok_del):
-    for sentence_id, lines in raw_sentences:
-        if tok_del == "s" or tok_del == "t":
-            if len(lines) > 1:
-                logging.warning("Sentence %s spans multiple lines (%d–%d). Skipping sentence.", sentence_id, lines[0].number, lines[-1].number)
-                continue
-            if tok_del == "s":
-                toks = lines[0].split(" ")
-            elif tok_del == "t":
-                toks = lines[0].split("\t")
-            tok_lines = [lines[0].number for t in toks]
-        elif tok_del == "l":
-            toks = [l.text for l in lines]
-            tok_lines = [l.number for l in lines]
-        yield sentence_id, toks, tok_lines
-
-
-def _read_fields(raw_tokens, field_del, tok_id, missing):
-    n_fields = None
-    for sentence_id, toks, tok_lines in raw_tokens:
-        tokens = []
-        for token_number, (tok, tok_line) in enumerate(zip(toks, tok_lines), start=1):
-            if field_del == "n":
-                fields = [tok]
-            elif field_del == "s":
-                fields = tok.split(" ")
-            elif field_del == "t":
-                fields = tok.split("\t")
-            else:
-                fields = tok.split(field_del)
-            if n_fields is None:
-                n_fields = len(fields)
-            if len(fields) != n_fields:
-                logging.warning("Line %d has %d fields instead of %d!", tok_line, len(fields), n_fields)
-            if tok_id == "n":
-                token_id = "t%d" % token_number
-            else:
-                token_id = fields[tok_id]
-                fields = fields[:tok_id] + fields[tok_id + 1:]
-            if missing == "n":
-                if any(f == "" for f in fields):
-                    logging.warning("There is an empty field in line %d!", tok_line)
-            elif missing != "e":
-                fields = ["" if f == missing else f for f in fields]
-            tokens.append(Token(token_id, fields))
-        yield Sentence(sentence_id, tokens)
+        code.extend(["        if line == close_tag:"])
+        code.extend(_indent(sentence_end, 3))
+        if sent_id == "x":
+            code.extend(["        elif line == open_tag or line.startswith(open_tag_prefix):",
+                         "            m = sent_id_pattern.search(line)",
+                         "            if m:",
+                         "                sentence_id = m.group(1)[1:-1]",
+                         "            else:",
+                         "                issue('expected-sentence-id', line_counter, 'expected sentence ID')"])
+        code.extend(["        elif line.startswith('<'):",
+                     "            pass",
+                     "        elif line == '':",
+                     "            issue('empty-line', line_counter, 'ignoring empty line')",
+                     "        else:"])
+        code.extend(_indent(_line_id_code(sent_id), 3))
+        code.append("            lines.append((line_counter, line))")
+    code.extend(["    if owned and diagnostics.total() > diagnostics.max_examples:",
+                 "        logging.warning('%d issues in total: %s', diagnostics.total(), ', '.join('%s: %d' % item for item in sorted(diagnostics.counts.items())))"])
+    return "\n".join(code) + "\n"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_reader(format_string, xml_tag="s", xml_id="id"):
+    """Compile a reader for the given format string.
+
+    The returned function takes an iterable of lines and yields
+    Sentences. Its source is generated once per format string, so
+    that the loops over lines and tokens contain no branching on the
+    format.
+
+    """
+    namespace = {"logging": logging, "Diagnostics": diagnostics.Diagnostics, "Sentence": Sentence, "Token": Token}
+    sent_id = format_string[3]
+    if sent_id == "c":
+        namespace["sent_id_pattern"] = re.compile(r'^# sent_id = (.+)$')
+    elif sent_id == "x":
+        # regex taken from Goyvaerts and Levithan's Regular Expressions
+        # Cookbook, 2nd ed., section 9.7
+        namespace["sent_id_pattern"] = re.compile(r"""<%s\s(?:[^>"']|"[^"]*"|'[^']*')*?\b%s\s*=\s*("[^"]*"|'[^']*')(?:[^>"']|"[^"]*"|'[^']*')*>""" % (xml_tag, xml_id))
+    namespace["open_tag"] = "<%s>" % xml_tag
+    namespace["open_tag_prefix"] = "<%s " % xml_tag
+    namespace["close_tag"] = "</%s>" % xml_tag
+    exec(_reader_source(format_string), namespace)
+    return namespace["read"]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import zlib
+
+from corpconv import compression
+from corpconv import output
+
+
+DEFAULT_BATCH_SIZE = 100
+
+_END = object()
+
+
+def shard_path(template, number):
+    """Return the path of shard number (counted from 0).
+
+    If template contains a "{shard}" field (possibly with a format
+    spec, e.g. "train-{shard:04d}.tsv.gz"), it is filled in. Otherwise,
+    "-00000" etc. is inserted before the extensions of the file name,
+    i.e. corpus.conllu.gz becomes corpus-00000.conllu.gz.
+
+    """
+    if "{shard" in template:
+        return template.format(shard=number)
+    directory, name = os.path.split(template)
+    stem, extension = os.path.splitext(name)
+    if extension.lower() in compression.EXTENSIONS:
+        stem, format_extension = os.path.splitext(stem)
+        extension = format_extension + extension
+    return os.path.join(directory, "%s-%05d%s" % (stem, number, extension))
+
+
+def shard_of(sentence_id, shards):
+    """Deterministically assign a sentence to one of shards shards by
+    the CRC-32 of its ID (unlike hash(), this does not change between
+    runs).
+
+    """
+    if isinstance(sentence_id, str):
+        sentence_id = sentence_id.encode("utf-8")
+    return zlib.crc32(sentence_id) % shards
+
+
+class _Splitter:
+    """Splits a stream of sentences into consecutive shards.
+
+    shard() yields the sentences of the next shard. The writer for the
+    shard pulls a sentence only after it has produced all lines of the
+    previous one, so the output size counted by count_lines() is
+    accurate at sentence boundaries.
+
+    """
+    def __init__(self, sentences, max_sentences=None, max_tokens=None, max_bytes=None):
+        self._sentences = iter(sentences)
+        self.max_sentences = max_sentences
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.next = next(self._sentences, _END)
+
+    def _full(self):
+        return ((self.max_sentences is not None and self.n_sentences >= self.max_sentences)
+                or (self.max_tokens is not None and self.n_tokens >= self.max_tokens)
+                or (self.max_bytes is not None and self.n_bytes >= self.max_bytes))
+
+    def shard(self):
+        self.n_sentences = self.n_tokens = self.n_bytes = 0
+        # Every shard gets at least one sentence
+        while self.next is not _END:
+            sentence = self.next
+            self.n_sentences += 1
+            self.n_tokens += len(sentence.tokens)
+            yield sentence
+            self.next = next(self._sentences, _END)
+            if self._full():
+                return
+
+    def count_lines(self, lines):
+        for line in lines:
+            if isinstance(line, bytes) or line.isascii():
+                self.n_bytes += len(line) + 1
+            else:
+                self.n_bytes += len(line.encode("utf-8")) + 1
+            yield line
+
+
+def _close_in_background(fh):
+    """Close fh (waiting for its pending compressed blocks) in a
+    separate thread; return the thread.
+
+    """
+    thread = threading.Thread(target=fh.close)
+    thread.start()
+    return thread
+
+
+def write_sharded(sentences, writer, template, binary=False, max_sentences=None, max_tokens=None, max_bytes=None, hash_shards=None, open_output=compression.open_output, buffer_size=output.DEFAULT_BUFFER_SIZE):
+    """Write sentences with writer (from corpus_writers) to a number of
+    output files (see shard_path); return their paths.
+
+    A new shard is started when the current one has max_sentences
+    sentences, max_tokens tokens or max_bytes bytes of (uncompressed)
+    output, whichever comes first. Alternatively, with hash_shards,
+    every sentence is written to the shard determined by its ID (see
+    shard_of); all shards are then open at the same time and get the
+    sentences in batches.
+
+    Files are opened with open_output, i.e. they are compressed
+    according to their extension. The compression of a shard runs in
+    its own threads, and finished shards are closed in the background
+    while the next one is written.
+
+    """
+    write = output.write_buffered_bytes if binary else output.write_buffered
+    if hash_shards is not None:
+        return _write_hashed(sentences, writer, template, hash_shards, open_output, write, buffer_size)
+    splitter = _Splitter(sentences, max_sentences, max_tokens, max_bytes)
+    paths = []
+    closing = []
+    while splitter.next is not _END:
+        path = shard_path(template, len(paths))
+        paths.append(path)
+        fh = open_output(path)
+        lines = writer(splitter.shard())
+        if max_bytes is not None:
+            lines = splitter.count_lines(lines)
+        write(lines, fh, buffer_size)
+        closing.append(_close_in_background(fh))
+    for thread in closing:
+        thread.join()
+    return paths
+
+
+def _write_hashed(sentences, writer, template, shards, open_output, write, buffer_size):
+    paths = [shard_path(template, number) for number in range(shards)]
+    files = [open_output(path) for path in paths]
+    batches = [[] for _ in range(shards)]
+    try:
+        for sentence in sentences:
+            number = shard_of(sentence.id, shards)
+            batch = batches[number]
+            batch.append(sentence)
+            if len(batch) >= DEFAULT_BATCH_SIZE:
+                write(writer(batch), files[number], buffer_size)
+                batch.clear()
+        for number, batch in enumerate(batches):
+            if batch:
+                write(writer(batch), files[number], buffer_size)
+    finally:
+        for thread in [_close_in_background(fh) for fh in files]:
+            thread.join()
+    return paths
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+import array
+import collections
+import heapq
+import json
+import operator
+import zlib
+
+
+DEFAULT_TOP_K = 100
+DEFAULT_WIDTH = 1 << 16
+DEFAULT_DEPTH = 4
+
+# Number of distinct values counted exactly before they are added to a
+# sketch
+_PENDING = 10000
+
+
+class FrequencySketch:
+    """Approximate frequencies of the values of an open-class column in
+    bounded memory.
+
+    Values are counted in a count-min sketch of depth rows of width
+    counters; the estimated frequency of a value is the minimum of its
+    counters and is never too low. The top_k values with the highest
+    estimates are kept as candidates for the most frequent values.
+    Sketches with the same width and depth can be merged.
+
+    """
+    def __init__(self, top_k=DEFAULT_TOP_K, width=DEFAULT_WIDTH, depth=DEFAULT_DEPTH):
+        self.top_k = top_k
+        self.width = width
+        self.depth = depth
+        self._total = 0
+        self._table = [array.array("Q", bytes(8 * width)) for _ in range(depth)]
+        self._candidates = {}
+        self._pending = collections.Counter()
+
+    def update(self, values):
+        """Count the values (an iterable)."""
+        self._pending.update(values)
+        if len(self._pending) >= _PENDING:
+            self._flush()
+
+    def _cells(self, value):
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        # The rows use CRC-32 with different initial values, which (unlike
+        # hash()) are the same in every process
+        return [(row, zlib.crc32(data, seed) % self.width) for seed, row in enumerate(self._table)]
+
+    def _estimate(self, cells):
+        return min(row[i] for row, i in cells)
+
+    def _flush(self):
+        candidates = self._candidates
+        for value, n in self._pending.items():
+            cells = self._cells(value)
+            for row, i in cells:
+                row[i] += n
+            self._total += n
+            candidates[value] = self._estimate(cells)
+        self._pending.clear()
+        self._prune()
+
+    def _prune(self):
+        if len(self._candidates) > self.top_k:
+            self._candidates = dict(heapq.nlargest(self.top_k, self._candidates.items(), key=operator.itemgetter(1)))
+
+    @property
+    def total(self):
+        """The number of values counted."""
+        return self._total + sum(self._pending.values())
+
+    def estimate(self, value):
+        self._flush()
+        return self._estimate(self._cells(value))
+
+    def most_common(self, n=None):
+        """Return the (value, estimated frequency) pairs of the most
+        frequent values (at most top_k).
+
+        """
+        self._flush()
+        pairs = sorted(self._candidates.items(), key=operator.itemgetter(1), reverse=True)
+        return pairs if n is None else pairs[:n]
+
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("sketches of different sizes cannot be merged")
+        self._flush()
+        other._flush()
+        for row, other_row in zip(self._table, other._table):
+            row[:] = array.array("Q", map(operator.add, row, other_row))
+        self._total += other.total
+        for value in list(self._candidates) + list(other._candidates):
+            self._candidates[value] = self._estimate(self._cells(value))
+        self._prune()
+        return self
+
+    def __getstate__(self):
+        self._flush()
+        return self.__dict__
+
+
+class Statistics:
+    """Statistics of a stream of sentences: the number of sentences and
+    tokens, a histogram of the sentence lengths and the frequencies of
+    the values of some columns.
+
+    The values of the columns (indices of the token fields; by default
+    all columns except the sketched ones) are counted exactly; the
+    sketched columns (e.g. word forms) are counted approximately in
+    bounded memory (see FrequencySketch). names maps column indices to
+    the names used in the report.
+
+    Statistics of parts of a corpus (e.g. the chunks converted in
+    parallel) can be combined with merge().
+
+    """
+    def __init__(self, columns=None, sketched=(), top_k=DEFAULT_TOP_K, width=DEFAULT_WIDTH, depth=DEFAULT_DEPTH, names=None):
+        self.sketched = tuple(sketched)
+        self.top_k = top_k
+        self.width = width
+        self.depth = depth
+        self.names = names or {}
+        self.n_sentences = 0
+        self.n_tokens = 0
+        self.lengths = collections.Counter()
+        self.frequencies = {c: FrequencySketch(top_k, width, depth) for c in self.sketched}
+        self._columns = None
+        if columns is not None:
+            self._set_columns(columns)
+
+    def _set_columns(self, columns):
+        for c in columns:
+            if c not in self.frequencies:
+                self.frequencies[c] = collections.Counter()
+        self._columns = [(c, self.frequencies[c].update) for c in sorted(self.frequencies)]
+        self._last_column = max(self.frequencies, default=-1)
+
+    def add(self, sentence):
+        tokens = sentence.tokens
+        n = len(tokens)
+        self.n_sentences += 1
+        self.n_tokens += n
+        self.lengths[n] += 1
+        if not n:
+            return
+        if self._columns is None:
+            self._set_columns(range(len(tokens[0])))
+        values = list(zip(*tokens))
+        if len(values) > self._last_column:
+            for c, update in self._columns:
+                update(values[c])
+        else:
+            # Tokens with missing fields
+            for c, update in self._columns:
+                update([token[c] for token in tokens if c < len(token)])
+
+    def count(self, sentences):
+        """Yield sentences, adding them to the statistics."""
+        add = self.add
+        for sentence in sentences:
+            add(sentence)
+            yield sentence
+
+    def merge(self, other):
+        """Add the statistics of other (e.g. for the next chunk of the
+        corpus).
+
+        """
+        self.n_sentences += other.n_sentences
+        self.n_tokens += other.n_tokens
+        self.lengths.update(other.lengths)
+        for c, frequencies in other.frequencies.items():
+            if c in self.frequencies:
+                if isinstance(frequencies, FrequencySketch):
+                    self.frequencies[c].merge(frequencies)
+                else:
+                    self.frequencies[c].update(frequencies)
+            else:
+                self.frequencies[c] = frequencies
+        if self._columns is not None or other._columns is not None:
+            self._set_columns(self.frequencies)
+        return self
+
+    def __getstate__(self):
+        # The bound methods cannot be pickled
+        state = dict(self.__dict__)
+        state["_columns"] = None if self._columns is None else [c for c, update in self._columns]
+        return state
+
+    def __setstate__(self, state):
+        columns = state.pop("_columns")
+        self.__dict__.update(state)
+        self._columns = None
+        if columns is not None:
+            self._set_columns(columns)
+
+    def as_dict(self):
+        def text(value):
+            return value.decode("utf-8", errors="replace") if isinstance(value, bytes) else value
+
+        columns = {}
+        for c, frequencies in sorted(self.frequencies.items()):
+            name = self.names.get(c, str(c))
+            if isinstance(frequencies, FrequencySketch):
+                columns[name] = {"approximate": True, "total": frequencies.total,
+                                 "top": [[text(value), n] for value, n in frequencies.most_common()]}
+            else:
+                columns[name] = {"approximate": False, "total": sum(frequencies.values()), "distinct": len(frequencies),
+                                 "values": {text(value): n for value, n in frequencies.most_common()}}
+        return {"sentences": self.n_sentences,
+                "tokens": self.n_tokens,
+                "sentence_lengths": {str(n): count for n, count in sorted(self.lengths.items())},
+                "columns": columns}
+
+    def write(self, fh):
+        """Write the statistics as JSON to the text file fh."""
+        json.dump(self.as_dict(), fh, ensure_ascii=False, indent=1)
+        fh.write("\n")
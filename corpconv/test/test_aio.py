@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import asyncio
+import io
+import unittest
+
+from corpconv import aio
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+
+
+def corpus(n):
+    return "".join("# sent_id = d%d\n1\tDie\tdie\tART\n2\tKatze\t_\tNN\n\n" % i for i in range(n)).encode("utf-8")
+
+
+def expected_vrt(data):
+    return ("\n".join(corpus_writers.write_vrt(corpus_readers.read_conll(io.StringIO(data.decode("utf-8"))))) + "\n").encode("utf-8")
+
+
+async def chunked(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class ListWriter:
+    """Minimal stand-in for asyncio.StreamWriter."""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    async def drain(self):
+        pass
+
+
+class TestAio(unittest.IsolatedAsyncioTestCase):
+    async def test_read_sentences(self):
+        data = corpus(3)
+        sentences = [s async for s in aio.read_sentences(chunked(data, 5), "conll")]
+        self.assertEqual(sentences, list(corpus_readers.read_conll(io.StringIO(data.decode("utf-8")))))
+
+    async def test_chunk_size(self):
+        data = corpus(20)
+        chunks = [c async for c in aio._chunks(chunked(data, len(data)), 100)]
+        self.assertEqual(b"".join(chunks), data)
+        self.assertEqual(max(map(len, chunks)), 100)
+        sentences = [s async for s in aio.read_sentences(chunked(data, len(data)), "conll", chunk_size=7)]
+        self.assertEqual(sentences, list(corpus_readers.read_conll(io.StringIO(data.decode("utf-8")))))
+
+    async def test_convert(self):
+        data = b"a/DT b/NN\nc/NE\n"
+        sink = ListWriter()
+        await aio.convert(chunked(data, 4), sink, "osl", "tsv", delimiter="/", nr_of_fields=1, batch_size=1)
+        self.assertEqual(b"".join(sink.chunks), b"a\tDT\nb\tNN\n\nc\tNE\n\n")
+        self.assertGreater(len(sink.chunks), 1)
+
+    async def test_concurrent_tcp(self):
+        """Many clients are served concurrently by one event loop."""
+        async def handle(reader, writer):
+            await aio.convert(reader, writer, "conll", "vrt", chunk_size=100)
+            writer.close()
+            await writer.wait_closed()
+
+        async def client(port, data):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+            async def send():
+                for i in range(0, len(data), 1000):
+                    writer.write(data[i:i + 1000])
+                    await writer.drain()
+                writer.write_eof()
+
+            sender = asyncio.create_task(send())
+            result = await reader.read()
+            await sender
+            writer.close()
+            await writer.wait_closed()
+            return result
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            inputs = [corpus(n) for n in range(1, 200, 8)]
+            results = await asyncio.gather(*[client(port, data) for data in inputs])
+        self.assertEqual(results, [expected_vrt(data) for data in inputs])
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+from corpconv import batch
+
+
+def check_file(input_path, output_path):
+    if os.path.getsize(input_path) == 0:
+        return "empty file"
+    with open(output_path, "w") as fh:
+        fh.write("ok\n")
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmpdir.name, "corpus")
+        os.makedirs(os.path.join(self.root, "sub"))
+        for name, content in (("a.conllu", "x\n"), ("sub/b.conllu.gz", "xyz\n"), ("sub/notes.txt", ""), ("empty.conllu", "")):
+            with open(os.path.join(self.root, name), "w") as fh:
+                fh.write(content)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_expand_inputs(self):
+        inputs = batch.expand_inputs([self.root], "*.conllu*")
+        self.assertEqual([os.path.relpath(p, self.root) for p, root in inputs], ["a.conllu", "empty.conllu", os.path.join("sub", "b.conllu.gz")])
+        inputs = batch.expand_inputs([os.path.join(self.root, "**", "*.txt"), os.path.join(self.root, "a.conllu")])
+        self.assertEqual(inputs, [(os.path.join(self.root, "sub", "notes.txt"), None), (os.path.join(self.root, "a.conllu"), None)])
+
+    def test_output_path(self):
+        path = os.path.join(self.root, "sub", "b.conllu.gz")
+        self.assertEqual(batch.output_path(path, self.root, "out", batch.DEFAULT_TEMPLATE, "vrt"), os.path.join("out", "sub", "b.vrt"))
+        self.assertEqual(batch.output_path(path, None, "out", "{name}.{format}.xz", "vrt"), os.path.join("out", "b.conllu.gz.vrt.xz"))
+
+    def test_convert_all(self):
+        out = os.path.join(self.tmpdir.name, "out")
+        os.makedirs(out)
+        tasks = [(path, os.path.join(out, os.path.basename(path))) for path, root in batch.expand_inputs([self.root], "*.conllu*")]
+        for jobs in (1, 2):
+            results = list(batch.convert_all(check_file, tasks, jobs))
+            # Largest first when converting sequentially
+            if jobs == 1:
+                self.assertEqual([os.path.basename(r[0]) for r in results], ["b.conllu.gz", "a.conllu", "empty.conllu"])
+            self.assertEqual(sorted(os.path.basename(r[0]) for r in results if r[2] is not None), ["empty.conllu"])
+            self.assertTrue(os.path.isfile(os.path.join(out, "b.conllu.gz")))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import functools
+import unittest
+
+from corpconv import columnar
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+
+
+sentences = [corpus_readers.Sentence("s1", [["They", "they", "PRON"], ["buy", "", "VERB"]]),
+             corpus_readers.Sentence("s2", [["No", "no"], ["clue", "clue", "NOUN", "Number=Sing"]]),
+             corpus_readers.Sentence("s3", [])]
+
+
+class TestColumnarSentence(unittest.TestCase):
+    def test_columnar_sentence_01(self):
+        sentence = columnar.ColumnarSentence(*sentences[0])
+        self.assertEqual(sentence.n_tokens, 2)
+        self.assertEqual(sentence.n_fields, 3)
+        self.assertFalse(sentence.ragged)
+        self.assertEqual(sentence.column(2), ["PRON", "VERB"])
+        self.assertEqual(sentence.tokens[1], ["buy", "", "VERB"])
+        self.assertEqual(sentence.tokens[-1], ["buy", "", "VERB"])
+        self.assertEqual(sentence, sentences[0])
+        self.assertEqual(sentence.to_sentence(), sentences[0])
+
+    def test_columnar_sentence_02(self):
+        sentence = columnar.ColumnarSentence(*sentences[1])
+        self.assertTrue(sentence.ragged)
+        self.assertEqual(list(sentence.tokens), sentences[1].tokens)
+        self.assertEqual(sentence.column(3), ["", "Number=Sing"])
+        sentence_id, tokens = sentence
+        self.assertEqual(sentence_id, "s2")
+
+    def test_columnar_writers_01(self):
+        writers = {"conll": (corpus_writers.write_conll, columnar.write_conll),
+                   "osl": (functools.partial(corpus_writers.write_osl, delimiter="/"), functools.partial(columnar.write_osl, delimiter="/")),
+                   "tsv": (corpus_writers.write_tsv, columnar.write_tsv),
+                   "vrt": (corpus_writers.write_vrt, columnar.write_vrt)}
+        for writer, columnar_writer in writers.values():
+            expected = "\n".join(writer(sentences))
+            self.assertEqual("\n".join(columnar_writer(columnar.to_columnar(sentences))), expected)
+            self.assertEqual("\n".join(writer(columnar.to_columnar(sentences))), expected)
+
+    def test_columnar_writers_02(self):
+        sentences_bytes = [corpus_readers.Sentence(s.id.encode("utf-8"), [[f.encode("utf-8") for f in t] for t in s.tokens]) for s in sentences]
+        writers = {"conll": (corpus_writers.write_conll_bytes, columnar.write_conll_bytes),
+                   "osl": (functools.partial(corpus_writers.write_osl_bytes, delimiter="/"), functools.partial(columnar.write_osl_bytes, delimiter="/")),
+                   "tsv": (corpus_writers.write_tsv_bytes, columnar.write_tsv_bytes),
+                   "vrt": (corpus_writers.write_vrt_bytes, columnar.write_vrt_bytes)}
+        for writer, columnar_writer in writers.values():
+            expected = b"\n".join(writer(sentences_bytes))
+            self.assertEqual(b"\n".join(columnar_writer(columnar.to_columnar(sentences_bytes))), expected)
+
+    def test_bytes(self):
+        sentence = columnar.ColumnarSentence(b"s2", [[b"No", b"no"], [b"clue", b"clue", b"NOUN"]])
+        self.assertEqual(sentence.column(2), [b"", b"NOUN"])
+        self.assertEqual(sentence.tokens[0], [b"No", b"no"])
+        self.assertEqual(sentence._replace(id=b"x"), (b"x", [[b"No", b"no"], [b"clue", b"clue", b"NOUN"]]))
+        self.assertEqual(sentence.id, b"s2")
+
+    def test_eq(self):
+        sentence = columnar.ColumnarSentence(*sentences[0])
+        self.assertNotEqual(sentence, None)
+        self.assertNotEqual(sentence, 1)
+        self.assertNotEqual(sentence.tokens, 1)
+        self.assertNotEqual(sentence, columnar.ColumnarSentence(*sentences[1]))
+
+
+class TestColumnarReaders(unittest.TestCase):
+    def test_columnar_readers_01(self):
+        readers = {"conll": (corpus_readers.read_conll, corpus_readers.read_conll_bytes, corpus_readers.read_conll_mmap),
+                   "osl": tuple(functools.partial(r, delimiter="/", nr_of_fields=3) for r in (corpus_readers.read_osl, corpus_readers.read_osl_bytes, corpus_readers.read_osl_mmap)),
+                   "tsv": (corpus_readers.read_tsv, corpus_readers.read_tsv_bytes, corpus_readers.read_tsv_mmap),
+                   "vrt": (corpus_readers.read_vrt, corpus_readers.read_vrt_bytes, corpus_readers.read_vrt_mmap)}
+        writers = {"conll": corpus_writers.write_conll,
+                   "osl": functools.partial(corpus_writers.write_osl, delimiter="/"),
+                   "tsv": corpus_writers.write_tsv,
+                   "vrt": corpus_writers.write_vrt}
+        for fmt, (read, read_bytes, read_mmap) in readers.items():
+            lines = [line + "\n" for line in writers[fmt](sentences)]
+            lines_bytes = [line.encode("utf-8") for line in lines]
+            for columns in (None, (1, 0), (3,)):
+                for reader, data in ((read, lines), (read_bytes, lines_bytes), (read_mmap, b"".join(lines_bytes))):
+                    expected = list(reader(data, columns=columns))
+                    result = list(reader(data, columns=columns, columnar=True))
+                    self.assertTrue(all(isinstance(s, columnar.ColumnarSentence) for s in result))
+                    self.assertEqual(result, expected)
+                    self.assertEqual([s.ragged for s in result], [len(set(map(len, s.tokens))) > 1 for s in expected])
+
+    def test_columnar_readers_02(self):
+        lines = ["1\tThe\tthe\t_\n", "2\tdog\t_\tNOUN\n", "\n", "1\n", "\n"]
+        result = list(corpus_readers.read_conll(lines, columnar=True))
+        self.assertEqual(result, [("s1", [["The", "the", ""], ["dog", "", "NOUN"]]), ("s2", [[]])])
+        self.assertEqual(result[0].column(1), ["the", ""])
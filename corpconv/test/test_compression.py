@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from corpconv import compression
+
+
+data = b"".join(b"%d\tword\tlemma\tNOUN\n" % i for i in range(100000))
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_detect_01(self):
+        path = os.path.join(self.directory, "corpus")
+        with open(path, "wb") as fh:
+            fh.write(b"\x1f\x8b\x08\x00")
+        self.assertEqual(compression.detect(path), "gzip")
+        self.assertEqual(compression.detect("corpus.vrt.xz"), "xz")
+        self.assertEqual(compression.detect("-", b"BZh91AY"), "bz2")
+        self.assertIsNone(compression.detect("-", b"<s id="))
+
+    def test_round_trip_01(self):
+        for ext in (".gz", ".bz2", ".xz"):
+            path = os.path.join(self.directory, "corpus" + ext)
+            fh = compression.open_output(path, level=1, threads=3)
+            for i in range(0, len(data), 100000):
+                fh.write(data[i:i + 100000])
+            fh.close()
+            with compression.open_input(path) as fh:
+                self.assertEqual(fh.read(), data)
+
+    def test_truncated(self):
+        for ext in (".gz", ".bz2", ".xz"):
+            path = os.path.join(self.directory, "corpus" + ext)
+            fh = compression.open_output(path, level=1)
+            fh.write(data)
+            fh.close()
+            with open(path, "rb") as fh:
+                compressed = fh.read()
+            with open(path, "wb") as fh:
+                fh.write(compressed[:len(compressed) // 2])
+            with compression.open_input(path) as fh:
+                self.assertRaises(EOFError, fh.read)
+
+    def test_empty(self):
+        for ext in (".gz", ".bz2", ".xz"):
+            path = os.path.join(self.directory, "empty" + ext)
+            open(path, "wb").close()
+            with compression.open_input(path) as fh:
+                self.assertEqual(fh.read(), b"")
+
+    def test_uncompressed_01(self):
+        path = os.path.join(self.directory, "corpus.tsv")
+        fh = compression.open_output(path)
+        fh.write(data)
+        fh.close()
+        with compression.open_input(path) as fh:
+            self.assertEqual(fh.readline(), b"0\tword\tlemma\tNOUN\n")
@@ -6,6 +6,7 @@ import unittest
 
 from corpconv import corpus_readers
 from corpconv import corpus_writers
+from corpconv import vocabulary
 
 
 Sentence = collections.namedtuple("Sentence", ["id", "tokens"])
@@ -109,3 +110,110 @@ class TestAll(unittest.TestCase):
                    "vrt": corpus_writers.write_vrt}
         for fmt in readers.keys():
             self.assertEqual(list(readers[fmt](writers[fmt](sentences))), sentences)
+
+
+sentences_bytes = [Sentence(s.id.encode("utf-8"), [[f.encode("utf-8") for f in t] for t in s.tokens]) for s in sentences]
+
+
+class TestAllBytes(unittest.TestCase):
+    def test_all_bytes_01(self):
+        readers = {"conll": corpus_readers.read_conll_bytes,
+                   "osl": functools.partial(corpus_readers.read_osl_bytes, delimiter="_", nr_of_fields=10),
+                   "tsv": corpus_readers.read_tsv_bytes,
+                   "vrt": corpus_readers.read_vrt_bytes}
+        writers = {"conll": corpus_writers.write_conll_bytes,
+                   "osl": functools.partial(corpus_writers.write_osl_bytes, delimiter="_"),
+                   "tsv": corpus_writers.write_tsv_bytes,
+                   "vrt": corpus_writers.write_vrt_bytes}
+        str_writers = {"conll": corpus_writers.write_conll,
+                       "osl": functools.partial(corpus_writers.write_osl, delimiter="_"),
+                       "tsv": corpus_writers.write_tsv,
+                       "vrt": corpus_writers.write_vrt}
+        for fmt in readers.keys():
+            lines = [line.encode("utf-8") for line in str_writers[fmt](sentences)]
+            self.assertEqual(list(readers[fmt](lines)), sentences_bytes)
+            self.assertEqual(list(readers[fmt](writers[fmt](sentences_bytes))), sentences_bytes)
+
+
+class TestMmapReaders(unittest.TestCase):
+    def test_mmap_readers_01(self):
+        readers = {"conll": corpus_readers.read_conll_mmap,
+                   "osl": functools.partial(corpus_readers.read_osl_mmap, delimiter="_", nr_of_fields=10),
+                   "tsv": corpus_readers.read_tsv_mmap,
+                   "vrt": corpus_readers.read_vrt_mmap}
+        writers = {"conll": corpus_writers.write_conll_bytes,
+                   "osl": functools.partial(corpus_writers.write_osl_bytes, delimiter="_"),
+                   "tsv": corpus_writers.write_tsv_bytes,
+                   "vrt": corpus_writers.write_vrt_bytes}
+        for fmt in readers.keys():
+            buf = b"\n".join(writers[fmt](sentences_bytes)) + b"\n"
+            self.assertEqual(list(readers[fmt](buf)), sentences_bytes)
+
+    def test_mmap_readers_02(self):
+        buf = b"a\tb\n\n\nc\td\n"
+        self.assertEqual(list(corpus_readers.read_tsv_mmap(buf)), list(corpus_readers.read_tsv_bytes(buf.splitlines(True))))
+
+    def test_mmap_readers_03(self):
+        # Empty token lines are tokens with one empty field
+        for buf in (b"<s>\n\n</s>\n", b"</s>\n\n</s>\n", b"<s>\na\tb\n\n</s>\n<s>\n</s>\n"):
+            self.assertEqual(list(corpus_readers.read_vrt_mmap(buf)), list(corpus_readers.read_vrt_bytes(buf.splitlines(True))))
+        for buf in (b"# sent_id = 1\n\n\n1\ta\n\n", b"1\ta\n"):
+            self.assertEqual(list(corpus_readers.read_conll_mmap(buf)), list(corpus_readers.read_conll_bytes(buf.splitlines(True))))
+
+
+class TestColumns(unittest.TestCase):
+    def test_columns_01(self):
+        columns = (2, 0)
+        projected = [Sentence(s.id, [[t[c] for c in columns] for t in s.tokens]) for s in sentences]
+        projected_bytes = [Sentence(s.id, [[t[c] for c in columns] for t in s.tokens]) for s in sentences_bytes]
+        readers = {"conll": (corpus_readers.read_conll, corpus_readers.read_conll_bytes, corpus_readers.read_conll_mmap),
+                   "osl": tuple(functools.partial(r, delimiter="_", nr_of_fields=10) for r in (corpus_readers.read_osl, corpus_readers.read_osl_bytes, corpus_readers.read_osl_mmap)),
+                   "tsv": (corpus_readers.read_tsv, corpus_readers.read_tsv_bytes, corpus_readers.read_tsv_mmap),
+                   "vrt": (corpus_readers.read_vrt, corpus_readers.read_vrt_bytes, corpus_readers.read_vrt_mmap)}
+        writers = {"conll": corpus_writers.write_conll,
+                   "osl": functools.partial(corpus_writers.write_osl, delimiter="_"),
+                   "tsv": corpus_writers.write_tsv,
+                   "vrt": corpus_writers.write_vrt}
+        for fmt, (read, read_bytes, read_mmap) in readers.items():
+            lines = list(writers[fmt](sentences))
+            lines_bytes = [line.encode("utf-8") for line in lines]
+            self.assertEqual(list(read(lines, columns=columns)), projected)
+            self.assertEqual(list(read_bytes(lines_bytes, columns=columns)), projected_bytes)
+            self.assertEqual(list(read_mmap(b"\n".join(lines_bytes) + b"\n", columns=columns)), projected_bytes)
+
+    def test_columns_02(self):
+        # Missing fields are empty
+        self.assertEqual(list(corpus_readers.read_tsv(["a\tb\n", "c\n", "\n"], columns=(1,))), [Sentence("s1", [["b"], [""]])])
+        self.assertEqual(list(corpus_readers.read_conll(["1\ta\t_\n", "\n"], columns=(1, 0, 5))), [Sentence("s1", [["", "a", ""]])])
+
+
+class TestVocabularies(unittest.TestCase):
+    def test_vocabularies_01(self):
+        readers = {"conll": (corpus_readers.read_conll, corpus_readers.read_conll_bytes, corpus_readers.read_conll_mmap),
+                   "osl": tuple(functools.partial(r, delimiter="_", nr_of_fields=10) for r in (corpus_readers.read_osl, corpus_readers.read_osl_bytes, corpus_readers.read_osl_mmap)),
+                   "tsv": (corpus_readers.read_tsv, corpus_readers.read_tsv_bytes, corpus_readers.read_tsv_mmap),
+                   "vrt": (corpus_readers.read_vrt, corpus_readers.read_vrt_bytes, corpus_readers.read_vrt_mmap)}
+        writers = {"conll": corpus_writers.write_conll,
+                   "osl": functools.partial(corpus_writers.write_osl, delimiter="_"),
+                   "tsv": corpus_writers.write_tsv,
+                   "vrt": corpus_writers.write_vrt}
+        for fmt, (read, read_bytes, read_mmap) in readers.items():
+            lines = list(writers[fmt](sentences))
+            lines_bytes = [line.encode("utf-8") for line in lines]
+            for result, expected in ((lambda v: read(lines, vocabularies=v), sentences),
+                                     (lambda v: read_bytes(lines_bytes, vocabularies=v), sentences_bytes),
+                                     (lambda v: read_mmap(b"\n".join(lines_bytes) + b"\n", vocabularies=v), sentences_bytes)):
+                vocabularies = {2: vocabulary.Vocabulary(), 8: vocabulary.Vocabulary(max_size=1)}
+                read_sentences = list(result(vocabularies))
+                self.assertEqual(read_sentences, expected)
+                # Both sentences have a VERB as their second token
+                self.assertIs(read_sentences[0].tokens[1][2], read_sentences[1].tokens[1][2])
+                self.assertEqual(len(vocabularies[2]), 6)
+                self.assertEqual(len(vocabularies[8]), 1)
+
+    def test_vocabularies_02(self):
+        # Interning refers to the selected columns
+        vocabularies = {0: vocabulary.Vocabulary()}
+        read_sentences = list(corpus_readers.read_conll(corpus_writers.write_conll(sentences), columns=(2,), vocabularies=vocabularies))
+        self.assertEqual(read_sentences, [Sentence(s.id, [[t[2]] for t in s.tokens]) for s in sentences])
+        self.assertEqual(vocabularies[0].frequencies(), {"PRON": 2, "VERB": 3, "CONJ": 1, "NOUN": 2, "PUNCT": 2, "DET": 1})
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import unittest
+
+from corpconv import diagnostics
+from corpconv import reader
+
+
+corpus = ["# sent_id = a", "1\tx\ty", "2\tx", "3\t\tz", "", "", "1\tu\tv", "2\tu"]
+
+
+class TestDiagnostics(unittest.TestCase):
+    def test_counts_and_examples(self):
+        problems = diagnostics.Diagnostics(max_examples=1, log=False)
+        sentences = list(reader.compile_reader("eltc0n")(corpus, problems))
+        self.assertEqual(len(sentences), 2)
+        self.assertEqual(problems.counts, {"field-count": 2, "empty-field": 1, "empty-line": 1, "expected-sentence-id": 2, "missing-sentence-id": 1, "missing-final-empty-line": 1})
+        self.assertEqual(problems.examples["field-count"], [(3, "2 fields instead of 3")])
+        self.assertEqual(problems.total(), 8)
+
+    def test_logging(self):
+        with self.assertLogs(level="WARNING") as logs:
+            list(reader.compile_reader("eltc0n")(corpus * 10))
+        self.assertIn("WARNING:root:Line 3: 2 fields instead of 3", logs.output)
+        self.assertIn("WARNING:root:Further issues of type field-count are only counted", logs.output)
+        self.assertRegex(logs.output[-1], r"^WARNING:root:\d+ issues in total: empty-field: 10, ")
+        self.assertLess(len(logs.output), 40)
+
+    def test_strict(self):
+        with self.assertRaises(diagnostics.DiagnosticError) as context:
+            list(reader.compile_reader("eltc0n")(corpus, diagnostics.Diagnostics(strict=True)))
+        self.assertEqual(context.exception.line, 3)
+        self.assertEqual(context.exception.category, "field-count")
+
+    def test_merge_and_report(self):
+        first = diagnostics.Diagnostics(max_examples=2, log=False)
+        second = diagnostics.Diagnostics(max_examples=2, log=False)
+        first.issue("empty-line", 1, "empty line")
+        second.issue("empty-line", 7, "empty line")
+        second.issue("empty-line", 9, "empty line")
+        first.merge(second)
+        self.assertEqual(first.counts, {"empty-line": 3})
+        self.assertEqual([line for line, message in first.examples["empty-line"]], [1, 7])
+        fh = io.StringIO()
+        first.report("json", fh)
+        self.assertEqual(json.loads(fh.getvalue())["empty-line"]["count"], 3)
+        fh = io.StringIO()
+        first.report("text", fh)
+        self.assertIn("line 7: empty line", fh.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
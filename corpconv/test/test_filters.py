@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import filters
+
+
+corpus_conll = "".join("# sent_id = x%d\n%s\n" % (i, "".join("%d\tw\t_\n" % (j + 1) for j in range(i % 5 + 1))) for i in range(20))
+corpus_vrt = "<text>\n<s id=\"a\">\nx\n</s>\n<s>\nx\ny\n</s>\n</text>\n<s id=\"b\">\nx\ny\nz\n</s>\n"
+
+
+def expected(sentences, criteria):
+    return [s for i, s in enumerate(sentences, start=1)
+            if criteria.position_ok(i) and not criteria.done(i) and criteria.content_ok(s.id, len(s.tokens))]
+
+
+class TestFilters(unittest.TestCase):
+    def check(self, criteria, data, input_format, **kwargs):
+        reader = getattr(corpus_readers, "read_%s" % input_format)
+        sentences = list(reader(io.StringIO(data), **kwargs))
+        result = expected(sentences, criteria)
+        filtered = filters.FilteredReader(lambda lines, **kw: reader(lines, **kw, **kwargs), input_format, criteria)
+        self.assertEqual(list(filtered(io.StringIO(data))), result)
+        bytes_reader = getattr(corpus_readers, "read_%s_bytes" % input_format)
+        filtered = filters.FilteredReader(lambda lines, **kw: bytes_reader(lines, **kw, **kwargs), input_format, criteria, binary=True)
+        self.assertEqual([s.id.decode("utf-8") for s in filtered(io.BytesIO(data.encode("utf-8")))], [s.id for s in result])
+        mmap_reader = getattr(corpus_readers, "read_%s_mmap" % input_format)
+        filtered = filters.read_filtered_buffer(data.encode("utf-8"), lambda buf, **kw: mmap_reader(buf, **kw, **kwargs), input_format, criteria)
+        self.assertEqual([s.id.decode("utf-8") for s in filtered], [s.id for s in result])
+        return result
+
+    def test_position(self):
+        result = self.check(filters.SentenceFilter(skip=3, head=10, every=4), corpus_conll, "conll")
+        self.assertEqual([s.id for s in result], ["x3", "x7", "x11"])
+
+    def test_content(self):
+        result = self.check(filters.SentenceFilter(min_tokens=2, max_tokens=3, id_pattern="1"), corpus_conll, "conll")
+        self.assertEqual([s.id for s in result], ["x1", "x11", "x12", "x16", "x17"])
+
+    def test_vrt(self):
+        result = self.check(filters.SentenceFilter(min_tokens=2), corpus_vrt, "vrt")
+        self.assertEqual([s.id for s in result], ["s2", "b"])
+
+    def test_tsv_generated_ids(self):
+        result = self.check(filters.SentenceFilter(skip=1, max_tokens=1), "a\n\nb\n\nc\td\n\ne\nf\n", "tsv")
+        self.assertEqual([s.id for s in result], ["s2", "s3"])
+
+    def test_osl(self):
+        result = self.check(filters.SentenceFilter(min_tokens=2, id_pattern="s[13]"), "a/x b/y\n\nc/z\nd/x e/y\n", "osl", delimiter="/", nr_of_fields=1)
+        self.assertEqual([s.id for s in result], ["s1", "s3"])
+
+    def test_sample(self):
+        sentences = list(corpus_readers.read_conll(io.StringIO(corpus_conll)))
+        criteria = filters.SentenceFilter(min_tokens=2, sample=5, seed=3)
+        sample = list(filters.FilteredReader(corpus_readers.read_conll, "conll", criteria)(io.StringIO(corpus_conll)))
+        self.assertEqual(len(sample), 5)
+        self.assertEqual(sample, [s for s in sentences if s in sample])
+        self.assertTrue(all(len(s.tokens) >= 2 for s in sample))
+        self.assertEqual(list(filters.filter_sentences(sentences, criteria)), sample)
+        self.assertEqual(list(filters.filter_sentences(sentences, filters.SentenceFilter(sample=50))), sentences)
+
+    def test_head_stops_reading(self):
+        lines = iter(io.StringIO(corpus_conll))
+        criteria = filters.SentenceFilter(head=2)
+        self.assertEqual(len(list(filters.FilteredReader(corpus_readers.read_conll, "conll", criteria)(lines))), 2)
+        self.assertEqual(next(lines), "# sent_id = x2\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from corpconv import newcli
+from corpconv import reader
+from corpconv import writer
+
+
+corpus_conll = """# sent_id = s1
+1\tThey\tthey\tPRON
+2\tbuy\tbuy\tVERB
+
+# sent_id = s2
+1\tNo\t_\tDET
+
+""".splitlines()
+
+corpus_vrt = """<s id="s1">
+They\tthey\tPRON
+buy\tbuy\tVERB
+</s>
+<s id="s2">
+No\t\tDET
+</s>""".splitlines()
+
+sentences = [reader.Sentence("s1", [reader.Token("1", ["They", "they", "PRON"]), reader.Token("2", ["buy", "buy", "VERB"])]),
+             reader.Sentence("s2", [reader.Token("1", ["No", "", "DET"])])]
+
+
+class TestCompiledReader(unittest.TestCase):
+    def test_compiled_reader_01(self):
+        self.assertEqual(list(reader.compile_reader("eltc0_")(corpus_conll)), sentences)
+
+    def test_compiled_reader_02(self):
+        read = reader.compile_reader("xltxne")
+        self.assertIs(read, reader.compile_reader("xltxne"))
+        self.assertEqual([s.id for s in read(corpus_vrt)], ["s1", "s2"])
+        self.assertEqual([t.fields for t in list(read(corpus_vrt))[1].tokens], [["No", "", "DET"]])
+
+    def test_compiled_reader_03(self):
+        read = reader.compile_reader("ls/nne")
+        self.assertEqual(list(read(["a/DT dog/NN"])), [reader.Sentence("s1", [reader.Token("t1", ["a", "DT"]), reader.Token("t2", ["dog", "NN"])])])
+
+
+class TestCompiledWriter(unittest.TestCase):
+    def test_compiled_writer_01(self):
+        write = writer.compile_writer("xltxne")
+        self.assertEqual("\n".join(write(sentences)).splitlines(), corpus_vrt)
+
+    def test_compiled_writer_02(self):
+        write = writer.compile_writer("ls/nne")
+        self.assertEqual(list(write(sentences)), ["They/they/PRON buy/buy/VERB", "No//DET"])
+
+    def test_compiled_writer_03(self):
+        write = writer.compile_writer("eltc0_")
+        self.assertEqual("\n".join(write(sentences)) + "\n", "\n".join(corpus_conll) + "\n")
+        # Token IDs are not inserted into the fields
+        self.assertEqual(sentences[1].tokens[0].fields, ["No", "", "DET"])
+        write = writer.compile_writer("eltc2_")
+        self.assertEqual(list(write(sentences))[1], "# sent_id = s2\nNo\t_\t1\tDET\n")
+        write = writer.compile_writer("eltc5_")
+        self.assertEqual(list(write(sentences))[1], "# sent_id = s2\nNo\t_\tDET\t1\n")
+
+    def test_write_sentences(self):
+        fh = io.BytesIO()
+        writer.write_sentences(sentences, "eltc0_", argparse.Namespace(xml_tag="s", xml_id="id"), fh)
+        self.assertEqual(fh.getvalue().decode("utf-8").splitlines(), corpus_conll)
+
+
+class TestGenericCli(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "corpus.conll")
+        with open(self.path, "w") as fh:
+            fh.write("\n".join(corpus_conll) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_main(self):
+        output_path = os.path.join(self.directory, "corpus.vrt.gz")
+        newcli.main(["-i", "eltc0_", "-o", "xltxne", "-O", output_path, self.path])
+        import gzip
+        with gzip.open(output_path, "rt") as fh:
+            self.assertEqual(fh.read().splitlines(), corpus_vrt)
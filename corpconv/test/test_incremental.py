@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import incremental
+
+
+corpus_conll = "# sent_id = first\n1\tThey\tthey\n2\tbüy\t_\n\n1\tI\tI\n\n# sent_id = last\n1\tNo\tno\n"
+
+
+def feed_in_chunks(parser, data, size):
+    sentences = []
+    for i in range(0, len(data), size):
+        sentences.extend(parser.feed(data[i:i + size]))
+    return sentences + parser.close()
+
+
+class TestIncrementalParser(unittest.TestCase):
+    def test_conll(self):
+        expected = list(corpus_readers.read_conll(io.StringIO(corpus_conll)))
+        data = corpus_conll.encode("utf-8")
+        for size in (1, 2, 7, len(data)):
+            with self.subTest(size=size):
+                with self.assertLogs(level="WARNING"):
+                    self.assertEqual(feed_in_chunks(incremental.ConllParser(), data, size), expected)
+
+    def test_abstract(self):
+        self.assertRaises(TypeError, incremental.IncrementalParser)
+
+    def test_sentences_returned_early(self):
+        parser = incremental.TsvParser()
+        self.assertEqual(parser.feed("a\tb\nc"), [])
+        self.assertEqual(parser.feed("\td\n\ne"), [corpus_readers.Sentence("s1", [["a", "b"], ["c", "d"]])])
+        self.assertEqual(parser.feed("\n\n"), [corpus_readers.Sentence("s2", [["e"]])])
+        self.assertEqual(parser.close(), [])
+
+    def test_vrt_binary(self):
+        data = b"<s id=\"x\">\r\na\tb\r\n</s>\n<s id=\"y\">\nc\n</s>\n"
+        expected = list(corpus_readers.read_vrt_bytes(io.BytesIO(data)))
+        self.assertEqual(feed_in_chunks(incremental.VrtParser(binary=True), data, 3), expected)
+
+    def test_newlines(self):
+        self.assertEqual(feed_in_chunks(incremental.VrtParser(), b"<s id=\"x\">\r\na\tb\r\n</s>\r\n", 5), [("x", [["a", "b"]])])
+
+    def test_osl(self):
+        parser = incremental.OslParser(delimiter="/", nr_of_fields=1)
+        self.assertEqual(parser.feed("a/DT b/NN\n\nc/"), [("s1", [["a", "DT"], ["b", "NN"]])])
+        self.assertEqual(parser.close(), [("s2", [["c", ""]])])
+
+    def test_empty(self):
+        self.assertEqual(incremental.TsvParser().close(), [])
+
+
+class TestIncrementalWriter(unittest.TestCase):
+    def test_writer(self):
+        sentences = [corpus_readers.Sentence("s1", [["a", ""]]), corpus_readers.Sentence("s2", [])]
+        writer = incremental.ConllWriter()
+        output = writer.write(sentences[:1]) + writer.write([]) + writer.write(sentences[1:]) + writer.close()
+        self.assertEqual(output, ("\n".join(corpus_writers.write_conll(sentences)) + "\n").encode("utf-8"))
+
+    def test_writer_binary(self):
+        writer = incremental.OslWriter(delimiter="/", binary=True)
+        self.assertEqual(writer.write([(b"s1", [[b"a", b"DT"], [b"b", b"NN"]])]), b"a/DT b/NN\n")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import index
+
+
+corpus_conll = """# sent_id = first
+1\tThey\tthey\tPRON
+2\tbuy\tbuy\tVERB
+
+1\tI\tI\tPRON
+2\thave\t_\tVERB
+
+# sent_id = last
+1\tNo\tno\tDET
+
+"""
+
+
+class TestIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "corpus.conll")
+        with open(self.path, "w") as fh:
+            fh.write(corpus_conll)
+        index.build_index(self.path, "conll")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sentence_spans_01(self):
+        buf = corpus_conll.encode("utf-8")
+        spans = list(corpus_readers.sentence_spans(buf, "conll"))
+        self.assertEqual(len(spans), 3)
+        self.assertEqual(buf[spans[1][0]:spans[1][1]], b"1\tI\tI\tPRON\n2\thave\t_\tVERB\n\n")
+
+    def test_indexed_corpus_01(self):
+        sentences = list(corpus_readers.read_conll(corpus_conll.splitlines()))
+        with index.IndexedCorpus(self.path) as corpus:
+            self.assertEqual(len(corpus), 3)
+            self.assertEqual(corpus[1], sentences[1])
+            self.assertEqual(corpus[-1], sentences[2])
+            self.assertEqual(corpus["last"], sentences[2])
+            self.assertEqual(corpus[1:], sentences[1:])
+            self.assertEqual(corpus[::2], sentences[::2])
+            self.assertEqual(corpus[3:0:-1], sentences[3:0:-1])
+            self.assertEqual(corpus[2:1], [])
+            self.assertEqual(list(corpus.by_ids(["s2", "first"])), [sentences[1], sentences[0]])
+            self.assertRaises(KeyError, corpus.__getitem__, "missing")
+            self.assertRaises(IndexError, corpus.__getitem__, 3)
+            self.assertRaises(IndexError, corpus.__getitem__, -4)
+
+    def test_out_of_date(self):
+        # Same size, different modification time
+        with open(self.path, "w") as fh:
+            fh.write(corpus_conll.replace("They", "Thay"))
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertRaises(ValueError, index.IndexedCorpus, self.path)
+
+    def test_select(self):
+        sentences = list(corpus_readers.read_conll(corpus_conll.splitlines()))
+        with index.IndexedCorpus(self.path) as corpus:
+            self.assertEqual(list(corpus.select(skip=1)), sentences[1:])
+            self.assertEqual(list(corpus.select(head=2, every=2)), sentences[:1])
+            self.assertEqual(list(corpus.select(id_pattern="^(s|l)")), sentences[1:])
+
+    def test_indexed_corpus_02(self):
+        with index.IndexedCorpus(self.path, binary=True) as corpus:
+            self.assertEqual(corpus["first"].tokens[1], [b"buy", b"buy", b"VERB"])
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import merge
+from corpconv import pipeline
+
+
+def read(data, binary=False):
+    if binary:
+        return corpus_readers.read_tsv_bytes(io.BytesIO(data.encode("utf-8")))
+    return corpus_readers.read_tsv(io.StringIO(data))
+
+
+class TestMerge(unittest.TestCase):
+    def test_source_name(self):
+        self.assertEqual(merge.source_name("dir/part1.tsv.gz"), "part1")
+        self.assertEqual(merge.source_name("part2.tsv"), "part2")
+
+    def test_concatenate_renumber(self):
+        sentences = list(merge.concatenate([read("a\n\nb\n\n"), read("c\n\n"), read("d\n\n")], ["x", "y", "z"]))
+        self.assertEqual([s.id for s in sentences], ["s1", "s2", "s3", "s4"])
+        self.assertEqual([s.tokens for s in sentences], [[["a"]], [["b"]], [["c"]], [["d"]]])
+
+    def test_concatenate_prefix(self):
+        sentences = merge.concatenate([read("a\n\n", True), read("b\n\nc\n\n", True)], ["x", "y"], "prefix")
+        self.assertEqual([s.id for s in sentences], [b"x-s1", b"y-s1", b"y-s2"])
+        sentences = merge.concatenate([read("a\n\n"), read("b\n\n")], ["x", "y"], "keep")
+        self.assertEqual([s.id for s in sentences], ["s1", "s1"])
+
+    def test_given_ids_are_kept(self):
+        conll = "# sent_id = doc1\n1\ta\n\n1\tb\n\n"
+        sentences = merge.concatenate([read("a\n\n"), corpus_readers.read_conll(io.StringIO(conll))], ["x", "y"])
+        self.assertEqual([s.id for s in sentences], ["s1", "doc1", "s3"])
+
+    def test_merge_sorted(self):
+        sources = [[corpus_readers.Sentence(i, []) for i in ids] for ids in (["a", "c", "e"], ["b", "c"], [], ["d"])]
+        self.assertEqual([s.id for s in merge.merge_sorted(sources, ["1", "2", "3", "4"])], ["a", "b", "c", "c", "d", "e"])
+        self.assertEqual([s.id for s in merge.merge_sorted([read("a\n\n"), read("b\n\n")], ["y", "x"], "prefix")], ["x-s1", "y-s1"])
+
+    def test_merge_unsorted(self):
+        sources = [[corpus_readers.Sentence(i, []) for i in ids] for ids in (["a", "c"], ["d", "b"])]
+        with self.assertRaisesRegex(ValueError, "2 is not sorted"):
+            list(merge.merge_sorted(sources, ["1", "2"]))
+        self.assertRaises(ValueError, merge.merge_sorted, [], [], "renumber")
+
+    def test_concurrent_sources(self):
+        sources = [lambda: read("a\n\nb\n\n"), lambda: read("c\n\n")]
+        with pipeline.concurrent_sources(sources, batch_size=1, queue_depth=1) as streams:
+            sentences = list(merge.concatenate(streams, ["x", "y"]))
+        self.assertEqual([s.id for s in sentences], ["s1", "s2", "s3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+
+from corpconv import output
+
+
+class TestWriteBuffered(unittest.TestCase):
+    def test_write_buffered_01(self):
+        fh = io.BytesIO()
+        output.write_buffered(["<s id=\"s1\">", "Grüße\tgruß", "</s>"], fh)
+        self.assertEqual(fh.getvalue(), "<s id=\"s1\">\nGrüße\tgruß\n</s>\n".encode("utf-8"))
+
+    def test_write_buffered_02(self):
+        lines = ["line %d" % i for i in range(1000)]
+        fh = io.BytesIO()
+        output.write_buffered(lines, fh, buffer_size=64)
+        self.assertEqual(fh.getvalue(), ("\n".join(lines) + "\n").encode("utf-8"))
+
+    def test_write_buffered_03(self):
+        fh = io.BytesIO()
+        output.write_buffered([], fh)
+        self.assertEqual(fh.getvalue(), b"")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import functools
+import io
+import os
+import tempfile
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import output
+from corpconv import parallel
+
+
+corpus_tsv = "".join("w%d\tN\n" % j for j in range(3)) + "\n"
+corpus_tsv = corpus_tsv * 50
+
+
+class TestCountSentences(unittest.TestCase):
+    def test_count_sentences_01(self):
+        self.assertEqual(parallel.count_sentences(b"a\tb\n\nc\td\n\n", "tsv"), 2)
+        self.assertEqual(parallel.count_sentences(b"1\ta\n \n\n", "conll"), 2)
+        self.assertEqual(parallel.count_sentences(b"<s>\na\n</s>\n<s>\nb\n</s>\n", "vrt"), 2)
+        self.assertEqual(parallel.count_sentences(b"a/b c/d\n\ne/f", "osl"), 2)
+        self.assertEqual(parallel.count_sentences(b"", "osl"), 0)
+
+    def test_count_sentences_crlf(self):
+        data = b"a\tb\r\n\r\nc\td\r\n\r\n\n"
+        self.assertEqual(parallel.count_sentences(data, "tsv"), 3)
+        self.assertEqual(len(list(corpus_readers.read_tsv(io.StringIO(data.decode(), newline=None)))), 3)
+        self.assertEqual(parallel.count_sentences(data, "tsv", binary=True), 1)
+        self.assertEqual(len(list(corpus_readers.read_tsv_bytes(io.BytesIO(data)))), 1)
+        data = b"<s>\r\na\r\n</s>\r\n<s>\nb\n</s>\n"
+        self.assertEqual(parallel.count_sentences(data, "vrt"), 2)
+        self.assertEqual(parallel.count_sentences(data, "vrt", binary=True), 1)
+        self.assertEqual(parallel.count_sentences(b"a/b\r\n\r\nc/d\n", "osl", binary=True), 3)
+
+
+class TestConvertParallel(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "w") as fh:
+            fh.write(corpus_tsv)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_find_boundaries_01(self):
+        chunks = parallel.find_boundaries(self.path, "tsv", chunk_size=100)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(corpus_tsv))
+        with open(self.path, "rb") as fh:
+            data = fh.read()
+        for start, end in chunks:
+            self.assertTrue(data[:end].endswith(b"\n\n"))
+
+    def test_convert_parallel_01(self):
+        for writer in (corpus_writers.write_vrt, functools.partial(corpus_writers.write_osl, delimiter="/")):
+            sequential = io.BytesIO()
+            with open(self.path) as fh:
+                output.write_buffered(writer(corpus_readers.read_tsv(fh)), sequential)
+            par = io.BytesIO()
+            parallel.convert_parallel(self.path, "tsv", corpus_readers.read_tsv, writer, par, jobs=2, chunk_size=100)
+            self.assertEqual(par.getvalue(), sequential.getvalue())
+
+    def test_convert_parallel_statistics(self):
+        from corpconv import statistics
+        stats = statistics.Statistics(sketched=(0,))
+        parallel.convert_parallel(self.path, "tsv", corpus_readers.read_tsv, corpus_writers.write_tsv, io.BytesIO(), jobs=2, chunk_size=100, statistics=stats)
+        self.assertEqual((stats.n_sentences, stats.n_tokens), (50, 150))
+        self.assertEqual(stats.frequencies[1], {"N": 150})
+        self.assertEqual(stats.frequencies[0].most_common(), [("w0", 50), ("w1", 50), ("w2", 50)])
+
+    def test_convert_parallel_counts(self):
+        from corpconv import profiling
+        profile = profiling.Profile()
+        parallel.convert_parallel(self.path, "tsv", corpus_readers.read_tsv, corpus_writers.write_tsv, io.BytesIO(), jobs=2, chunk_size=100, counts=profile)
+        summary = profile.summary()
+        self.assertEqual((summary["sentences"], summary["tokens"], summary["input_size"]), (50, 150, len(corpus_tsv)))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import io
+import itertools
+import os
+import subprocess
+import sys
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import output
+from corpconv import pipeline
+from corpconv import profiling
+
+
+corpus = "".join("# sent_id = d%d\n1\tThe\tthe\n2\tdog\t_\n\n" % i for i in range(50))
+
+
+def failing_reader(lines):
+    for i, line in enumerate(lines):
+        if i == 30:
+            raise ValueError("broken line")
+        yield corpus_readers.Sentence("s", [[line]])
+
+
+def first_sentences(lines):
+    return itertools.islice(corpus_readers.read_conll(lines), 5)
+
+
+# Batches larger than the pipe buffer, so that the input queue is still
+# being fed when the conversion process stops reading
+exit_code = """
+import functools, io, itertools, sys
+from corpconv import corpus_writers, pipeline
+from corpconv.test import test_pipeline
+corpus = test_pipeline.corpus * 2000
+try:
+    if sys.argv[1] == "sources":
+        source = functools.partial(itertools.repeat, "x" * 1000, 100000)
+        with pipeline.concurrent_sources([source, source], "process", batch_size=1000) as streams:
+            next(streams[0])
+    else:
+        pipeline.convert_pipelined(io.StringIO(corpus), [getattr(test_pipeline, sys.argv[1]), corpus_writers.write_vrt], io.BytesIO(), executor="process", batch_size=10000)
+except ValueError:
+    print("failed")
+else:
+    print("done")
+"""
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.expected = io.BytesIO()
+        output.write_buffered(corpus_writers.write_vrt(corpus_readers.read_conll(io.StringIO(corpus))), self.expected)
+
+    def test_threads(self):
+        fh = io.BytesIO()
+        pipeline.convert_pipelined(io.StringIO(corpus), [corpus_readers.read_conll, corpus_writers.write_vrt], fh, batch_size=3, queue_depth=1)
+        self.assertEqual(fh.getvalue(), self.expected.getvalue())
+
+    def test_process(self):
+        fh = io.BytesIO()
+        pipeline.convert_pipelined(io.StringIO(corpus), [corpus_readers.read_conll, corpus_writers.write_vrt], fh, executor="process", batch_size=3, queue_depth=1)
+        self.assertEqual(fh.getvalue(), self.expected.getvalue())
+
+    def test_process_binary(self):
+        fh = io.BytesIO()
+        pipeline.convert_pipelined(io.BytesIO(corpus.encode()), [corpus_readers.read_conll_bytes, corpus_writers.write_vrt_bytes], fh, binary=True, executor="process", batch_size=3)
+        self.assertEqual(fh.getvalue(), self.expected.getvalue())
+
+    def test_failure(self):
+        for executor in ("thread", "process"):
+            with self.assertRaises(ValueError):
+                pipeline.convert_pipelined(io.StringIO(corpus), [failing_reader, corpus_writers.write_tsv], io.BytesIO(), executor=executor, batch_size=4)
+
+    def test_process_exits(self):
+        """The process executor must not wait at exit for queued input
+        that nobody reads any more.
+
+        """
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        for stage, expected in (("first_sentences", "done"), ("failing_reader", "failed"), ("sources", "done")):
+            result = subprocess.run([sys.executable, "-c", exit_code, stage], cwd=root, capture_output=True, text=True, timeout=60)
+            self.assertEqual(result.stdout.strip(), expected)
+
+    def test_early_stop(self):
+        for executor in ("thread", "process"):
+            fh = io.BytesIO()
+            pipeline.convert_pipelined(io.StringIO(corpus), [first_sentences, corpus_writers.write_vrt], fh, executor=executor, batch_size=3)
+            self.assertEqual(fh.getvalue().count(b"</s>"), 5)
+
+    def test_counts(self):
+        for executor in ("thread", "process"):
+            counts = profiling.Counts()
+            fh = io.BytesIO()
+            pipeline.convert_pipelined(io.StringIO(corpus), [corpus_readers.read_conll, counts.count, corpus_writers.write_vrt], fh, executor=executor, batch_size=3, counts=counts)
+            self.assertEqual(fh.getvalue(), self.expected.getvalue())
+            self.assertEqual((counts.sentences, counts.tokens), (50, 100))
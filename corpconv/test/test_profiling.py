@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import output
+from corpconv import profiling
+
+
+class TestProfile(unittest.TestCase):
+    def test_profile(self):
+        data = "# sent_id = a\n1\tThe\n2\tdog\n\n1\tBarks\n\n".encode("utf-8")
+        stderr = io.StringIO()
+        profile = profiling.Profile(total_size=len(data), progress=1e-9, fh=stderr)
+        corpus = io.TextIOWrapper(profile.wrap_input(io.BytesIO(data)), encoding="utf-8")
+        sentences = profile.wrap(corpus_readers.read_conll(profile.wrap(corpus, "input")), "read", tokens=True)
+        fh = io.BytesIO()
+        output.write_buffered(profile.wrap(corpus_writers.write_tsv(sentences), "write"), profile.wrap_output(fh))
+        profile.finish()
+        self.assertEqual(fh.getvalue(), b"The\ndog\n\nBarks\n\n")
+        self.assertIn("Progress: ", stderr.getvalue())
+        summary = profile.summary()
+        self.assertEqual(summary["sentences"], 2)
+        self.assertEqual(summary["tokens"], 3)
+        self.assertEqual(summary["input_size"], 36)
+        self.assertEqual(summary["output_bytes"], len(fh.getvalue()))
+        self.assertEqual([s["name"] for s in summary["stages"]], ["input", "read", "write", "output"])
+        self.assertEqual([s["items"] for s in summary["stages"]], [6, 2, 5, None])
+        self.assertAlmostEqual(sum(s["seconds"] for s in summary["stages"]), summary["seconds"])
+        stderr.seek(0)
+        stderr.truncate()
+        profile.report("json")
+        self.assertEqual(json.loads(stderr.getvalue())["tokens"], 3)
+
+    def test_add(self):
+        stderr = io.StringIO()
+        profile = profiling.Profile(total_size=200, progress=1e-9, fh=stderr)
+        profile.add(2, 10, 100)
+        profile.add(1, 5, 50)
+        self.assertIn("3 sentences, 15 tokens", stderr.getvalue())
+        self.assertIn("75.0%", stderr.getvalue())
+        summary = profile.summary()
+        self.assertEqual((summary["sentences"], summary["tokens"], summary["input_size"], summary["stages"]), (3, 15, 150, []))
+
+    def test_input_size(self):
+        # The input is counted in bytes, not in decoded characters
+        data = "1\tÜberfluß\n2\t日本語\n\n".encode("utf-8") * 1000
+        stderr = io.StringIO()
+        profile = profiling.Profile(total_size=len(data), progress=1e-9, fh=stderr)
+        corpus = io.TextIOWrapper(profile.wrap_input(io.BytesIO(data)), encoding="utf-8")
+        for sentence in profile.wrap(corpus_readers.read_conll(profile.wrap(corpus, "input")), "read", tokens=True):
+            pass
+        self.assertEqual(profile.summary()["input_size"], len(data))
+        self.assertIn("100.0%", stderr.getvalue().splitlines()[-1])
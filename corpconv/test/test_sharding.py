@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import sharding
+
+
+sentences = [corpus_readers.Sentence("s%d" % i, [["w%d" % j, "x"] for j in range(i % 4 + 1)]) for i in range(1, 11)]
+
+
+def read_shard(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        return list(corpus_readers.read_vrt(fh))
+
+
+class TestSharding(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shard_path(self):
+        self.assertEqual(sharding.shard_path("out/corpus.vrt.gz", 3), "out/corpus-00003.vrt.gz")
+        self.assertEqual(sharding.shard_path("corpus.vrt", 12), "corpus-00012.vrt")
+        self.assertEqual(sharding.shard_path("train-{shard:02d}.vrt", 1), "train-01.vrt")
+
+    def test_sentences(self):
+        paths = sharding.write_sharded(sentences, corpus_writers.write_vrt, os.path.join(self.directory, "c.vrt.gz"), max_sentences=4)
+        self.assertEqual([os.path.basename(p) for p in paths], ["c-00000.vrt.gz", "c-00001.vrt.gz", "c-00002.vrt.gz"])
+        shards = [read_shard(p) for p in paths]
+        self.assertEqual([len(s) for s in shards], [4, 4, 2])
+        self.assertEqual(sum(shards, []), sentences)
+
+    def test_tokens_and_bytes(self):
+        paths = sharding.write_sharded(sentences, corpus_writers.write_vrt, os.path.join(self.directory, "c.vrt"), max_tokens=6)
+        shards = [read_shard(p) for p in paths]
+        self.assertEqual(sum(shards, []), sentences)
+        self.assertTrue(all(sum(len(s.tokens) for s in shard[:-1]) < 6 <= sum(len(s.tokens) for s in shard) for shard in shards[:-1]))
+        paths = sharding.write_sharded(sentences, corpus_writers.write_vrt, os.path.join(self.directory, "b-{shard}.vrt"), max_bytes=50)
+        for path in paths[:-1]:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            self.assertGreaterEqual(len(data), 50)
+            self.assertLess(len(data[:data.rindex(b"<s ")]), 50)
+        self.assertEqual(sum((read_shard(p) for p in paths), []), sentences)
+
+    def test_hash(self):
+        data = [s._replace(id=s.id.encode("ascii"), tokens=[[f.encode("ascii") for f in t] for t in s.tokens]) for s in sentences]
+        paths = sharding.write_sharded(data, corpus_writers.write_vrt_bytes, os.path.join(self.directory, "h.vrt"), binary=True, hash_shards=3)
+        self.assertEqual(len(paths), 3)
+        shards = [read_shard(p) for p in paths]
+        self.assertEqual(sorted(sum(shards, []), key=lambda s: int(s.id[1:])), sentences)
+        for number, shard in enumerate(shards):
+            self.assertTrue(all(sharding.shard_of(s.id, 3) == number for s in shard))
+
+    def test_empty(self):
+        self.assertEqual(sharding.write_sharded([], corpus_writers.write_vrt, os.path.join(self.directory, "c.vrt"), max_sentences=4), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import unittest
+
+
+class TestStartup(unittest.TestCase):
+    def test_lazy_imports(self):
+        """The entry point must not import the modules that are only
+        needed for some conversions (see benchmarks/bench_startup.py
+        for the import time budget).
+
+        """
+        lazy = ["corpconv.corpus_readers", "corpconv.corpus_writers", "corpconv.index", "corpconv.profiling", "corpconv.statistics", "corpconv.validate", "corpconv.newcli", "corpconv.reader", "corpconv.writer", "corpconv.vocabulary", "corpconv.columnar",
+                "corpconv.transcoder", "corpconv.batch", "corpconv.compression", "corpconv.output", "corpconv.parallel", "corpconv.pipeline", "multiprocessing", "sqlite3", "bz2", "lzma", "gzip", "zstandard", "concurrent.futures"]
+        code = "import sys, corpconv.cli; print(' '.join(sorted(sys.modules)))"
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        modules = set(result.stdout.split())
+        self.assertIn("corpconv.cli", modules)
+        self.assertEqual([m for m in lazy if m in modules], [])
+
+    def test_defaults(self):
+        """The defaults of the options are given as literals."""
+        from unittest import mock
+        from corpconv import batch, cli, output, parallel, pipeline
+        with mock.patch.object(sys, "argv", ["corpconv", "-i", "conll", "-o", "vrt", "-"]):
+            args = cli.arguments()
+        self.assertEqual(args.buffer_size, output.DEFAULT_BUFFER_SIZE)
+        self.assertEqual(args.chunk_size, parallel.DEFAULT_CHUNK_SIZE)
+        self.assertEqual(args.batch_size, pipeline.DEFAULT_BATCH_SIZE)
+        self.assertEqual(args.queue_depth, pipeline.DEFAULT_QUEUE_DEPTH)
+        self.assertEqual(args.output_template, batch.DEFAULT_TEMPLATE)
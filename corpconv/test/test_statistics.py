@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import pickle
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import statistics
+
+
+corpus_conll = """1\tThey\tthey\tPRON
+2\tbuy\tbuy\tVERB
+
+1\tI\tI\tPRON
+
+1\tThey\tthey\tPRON
+2\tsell\tsell\tVERB
+3\tbooks\tbook
+
+"""
+
+
+class TestFrequencySketch(unittest.TestCase):
+    def test_estimates(self):
+        sketch = statistics.FrequencySketch(top_k=2, width=64, depth=3)
+        sketch.update(["a"] * 10 + ["b"] * 5 + ["c%d" % i for i in range(100)])
+        self.assertEqual(sketch.total, 115)
+        self.assertGreaterEqual(sketch.estimate("b"), 5)
+        self.assertEqual([value for value, n in sketch.most_common()], ["a", "b"])
+
+    def test_merge(self):
+        first = statistics.FrequencySketch(top_k=2)
+        second = statistics.FrequencySketch(top_k=2)
+        first.update(["a", "b", "b"])
+        second.update(["a", "a", "c"])
+        first.merge(pickle.loads(pickle.dumps(second)))
+        self.assertEqual(first.most_common(), [("a", 3), ("b", 2)])
+        self.assertEqual(first.total, 6)
+        self.assertRaises(ValueError, first.merge, statistics.FrequencySketch(width=8))
+
+
+class TestStatistics(unittest.TestCase):
+    def setUp(self):
+        self.sentences = list(corpus_readers.read_conll(corpus_conll.splitlines()))
+
+    def test_count(self):
+        stats = statistics.Statistics()
+        self.assertEqual(list(stats.count(self.sentences)), self.sentences)
+        self.assertEqual((stats.n_sentences, stats.n_tokens), (3, 6))
+        self.assertEqual(stats.lengths, {1: 1, 2: 1, 3: 1})
+        self.assertEqual(stats.frequencies[2], {"PRON": 3, "VERB": 2})
+        self.assertEqual(stats.frequencies[1]["they"], 2)
+
+    def test_columns_and_sketch(self):
+        stats = statistics.Statistics(columns=[2], sketched=[0], top_k=1)
+        list(stats.count(self.sentences))
+        self.assertEqual(sorted(stats.frequencies), [0, 2])
+        self.assertEqual(stats.frequencies[0].most_common(), [("They", 2)])
+
+    def test_merge(self):
+        first = statistics.Statistics(sketched=[0])
+        second = statistics.Statistics(sketched=[0])
+        list(first.count(self.sentences[:2]))
+        list(second.count(self.sentences[2:]))
+        first.merge(pickle.loads(pickle.dumps(second)))
+        whole = statistics.Statistics(sketched=[0])
+        list(whole.count(self.sentences))
+        self.assertEqual(first.as_dict(), whole.as_dict())
+
+    def test_write(self):
+        stats = statistics.Statistics(columns=[2], sketched=[0], names={0: "form", 2: "upos"})
+        list(stats.count(self.sentences))
+        fh = io.StringIO()
+        stats.write(fh)
+        result = json.loads(fh.getvalue())
+        self.assertEqual(result["sentence_lengths"], {"1": 1, "2": 1, "3": 1})
+        self.assertEqual(result["columns"]["upos"], {"approximate": False, "total": 5, "distinct": 2, "values": {"PRON": 3, "VERB": 2}})
+        self.assertEqual(result["columns"]["form"]["top"][0], ["They", 2])
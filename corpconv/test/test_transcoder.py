@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import corpus_writers
+from corpconv import profiling
+from corpconv import transcoder
+
+
+corpus_conll = """# sent_id = a1
+1\tThey\tthey\t_\t_
+2\tbuy\t_\tVERB\tVBP
+
+1\t_\t__\t_
+2\tsell
+
+""".splitlines()
+
+
+class TestTranscoder(unittest.TestCase):
+    def test_transcoder_01(self):
+        readers = {"conll": corpus_readers.read_conll,
+                   "tsv": corpus_readers.read_tsv,
+                   "vrt": corpus_readers.read_vrt}
+        writers = {"conll": corpus_writers.write_conll,
+                   "tsv": corpus_writers.write_tsv,
+                   "vrt": corpus_writers.write_vrt}
+        corpus = {"conll": corpus_conll,
+                  "tsv": list(corpus_writers.write_tsv(corpus_readers.read_conll(corpus_conll))),
+                  "vrt": list(corpus_writers.write_vrt(corpus_readers.read_conll(corpus_conll)))}
+        for input_format in transcoder.FORMATS:
+            for output_format in transcoder.FORMATS:
+                expected = "\n".join(writers[output_format](readers[input_format](corpus[input_format])))
+                self.assertEqual("\n".join(transcoder.transcode(corpus[input_format], input_format, output_format)), expected)
+
+    def test_transcoder_02(self):
+        self.assertEqual(list(transcoder.transcode(corpus_conll, "conll", "vrt")), ["<s id=\"a1\">", "They\tthey\t\t\nbuy\t\tVERB\tVBP", "</s>", "<s id=\"s2\">", "\t__\t\nsell", "</s>"])
+        self.assertFalse(transcoder.can_transcode("osl", "vrt"))
+
+    def test_counts(self):
+        for input_format, corpus in (("conll", corpus_conll), ("vrt", list(corpus_writers.write_vrt(corpus_readers.read_conll(corpus_conll))))):
+            counts = profiling.Counts()
+            list(transcoder.transcode(corpus, input_format, "tsv", counts=counts))
+            self.assertEqual((counts.sentences, counts.tokens), (2, 4))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+
+from corpconv import diagnostics
+from corpconv import validate
+
+
+corpus_conll = b"""# sent_id = a
+# text = They buy\tand sell
+1\tThey\tthey\tPRON
+2\tbuy\tbuy\tVERB
+
+1-2\tIt's\t_\t_
+1\tIt\tit\tPRON
+2\t's\tbe\tAUX
+2.1\tgone\tgo\tVERB
+3\tgone\tgo\tVERB
+
+"""
+
+corpus_broken = b"""# sent_id = a
+1\tThey\tthey\tPRON
+2\tbuy\tbuy
+4\tand\tand\tCCONJ
+
+1\tI\t\tPRON
+x\tsell\tsell\tVERB
+
+"""
+
+
+def check(data, input_format, **kwargs):
+    problems = diagnostics.Diagnostics(max_examples=100, log=False)
+    return validate.validate(io.BytesIO(data), input_format, problems, **kwargs)
+
+
+class TestValidate(unittest.TestCase):
+    def test_valid(self):
+        for block_size in (1, 7, 1 << 20):
+            self.assertEqual(check(corpus_conll, "conll", block_size=block_size).counts, {})
+
+    def test_conll(self):
+        for block_size in (1, 7, 1 << 20):
+            problems = check(corpus_broken, "conll", block_size=block_size)
+            self.assertEqual(problems.examples["field-count"], [(3, "3 fields instead of 4")])
+            self.assertEqual(problems.examples["token-id"], [(4, "token ID 4 instead of 3"), (7, "invalid token ID 'x'")])
+            self.assertEqual(problems.examples["empty-field"], [(6, "empty field")])
+
+    def test_tsv_and_vrt(self):
+        data = b"<s>\na\tb\n\tb\na\tb\tc\n</s>\n"
+        problems = check(data, "vrt")
+        self.assertEqual(problems.examples["field-count"], [(4, "3 fields instead of 2")])
+        self.assertNotIn("empty-field", problems.counts)
+        problems = check(data, "vrt", empty_fields=False)
+        self.assertEqual(problems.examples["empty-field"], [(3, "empty field")])
+        problems = check(b"a\tb\nc\n\nd\te", "tsv", block_size=3)
+        self.assertEqual(problems.examples["field-count"], [(2, "1 fields instead of 2")])
+
+    def test_osl(self):
+        data = b"a/X b/Y\nc/Z d e//\n"
+        problems = check(data, "osl", delimiter="/")
+        self.assertEqual(problems.counts, {"field-count": 1})
+        self.assertEqual(problems.examples["field-count"], [(2, "token 'd' has 1 fields instead of 2")])
+        problems = check(data, "osl", delimiter="/", nr_of_fields=2)
+        self.assertEqual(problems.counts, {"field-count": 4})
+        problems = check(data, "osl", delimiter="/", empty_fields=False)
+        self.assertEqual(problems.examples["empty-field"], [(2, "empty field")])
+
+    def test_line_numbers(self):
+        problems = check(corpus_conll * 1000 + b"1\ta\n\n", "conll", block_size=100)
+        self.assertEqual(problems.examples["field-count"], [(11 * 1000 + 1, "2 fields instead of 4")])
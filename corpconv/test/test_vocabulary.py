@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+
+from corpconv import corpus_readers
+from corpconv import vocabulary
+
+
+class TestVocabulary(unittest.TestCase):
+    def test_vocabulary_01(self):
+        vocab = vocabulary.Vocabulary()
+        self.assertEqual(vocab.add("NOUN"), 0)
+        self.assertEqual(vocab.add("VERB"), 1)
+        self.assertEqual(vocab.add("NOUN"), 0)
+        self.assertEqual(vocab.value(1), "VERB")
+        self.assertEqual(len(vocab), 2)
+        self.assertEqual(vocab.frequencies(), {"NOUN": 2, "VERB": 1})
+
+    def test_vocabulary_02(self):
+        vocab = vocabulary.Vocabulary()
+        first = "".join(["NO", "UN"])
+        second = "".join(["N", "OUN"])
+        self.assertIsNot(first, second)
+        self.assertIs(vocab.intern(first), first)
+        self.assertIs(vocab.intern(second), first)
+
+    def test_eviction(self):
+        vocab = vocabulary.Vocabulary(max_size=2)
+        vocab.add("a")
+        vocab.add("b")
+        vocab.add("a")
+        # "b" is the least recently used value and its ID is reused
+        self.assertEqual(vocab.add("c"), 1)
+        self.assertNotIn("b", vocab)
+        self.assertEqual(vocab.frequencies(), {"a": 2, "c": 1})
+
+
+class TestInternSentences(unittest.TestCase):
+    def test_intern_sentences(self):
+        corpus = io.StringIO("1\tThe\tthe\tDET\n2\tdog\tdog\tNOUN\n\n1\tA\ta\tDET\n2\tcat\tcat\tNOUN\n3\tran\n\n")
+        expected = list(corpus_readers.read_conll(corpus))
+        corpus.seek(0)
+        vocabularies = vocabulary.default_vocabularies(3)
+        sentences = list(vocabulary.intern_sentences(corpus_readers.read_conll(corpus), vocabularies))
+        self.assertEqual(sentences, expected)
+        self.assertIs(sentences[0].tokens[0][2], sentences[1].tokens[0][2])
+        self.assertEqual(vocabularies[2].frequencies(), {"DET": 2, "NOUN": 2})
+        self.assertEqual(vocabularies[0].max_size, vocabulary.DEFAULT_MAX_SIZE)
+        self.assertIsNone(vocabularies[2].max_size)
+
+    def test_encode_sentences(self):
+        sentences = [corpus_readers.Sentence("s1", [["The", "DET"], ["dog", "NOUN"]]),
+                     corpus_readers.Sentence("s2", [["A", "DET"]])]
+        vocabularies = {1: vocabulary.Vocabulary()}
+        encoded = list(vocabulary.encode_sentences(sentences, vocabularies))
+        self.assertEqual(encoded, [("s1", [["The", 0], ["dog", 1]]), ("s2", [["A", 0]])])
+
+    def test_encode_bounded(self):
+        with self.assertRaises(ValueError):
+            vocabulary.encode_sentences([], {0: vocabulary.Vocabulary(max_size=10)})
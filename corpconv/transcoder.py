@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import logging
+
+from corpconv import corpus_readers
+
+
+# Pairs of these formats differ only in the sentence delimiters and in
+# cheap, local modifications of the token lines, i.e. they can be
+# converted without splitting token lines into fields.
+FORMATS = ("conll", "tsv", "vrt")
+
+
+def can_transcode(input_format, output_format):
+    return input_format in FORMATS and output_format in FORMATS
+
+
+# The token lines of a sentence are converted as a single block. The
+# replacements are done twice, as the matches of a single pass of
+# str.replace do not overlap, i.e. adjacent fields are missed.
+
+def _drop_underscores(block):
+    if "_" not in block:
+        return block
+    block = "\n" + block + "\n"
+    block = block.replace("\t_\t", "\t\t").replace("\t_\t", "\t\t")
+    block = block.replace("\n_\n", "\n\n").replace("\n_\n", "\n\n")
+    block = block.replace("\n_\t", "\n\t").replace("\t_\n", "\t\n")
+    return block[1:-1]
+
+
+def _fill_empty(block):
+    block = block + "\n"
+    if "\t\t" in block:
+        block = block.replace("\t\t", "\t_\t").replace("\t\t", "\t_\t")
+    return block.replace("\t\n", "\t_\n")[:-1]
+
+
+def _conll_to_raw(lines):
+    return _drop_underscores("\n".join([line.partition("\t")[2] for line in lines]))
+
+
+def _raw_to_conll(lines):
+    return _fill_empty("\n".join([str(i) + "\t" + line for i, line in enumerate(lines, start=1)]))
+
+
+def _conll_to_conll(lines):
+    return _fill_empty("\n".join([str(i) + "\t" + rest if sep else str(i) for i, (_, sep, rest) in enumerate([line.partition("\t") for line in lines], start=1)]))
+
+
+def _token_converter(input_format, output_format):
+    if input_format == "conll":
+        if output_format == "conll":
+            return _conll_to_conll
+        return _conll_to_raw
+    if output_format == "conll":
+        return _raw_to_conll
+    return "\n".join
+
+
+def _frame(output_format):
+    """Return a function for the lines before a sentence and the lines
+    after it.
+
+    """
+    if output_format == "conll":
+        return (lambda sentence_id: ["# sent_id = %s" % sentence_id]), [""]
+    elif output_format == "tsv":
+        return (lambda sentence_id: []), [""]
+    elif output_format == "vrt":
+        return (lambda sentence_id: ["<s id=\"%s\">" % sentence_id]), ["</s>"]
+
+
+def _counting(convert, start, counts):
+    """Wrap the functions called for every sentence and for its tokens
+    so that they count them in counts.
+
+    """
+    def counting_convert(tokens):
+        counts.tokens += len(tokens)
+        return convert(tokens)
+
+    def counting_start(sentence_id):
+        counts.sentences += 1
+        return start(sentence_id)
+    return counting_convert, counting_start
+
+
+def transcode(corpus, input_format, output_format, first_sentence=1, counts=None):
+    """Convert the lines of corpus from input_format to output_format.
+
+    The output is the same as that of the corresponding writer in
+    corpus_writers applied to the corresponding reader in
+    corpus_readers, but tokens are never split into fields. The token
+    lines of every sentence are yielded as a single string. If counts
+    (e.g. a profiling.Counts) is given, the sentences and tokens are
+    counted in its sentences and tokens attributes.
+
+    """
+    convert = _token_converter(input_format, output_format)
+    start, end = _frame(output_format)
+    if counts is not None:
+        convert, start = _counting(convert, start, counts)
+    if input_format == "vrt":
+        return _transcode_vrt(corpus, convert, start, end, first_sentence)
+    return _transcode_empty_line(corpus, input_format == "conll", convert, start, end, first_sentence)
+
+
+def _transcode_empty_line(corpus, conll, convert, start, end, first_sentence):
+    pattern = corpus_readers.compiled("sent_id")
+    sentence_counter = first_sentence - 1
+    origid = None
+    tokens = []
+    line = ""
+    for line in corpus:
+        line = line.rstrip() if conll else line.rstrip("\n")
+        if line == "":
+            sentence_counter += 1
+            yield from start(origid if origid is not None else "s%d" % sentence_counter)
+            if tokens:
+                yield convert(tokens)
+            yield from end
+            tokens = []
+            origid = None
+        elif conll and len(tokens) == 0 and line.startswith("#"):
+            m = pattern.search(line)
+            if m:
+                origid = m.group(1)
+        else:
+            tokens.append(line)
+    if line != "":
+        logging.warning("Badly formatted file (missing empty line at end of file)!")
+        sentence_counter += 1
+        yield from start(origid if origid is not None else "s%d" % sentence_counter)
+        if tokens:
+            yield convert(tokens)
+        yield from end
+
+
+def _transcode_vrt(corpus, convert, start, end, first_sentence):
+    pattern = corpus_readers.compiled("vrt_id")
+    sentence_counter = first_sentence - 1
+    origid = None
+    tokens = []
+    for line in corpus:
+        line = line.rstrip("\n")
+        if line == "</s>":
+            sentence_counter += 1
+            yield from start(origid if origid is not None else "s%d" % sentence_counter)
+            if tokens:
+                yield convert(tokens)
+            yield from end
+            tokens = []
+            origid = None
+        elif line.startswith("<s "):
+            m = pattern.search(line)
+            if m:
+                origid = m.group(2)
+            else:
+                logging.warning("Badly formatted file (opening sentence tag misses id attribute)!")
+        elif line.startswith("<"):
+            pass
+        else:
+            tokens.append(line)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+import itertools
+import operator
+import re
+
+from corpconv import diagnostics
+
+
+DEFAULT_BLOCK_SIZE = 1 << 23
+
+# Lines that are not tokens (besides empty lines)
+_MARKUP = {"conll": b"#", "vrt": b"<"}
+
+_NOT_TAB_OR_NEWLINE = bytes(b for b in range(256) if b not in b"\t\n")
+
+
+def _n_empty_lines(data):
+    """Number of empty lines in data, which starts with a newline; a
+    final newline counts as an empty line, too.
+
+    """
+    if b"\n\n\n" not in data:
+        return data.count(b"\n\n") + data.endswith(b"\n")
+    n = 0
+    # Every pass shortens runs of newlines to about half their length
+    while b"\n\n" in data:
+        shorter = data.replace(b"\n\n", b"\n")
+        n += len(data) - len(shorter)
+        data = shorter
+    return n + data.endswith(b"\n")
+
+
+def _blocks(fh, input_format, block_size):
+    """Yield (first line number, block) for blocks of about block_size
+    bytes read from fh. Blocks end after an empty line (conll) or a
+    newline (other formats), unless the input ends without one.
+
+    """
+    boundary = b"\n\n" if input_format == "conll" else b"\n"
+    rest = b""
+    line = 1
+    while True:
+        data = fh.read(block_size)
+        if not data:
+            break
+        data = rest + data
+        end = data.rfind(boundary)
+        if end == -1:
+            rest = data
+            continue
+        end += len(boundary)
+        block, rest = data[:end], data[end:]
+        yield line, block
+        line += block.count(b"\n")
+    if rest:
+        yield line, rest
+
+
+def _first_token_line(lines, markup):
+    for line in lines:
+        if line and (markup is None or not line.startswith(markup)):
+            return line
+    return None
+
+
+class Validator:
+    """Checks a corpus in large blocks of bytes.
+
+    For the token lines of conll, tsv and vrt, every line must have the
+    same number of fields as the first one; for osl, every token must
+    have at least nr_of_fields field delimiters (by default as many as
+    the first token). With
+    empty_fields=False (always for conll, which marks missing values
+    with an underscore), fields must not be empty. The token IDs of
+    conll sentences have to be 1, 2, 3, … (multiword tokens and empty
+    nodes are ignored).
+
+    Every check first looks at a whole block with bytes methods and
+    itertools/operator functions that run in C; only blocks (or
+    sentences) that fail are examined line by line to find the lines
+    with problems, which are reported to diagnostics.
+
+    """
+    def __init__(self, input_format, problems, delimiter="\t", nr_of_fields=None, empty_fields=True):
+        self.input_format = input_format
+        self.problems = problems
+        self.delimiter = delimiter.encode("utf-8") if isinstance(delimiter, str) else delimiter
+        self.n_tabs = None
+        self.nr_of_fields = nr_of_fields
+        self.empty_fields = empty_fields and input_format != "conll"
+        self.markup = _MARKUP.get(input_format)
+        self._markup_lines = None if self.markup is None else re.compile(b"\n" + re.escape(self.markup) + b"[^\n]*")
+        self._expected_ids = [b""]
+
+    def check(self, block, first_line):
+        lines = block.split(b"\n")
+        # The token lines, each preceded by a newline
+        tokens = b"\n" + block
+        if self._markup_lines is not None and b"\n" + self.markup in tokens:
+            tokens = self._markup_lines.sub(b"", tokens)
+        if self.input_format == "osl":
+            self._check_osl(block, lines, first_line)
+        else:
+            self._check_fields(tokens, lines, first_line)
+            if self.input_format == "conll":
+                self._check_ids(block, lines, first_line)
+        if not self.empty_fields:
+            self._check_empty(tokens, lines, first_line)
+
+    def _check_fields(self, tokens, lines, first_line):
+        if self.n_tabs is None:
+            line = _first_token_line(lines, self.markup)
+            if line is None:
+                return
+            self.n_tabs = line.count(b"\t")
+        # Only tabs and newlines are left; removing the newline and tabs
+        # of every correct line must leave one newline per empty line
+        skeleton = tokens.translate(None, _NOT_TAB_OR_NEWLINE)
+        if self.n_tabs == 0:
+            ok = b"\t" not in skeleton
+        else:
+            rest = skeleton.replace(b"\n" + b"\t" * self.n_tabs, b"")
+            ok = b"\t" not in rest and len(rest) == _n_empty_lines(tokens)
+        if ok:
+            return
+        for number, line in enumerate(lines, start=first_line):
+            if line and (self.markup is None or not line.startswith(self.markup)):
+                n = line.count(b"\t")
+                if n != self.n_tabs:
+                    self.problems.issue("field-count", number, "%d fields instead of %d", n + 1, self.n_tabs + 1)
+
+    def _expected(self, n):
+        """The token IDs of a sentence with n tokens, one per line."""
+        while len(self._expected_ids) <= n:
+            i = len(self._expected_ids)
+            self._expected_ids.append(self._expected_ids[-1] + (b"\n" if i > 1 else b"") + b"%d" % i)
+        return self._expected_ids[n]
+
+    def _check_ids(self, block, lines, first_line):
+        # The first column of every line, sentences separated by empty
+        # lines
+        ids = b"\n".join(map(operator.itemgetter(0), map(bytes.partition, lines, itertools.repeat(b"\t"))))
+        line = first_line
+        for sentence in ids.split(b"\n\n"):
+            start = line
+            line += sentence.count(b"\n") + 2
+            # Skip leading empty lines and comments
+            while sentence.startswith(b"\n") or sentence.startswith(b"#"):
+                end = sentence.find(b"\n")
+                if end == -1:
+                    sentence = b""
+                    break
+                sentence = sentence[end + 1:]
+                start += 1
+            if sentence == b"" or sentence == self._expected(sentence.count(b"\n") + 1):
+                continue
+            self._check_sentence_ids(sentence, start)
+
+    def _check_sentence_ids(self, sentence, first_line):
+        expected = 1
+        for number, token_id in enumerate(sentence.split(b"\n"), start=first_line):
+            if token_id.isdigit():
+                if int(token_id) != expected:
+                    self.problems.issue("token-id", number, "token ID %s instead of %d", token_id.decode("utf-8", errors="replace"), expected)
+                expected = int(token_id) + 1
+            elif token_id == b"" or token_id.startswith(b"#"):
+                continue
+            elif not all(part.isdigit() for part in token_id.replace(b"-", b".").split(b".")):
+                self.problems.issue("token-id", number, "invalid token ID %r", token_id.decode("utf-8", errors="replace"))
+
+    def _check_osl(self, block, lines, first_line):
+        delimiter = self.delimiter
+        if self.nr_of_fields is None:
+            line = _first_token_line(lines, None)
+            if line is None:
+                return
+            self.nr_of_fields = line.split(b" ", 1)[0].count(delimiter)
+        tokens = block.replace(b"\n", b" ").split(b" ")
+        n_empty = tokens.count(b"")
+        counts = list(map(bytes.count, tokens, itertools.repeat(delimiter)))
+        if list(map(self.nr_of_fields.__le__, counts)).count(False) <= n_empty:
+            return
+        for number, line in enumerate(lines, start=first_line):
+            for token in line.split(b" "):
+                if token and token.count(delimiter) < self.nr_of_fields:
+                    self.problems.issue("field-count", number, "token %r has %d fields instead of %d", token.decode("utf-8", errors="replace"), token.count(delimiter) + 1, self.nr_of_fields + 1)
+
+    def _check_empty(self, tokens, lines, first_line):
+        if self.input_format == "osl":
+            separator = self.delimiter
+            patterns = [separator + separator, b" " + separator, separator + b" ", b"\n" + separator, separator + b"\n"]
+        else:
+            separator = b"\t"
+            patterns = [b"\t\t", b"\n\t", b"\t\n"]
+        if not tokens.endswith(separator) and not any(pattern in tokens for pattern in patterns):
+            return
+        numbers = set()
+        for number, line in enumerate(lines, start=first_line):
+            if self.markup is not None and line.startswith(self.markup):
+                continue
+            if self.input_format == "osl":
+                if any(f == b"" for token in line.split(b" ") if token for f in token.split(separator)):
+                    numbers.add(number)
+            elif line and b"" in line.split(b"\t"):
+                numbers.add(number)
+        for number in sorted(numbers):
+            self.problems.issue("empty-field", number, "empty field")
+
+
+def validate(fh, input_format, problems=None, delimiter="\t", nr_of_fields=None, empty_fields=True, block_size=DEFAULT_BLOCK_SIZE):
+    """Check the corpus read from the binary file handle fh; return a
+    diagnostics.Diagnostics with the problems found (see Validator).
+
+    """
+    if problems is None:
+        problems = diagnostics.Diagnostics(log=False)
+    validator = Validator(input_format, problems, delimiter, nr_of_fields, empty_fields)
+    for first_line, block in _blocks(fh, input_format, block_size):
+        validator.check(block, first_line)
+    return problems
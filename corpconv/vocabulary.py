@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import collections
+
+
+DEFAULT_MAX_SIZE = 100000
+
+
+class Vocabulary:
+    """Mapping between the values of a column and small integer IDs.
+
+    Interning values through a vocabulary makes all occurrences of a
+    value share a single string object. If max_size is given, the
+    least recently used values are evicted when the vocabulary is full
+    and their IDs are reused, which bounds the memory needed for
+    open-class columns like word forms. The IDs of a bounded
+    vocabulary therefore only identify a value as long as it is in the
+    vocabulary and cannot be used for encoding.
+
+    """
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self._ids = collections.OrderedDict() if max_size is not None else {}
+        self._values = []
+        self._counts = []
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, value):
+        return value in self._ids
+
+    def add(self, value):
+        """Return the ID of value, adding it to the vocabulary if
+        necessary, and count the occurrence.
+
+        """
+        try:
+            i = self._ids[value]
+        except KeyError:
+            if self.max_size is not None and len(self._ids) >= self.max_size:
+                old_value, i = self._ids.popitem(last=False)
+                self._values[i] = value
+                self._counts[i] = 0
+            else:
+                i = len(self._values)
+                self._values.append(value)
+                self._counts.append(0)
+            self._ids[value] = i
+        else:
+            if self.max_size is not None:
+                self._ids.move_to_end(value)
+        self._counts[i] += 1
+        return i
+
+    def intern(self, value):
+        """Return the canonical object for value."""
+        return self._values[self.add(value)]
+
+    def value(self, i):
+        return self._values[i]
+
+    def frequencies(self):
+        """Return the frequencies of the values currently in the
+        vocabulary (evicted values are forgotten).
+
+        """
+        return {value: self._counts[i] for value, i in self._ids.items()}
+
+
+def default_vocabularies(n_fields, open_class=(0, 1), max_size=DEFAULT_MAX_SIZE):
+    """Return a vocabulary for every column; the open_class columns
+    (by default word form and lemma) are bounded by max_size.
+
+    """
+    return {c: Vocabulary(max_size if c in open_class else None) for c in range(n_fields)}
+
+
+def intern_sentences(sentences, vocabularies):
+    """Replace the field values of the sentences produced by a reader
+    with the canonical objects from vocabularies, a dictionary mapping
+    column indices to Vocabularies. The readers can do this while
+    building the tokens (their vocabularies argument).
+
+    """
+    columns = [(c, vocabulary.intern) for c, vocabulary in sorted(vocabularies.items())]
+    for sentence in sentences:
+        for token in sentence.tokens:
+            n_fields = len(token)
+            for c, intern in columns:
+                if c < n_fields:
+                    token[c] = intern(token[c])
+        yield sentence
+
+
+def encode_sentences(sentences, vocabularies):
+    """Return an iterator over (sentence ID, encoded tokens) pairs,
+    where every token is a list of the vocabulary IDs of its fields.
+    Columns without a vocabulary keep their values. The vocabularies
+    must not be bounded (max_size), as the IDs of evicted values are
+    reused for other values.
+
+    """
+    if any(vocabulary.max_size is not None for vocabulary in vocabularies.values()):
+        raise ValueError("bounded vocabularies reuse IDs and cannot be used for encoding")
+    return _encode(sentences, vocabularies)
+
+
+def _encode(sentences, vocabularies):
+    for sentence_id, tokens in sentences:
+        encoded = []
+        for token in tokens:
+            encoded.append([vocabularies[c].add(f) if c in vocabularies else f for c, f in enumerate(token)])
+        yield sentence_id, encoded
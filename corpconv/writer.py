@@ -1,48 +1,91 @@
 #!/usr/bin/env python3
 
-import collections
+import functools
 import logging
-import re
 
+from corpconv import output
 
-def write_sentences(sentences, format_string, args):
+DELIMITERS = {"l": "\n", "s": " ", "t": "\t"}
+
+
+def write_sentences(sentences, format_string, args, fh, buffer_size=output.DEFAULT_BUFFER_SIZE):
+    """Write sentences in the given format to the binary file handle
+    fh.
+
+    """
+    write = compile_writer(format_string, args.xml_tag, args.xml_id)
+    output.write_buffered(write(sentences), fh, buffer_size)
+
+
+def _join_with_id(fields, token_id, position, delimiter, missing):
+    """Join fields with token_id inserted at position and empty fields
+    replaced by missing.
+
+    """
+    fields = [f if f else missing for f in fields]
+    fields.insert(position, token_id)
+    return delimiter.join(fields)
+
+
+def _token_expression(field_del, tok_id, missing):
+    """Expression for the output of token, which is not modified."""
+    f_del = DELIMITERS.get(field_del, field_del) if field_del != "n" else ""
+    joined = "%r.join(token.fields)" % f_del
+    if missing not in ("e", "n"):
+        # Only tokens with empty fields are copied
+        joined = "(%s if '' not in token.fields else %r.join([f if f else %r for f in token.fields]))" % (joined, f_del, missing)
+    if tok_id == "n":
+        return joined
+    tok_id = int(tok_id)
+    if tok_id == 0:
+        return "(token.id + %r + %s if token.fields else token.id)" % (f_del, joined)
+    if missing not in ("e", "n"):
+        # The fields are copied once
+        return "_join_with_id(token.fields, token.id, %d, %r, %r)" % (tok_id, f_del, missing)
+    return "%r.join((*token.fields[:%d], token.id, *token.fields[%d:]))" % (f_del, tok_id, tok_id)
+
+
+def _writer_source(format_string, xml_tag, xml_id):
     sent_del, tok_del, field_del, sent_id, tok_id, missing = format_string
-    if tok_id != "n":
-        tok_id = int(tok_id)
-    if field_del == "s":
-        f_del = " "
-    elif field_del == "t":
-        f_del = "\t"
-    elif field_del != "n":
-        f_del = field_del
-    if tok_del == "l":
-        t_del = "\n"
-    elif tok_del == "s":
-        t_del = " "
-    elif tok_del == "t":
-        t_del = "\t"
-    for sentence in sentences:
-        toks = []
-        for token in sentence.tokens:
-            if tok_id != "n":
-                token.fields.insert(tok_id, token.id)
-            if field_del == "n" and len(token.fields) != 1:
-                logging.warning("You specified output field delimiter 'n' but there are %d fields in sentence %d, token %d. Skipping token.", len(token.fields), sentence.id, token.id)
-                continue
-            toks.append(f_del.join(token.fields))
-        tokens = t_del.join(toks)
-        if sent_del == "x":
-            print("<%s %s=\"%s\">" % (args.xml_tag, args.xml_id, sentence.id))
-        if sent_id == "c":
-            print("# sent_id = %s" % sentence.id)
-            print(tokens)
-        elif sent_id == "s":
-            print("%s %s" % (sentence.id, tokens))
-        elif sent_id == "t":
-            print("%s\t%s" % (sentence.id, tokens))
-        else:
-            print(tokens)
-        if sent_del == "x":
-            print("</%s>" % args.xml_tag)
-        elif sent_del == "e":
-            print("\n")
+    t_del = DELIMITERS[tok_del]
+    token = _token_expression(field_del, tok_id, missing)
+    code = ["def write(sentences):",
+            "    for sentence in sentences:"]
+    if field_del == "n":
+        code.extend(["        toks = []",
+                     "        for token in sentence.tokens:",
+                     "            if len(token.fields) != 1:",
+                     "                logging.warning(\"You specified output field delimiter 'n' but there are %d fields in sentence %s, token %s. Skipping token.\", len(token.fields), sentence.id, token.id)",
+                     "                continue",
+                     "            toks.append(%s)" % token,
+                     "        tokens = %r.join(toks)" % t_del])
+    else:
+        code.append("        tokens = %r.join([%s for token in sentence.tokens])" % (t_del, token))
+    expression = "tokens"
+    if sent_id == "c":
+        expression = "'# sent_id = ' + sentence.id + '\\n' + tokens"
+    elif sent_id in ("s", "t"):
+        expression = "sentence.id + %r + tokens" % DELIMITERS[sent_id]
+    if sent_del == "x":
+        expression = "%r + sentence.id + %r + %s + %r" % ("<%s %s=\"" % (xml_tag, xml_id), "\">\n", expression, "\n</%s>" % xml_tag)
+    elif sent_del == "e":
+        # The newline after the sentence is added by the output
+        expression += " + '\\n'"
+    code.append("        yield " + expression)
+    return "\n".join(code) + "\n"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_writer(format_string, xml_tag="s", xml_id="id"):
+    """Compile a writer for the given format string.
+
+    The returned function takes an iterable of Sentences and yields
+    one string per sentence (without final newline). Its source is
+    generated once per format string, so that the loops over sentences
+    and tokens contain no branching on the format. The tokens of the
+    sentences are not modified.
+
+    """
+    namespace = {"logging": logging, "_join_with_id": _join_with_id}
+    exec(_writer_source(format_string, xml_tag, xml_id), namespace)
+    return namespace["write"]